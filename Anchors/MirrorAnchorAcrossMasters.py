@@ -3,24 +3,44 @@
 __doc__="""
 Takes a selected anchor and places it in corresponding positions 
 across all masters based on positioning relative to shape bounds.
+Can also mirror all anchors, or a named set, of every selected glyph
+from the current master, keep them at the same distance from the
+x-height, cap height, ascender, descender or baseline zones, and list
+the moves as a dry run first.
 """
 
-from vanilla import Window, PopUpButton, CheckBox, Button, TextBox
+from vanilla import Window, PopUpButton, CheckBox, Button, TextBox, EditText
 from GlyphsApp import Glyphs, GSAnchor
+from kwb.anchors import NEAREST_ZONE, MetricsTable, isZonePosition, mirroredAnchors, anchorMoves, formatMove
+from kwb.glyphsAdapter import suspendedInterface, undoGroup, masterMetric
 
 class MirrorAnchorDialog:
     """Dialog for mirror anchor settings"""
     
     def __init__(self):
         # Window setup
-        self.w = Window((300, 200), "Mirror Anchor Settings", minSize=(300, 200))
+        self.w = Window((300, 320), "Mirror Anchor Settings", minSize=(300, 320))
         
-        # Y-axis positioning dropdown
+        # Which anchors to mirror
         y = 20
+        self.w.anchorsLabel = TextBox((20, y, 100, 20), "Anchors:")
+        self.w.anchorsPopup = PopUpButton((130, y, 150, 20), [
+            "Selected anchor", "All anchors", "Named anchors"
+        ], callback=self.anchorsCallback)
+        self.w.anchorsPopup.set(0)  # Default to the selected anchor
+        
+        # Names for the named anchor set
+        y += 30
+        self.w.anchorNames = EditText((130, y, 150, 22), "top, bottom", placeholder="top, bottom")
+        self.w.anchorNames.enable(False)
+        
+        # Y-axis positioning dropdown
+        y += 40
         self.w.yAxisLabel = TextBox((20, y, 100, 20), "Y-axis position:")
         self.w.yAxisPopup = PopUpButton((130, y, 150, 20), [
-            "Top", "Center", "Bottom"
-        ])
+            "Top", "Center", "Bottom",
+            "Nearest zone", "Ascender", "Cap height", "x-height", "Baseline", "Descender"
+        ], callback=self.yAxisCallback)
         self.w.yAxisPopup.set(0)  # Default to Top
         
         # X-axis positioning dropdown
@@ -36,6 +56,17 @@ class MirrorAnchorDialog:
         self.w.relativeToShapes = CheckBox((20, y, 260, 20), "Relative to shapes")
         self.w.relativeToShapes.set(True)
         
+        # Zone overshoot checkbox
+        y += 30
+        self.w.overshoot = CheckBox((20, y, 260, 20), "Measure from zone overshoot")
+        self.w.overshoot.set(False)
+        self.w.overshoot.enable(False)
+        
+        # Dry run checkbox
+        y += 30
+        self.w.dryRun = CheckBox((20, y, 260, 20), "Dry run: only list the moves")
+        self.w.dryRun.set(False)
+        
         # Close after running checkbox
         y += 30
         self.w.closeAfterRunning = CheckBox((20, y, 200, 20), "Close after running")
@@ -47,15 +78,28 @@ class MirrorAnchorDialog:
         self.w.okButton = Button((200, y, 80, 20), "OK", callback=self.okCallback)
         self.w.setDefaultButton(self.w.okButton)
         
+    def anchorsCallback(self, sender):
+        """Only the named anchor set needs names"""
+        self.w.anchorNames.enable(sender.get() == 2)
+        
+    def yAxisCallback(self, sender):
+        """Overshoot only applies to zones"""
+        self.w.overshoot.enable(sender.get() >= 3)
+        
     def okCallback(self, sender):
         """Handle OK button click"""
-        y_options = ["top", "center", "bottom"]
+        anchor_options = ["selected", "all", "named"]
+        y_options = ["top", "center", "bottom", NEAREST_ZONE, "ascender", "cap height", "x-height", "baseline", "descender"]
         x_options = ["left", "center", "right"]
         
         options = {
+            'anchors': anchor_options[self.w.anchorsPopup.get()],
+            'anchor_names': self.w.anchorNames.get().replace(",", " ").split(),
             'y_position': y_options[self.w.yAxisPopup.get()],
             'x_position': x_options[self.w.xAxisPopup.get()],
             'relative_to_shapes': self.w.relativeToShapes.get(),
+            'overshoot': self.w.overshoot.get(),
+            'dry_run': self.w.dryRun.get(),
             'close_after_running': self.w.closeAfterRunning.get()
         }
         
@@ -74,11 +118,25 @@ class MirrorAnchorDialog:
         self.w.open()
 
 
-def get_glyph_bounds(layer):
-    """Get the left and right bounds of a glyph layer"""
-    if layer.bounds:
-        return layer.bounds.origin.x, layer.bounds.origin.x + layer.bounds.size.width
-    return 0, layer.width
+def selected_anchor_in(layer):
+    """The first anchor in the layer's selection, or None"""
+    for item in layer.selection:
+        if item.__class__.__name__ == "GSAnchor":
+            return item
+    return None
+
+
+def glyph_placements(font, glyph, source_layer, source_master, anchor_names, options, metrics):
+    """The anchor placements for all masters of glyph but the source"""
+    target_layers = [
+        glyph.layers[master.id] for master in font.masters
+        if master != source_master and glyph.layers[master.id]
+    ]
+    return mirroredAnchors(
+        source_layer, target_layers, anchor_names,
+        options['x_position'], options['y_position'], options['relative_to_shapes'],
+        metrics, options['overshoot']
+    )
 
 
 def mirror_anchor_with_options(options):
@@ -96,154 +154,90 @@ def mirror_anchor_with_options(options):
         return
     
     current_layer = font.selectedLayers[0]
-    current_glyph = current_layer.parent
     current_master = current_layer.associatedFontMaster
-    
-    # Check if we have an anchor selected
-    selection = current_layer.selection
-    selected_anchor = None
-    
-    for item in selection:
-        if item.__class__.__name__ == "GSAnchor":
-            selected_anchor = item
-            break
-    
-    if not selected_anchor:
-        print("No anchor selected")
-        return
-    
-    anchor_name = selected_anchor.name
-    anchor_pos = selected_anchor.position
-    print(f"Mirroring anchor '{anchor_name}' from position ({anchor_pos.x}, {anchor_pos.y})")
     print(f"Options: {options}")
     
-    # Get current layer bounds
-    current_left, current_right = get_glyph_bounds(current_layer)
-    current_bottom = current_layer.bounds.origin.y if current_layer.bounds else 0
-    current_top = current_bottom + (current_layer.bounds.size.height if current_layer.bounds else 0)
+    if options['anchors'] == "selected":
+        selected_anchor = selected_anchor_in(current_layer)
+        if not selected_anchor:
+            print("No anchor selected")
+            return
+        anchor_pos = selected_anchor.position
+        print(f"Mirroring anchor '{selected_anchor.name}' from position ({anchor_pos.x}, {anchor_pos.y})")
+        # the selected layer itself is the source, even if it is not a master layer
+        sources = [(current_layer.parent, current_layer)]
+        anchor_names = {selected_anchor.name}
+    else:
+        # every selected glyph, once, mirrored from the current master
+        glyphs = []
+        for layer in font.selectedLayers:
+            if layer.parent and layer.parent not in glyphs:
+                glyphs.append(layer.parent)
+        sources = [(glyph, glyph.layers[current_master.id]) for glyph in glyphs]
+        anchor_names = None
+        if options['anchors'] == "named":
+            anchor_names = set(options['anchor_names'])
+            if not anchor_names:
+                print("No anchor names given")
+                return
     
-    # Calculate the offset from the reference point in the current layer
-    offset_x = 0
-    offset_y = 0
+    # zone positions for every master, read once for the whole run
+    metrics = MetricsTable(font.masters, masterMetric) if isZonePosition(options['y_position']) else None
     
-    if options['relative_to_shapes']:
-        # Calculate offset from the specified reference point on the shape bounds
-        if options['x_position'] == 'left':
-            ref_x = current_left
-        elif options['x_position'] == 'right':
-            ref_x = current_right
-        else:  # center
-            ref_x = (current_left + current_right) / 2
-        
-        if options['y_position'] == 'top':
-            ref_y = current_top
-        elif options['y_position'] == 'bottom':
-            ref_y = current_bottom
-        else:  # center
-            ref_y = (current_top + current_bottom) / 2
-        
-        # Store offsets from reference point
-        offset_x = anchor_pos.x - ref_x
-        offset_y = anchor_pos.y - ref_y
-        print(f"Reference point: ({ref_x}, {ref_y}), Offset: ({offset_x}, {offset_y})")
+    if options['dry_run']:
+        Glyphs.showMacroWindow()
+        move_count = 0
+        for glyph, source_layer in sources:
+            if not source_layer:
+                continue
+            placements = glyph_placements(font, glyph, source_layer, current_master, anchor_names, options, metrics)
+            for target_layer, anchor_name, old_position, new_position in anchorMoves(placements):
+                print(formatMove(glyph.name, target_layer.name, anchor_name, old_position, new_position))
+                move_count += 1
+        print(f"Dry run: {move_count} anchor move(s), nothing changed")
+        return
     
-    # Apply to all other masters
-    for master in font.masters:
-        if master == current_master:
-            continue
+    # one line per anchor is only readable for a single glyph
+    verbose = len(sources) == 1
+    placed = 0
+    glyphs_changed = 0
+    with suspendedInterface(font):
+        for glyph, source_layer in sources:
+            if not source_layer:
+                continue
+            placements = glyph_placements(font, glyph, source_layer, current_master, anchor_names, options, metrics)
+            if not placements:
+                continue
             
-        target_layer = current_glyph.layers[master.id]
-        if not target_layer:
-            continue
-        
-        # Get target layer bounds
-        target_left, target_right = get_glyph_bounds(target_layer)
-        target_bottom = target_layer.bounds.origin.y if target_layer.bounds else 0
-        target_top = target_bottom + (target_layer.bounds.size.height if target_layer.bounds else 0)
-        
-        if options['relative_to_shapes']:
-            # Calculate new reference point in target layer
-            if options['x_position'] == 'left':
-                new_ref_x = target_left
-            elif options['x_position'] == 'right':
-                new_ref_x = target_right
-            else:  # center
-                new_ref_x = (target_left + target_right) / 2
-            
-            if options['y_position'] == 'top':
-                new_ref_y = target_top
-            elif options['y_position'] == 'bottom':
-                new_ref_y = target_bottom
-            else:  # center
-                new_ref_y = (target_top + target_bottom) / 2
-            
-            # Apply offset from reference point
-            new_x = new_ref_x + offset_x
-            new_y = new_ref_y + offset_y
-        else:
-            # Just use the specified position directly on the shape bounds
-            if options['x_position'] == 'left':
-                new_x = target_left
-            elif options['x_position'] == 'right':
-                new_x = target_right
-            else:  # center
-                new_x = (target_left + target_right) / 2
-            
-            if options['y_position'] == 'top':
-                new_y = target_top
-            elif options['y_position'] == 'bottom':
-                new_y = target_bottom
-            else:  # center
-                new_y = (target_top + target_bottom) / 2
-        
-        # Create new position
-        try:
-            from Foundation import NSPoint
-            new_pos = NSPoint(new_x, new_y)
-        except ImportError:
-            class Point:
-                def __init__(self, x, y):
-                    self.x = x
-                    self.y = y
-            new_pos = Point(new_x, new_y)
-        
-        # Find or create anchor in target layer
-        target_anchor = None
-        for anchor in target_layer.anchors:
-            if anchor.name == anchor_name:
-                target_anchor = anchor
-                break
-        
-        if not target_anchor:
-            target_anchor = GSAnchor()
-            target_anchor.name = anchor_name
-            target_layer.anchors.append(target_anchor)
-        
-        target_anchor.position = new_pos
-        print(f"Placed anchor in {master.name} at ({new_pos.x}, {new_pos.y})")
+            with undoGroup(glyph):
+                for target_layer, anchor_name, (new_x, new_y) in placements:
+                    # Find or create anchor in target layer
+                    target_anchor = target_layer.anchors[anchor_name]
+                    if not target_anchor:
+                        target_anchor = GSAnchor()
+                        target_anchor.name = anchor_name
+                        target_layer.anchors.append(target_anchor)
+                    
+                    target_anchor.position = (new_x, new_y)
+                    if verbose:
+                        print(f"Placed anchor '{anchor_name}' in {target_layer.name} at ({new_x}, {new_y})")
+            placed += len(placements)
+            glyphs_changed += 1
+    
+    print(f"Placed {placed} anchor(s) in {glyphs_changed} glyph(s)")
 
 
 # Run the script
 if __name__ == "__main__":
-    # Check if we have a font open and anchor selected first
+    # Check if we have a font open and a glyph selected first
     font = Glyphs.font
     if not font:
         print("No font open")
     elif not font.selectedLayers:
         print("No glyph selected")
     else:
-        current_layer = font.selectedLayers[0]
-        selection = current_layer.selection
-        selected_anchor = None
-        
-        for item in selection:
-            if item.__class__.__name__ == "GSAnchor":
-                selected_anchor = item
-                break
-        
-        if not selected_anchor:
-            print("No anchor selected")
-        else:
-            # Show the dialog
-            dialog = MirrorAnchorDialog()
-            dialog.show()
+        # Show the dialog; without a selected anchor only the batch modes make sense
+        dialog = MirrorAnchorDialog()
+        if not selected_anchor_in(font.selectedLayers[0]):
+            dialog.w.anchorsPopup.set(1)
+        dialog.show()
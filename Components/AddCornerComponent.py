@@ -8,6 +8,7 @@ Option to apply on all compatible masters.
 
 import GlyphsApp
 from GlyphsApp import CORNER
+from kwb.glyphsAdapter import suspendedInterface, undoGroup
 from vanilla import *
 
 class AddCornerComponentDialog(object):
@@ -92,47 +93,46 @@ class AddCornerComponentDialog(object):
         else:
             corresponding_nodes = {active_layer.layerId: selected_nodes}
 
-        # Apply sharpening first if multiple nodes are selected
-        if len(selected_nodes) > 1:
+        with suspendedInterface(font), undoGroup(glyph):
+            # Apply sharpening first if multiple nodes are selected
+            if len(selected_nodes) > 1:
+                for layer_id, nodes in corresponding_nodes.items():
+                    layer = glyph.layers[layer_id]
+                    currentController = Glyphs.font.parent.windowController()
+                    if currentController:
+                        tool = currentController.toolEventHandler()
+                        if tool.__class__.__name__ == "GlyphsToolSelectNormal":
+                            path = nodes[0].parent  # Get the path of the first selected node
+                            startIdx = nodes[0].index  # Get the index of the first selected node
+                            endIdx = nodes[-1].index  # Get the index of the last selected node
+                            tool._makeCorner_firstNodeIndex_endNodeIndex_(path, startIdx, endIdx)
+                        else:
+                            print(f"Current tool is not the normal selection tool in layer {layer.name}")
+                    else:
+                        print(f"No current controller found for layer {layer.name}")
+
+                # Update corresponding_nodes with the sharpened node
+                active_sharpened_node = [node for path in active_layer.paths for node in path.nodes if node.selected]
+                if active_sharpened_node:
+                    corresponding_nodes = self.get_corresponding_nodes(glyph, active_layer, active_sharpened_node)
+                else:
+                    print("Warning: No node remained selected after sharpening in the active layer")
+                    return
+            # Add the corner component if there is one node selected per master
+
             for layer_id, nodes in corresponding_nodes.items():
                 layer = glyph.layers[layer_id]
-                layer.parent.beginUndo()
-                currentController = Glyphs.font.parent.windowController()
-                if currentController:
-                    tool = currentController.toolEventHandler()
-                    if tool.__class__.__name__ == "GlyphsToolSelectNormal":
-                        path = nodes[0].parent  # Get the path of the first selected node
-                        startIdx = nodes[0].index  # Get the index of the first selected node
-                        endIdx = nodes[-1].index  # Get the index of the last selected node
-                        tool._makeCorner_firstNodeIndex_endNodeIndex_(path, startIdx, endIdx)
-                    else:
-                        print(f"Current tool is not the normal selection tool in layer {layer.name}")
+                if len(nodes) == 1:
+                    for node in nodes:
+                        new_corner = GSHint()
+                        new_corner.type = CORNER
+                        new_corner.name = self.selected_component
+                        new_corner.originNode = node
+                        layer.hints.append(new_corner)
                 else:
-                    print(f"No current controller found for layer {layer.name}")
-                layer.parent.endUndo()
-
-            # Update corresponding_nodes with the sharpened node
-            active_sharpened_node = [node for path in active_layer.paths for node in path.nodes if node.selected]
-            if active_sharpened_node:
-                corresponding_nodes = self.get_corresponding_nodes(glyph, active_layer, active_sharpened_node)
-            else:
-                print("Warning: No node remained selected after sharpening in the active layer")
-                return
-        # Add the corner component if there is one node selected per master
-
-        for layer_id, nodes in corresponding_nodes.items():
-            layer = glyph.layers[layer_id]
-            if len(nodes) == 1:
-                for node in nodes:
-                    new_corner = GSHint()
-                    new_corner.type = CORNER
-                    new_corner.name = self.selected_component
-                    new_corner.originNode = node
-                    layer.hints.append(new_corner)
-            else:
-                print(f"Warning: sharpen corner failed, sharpen corners manually then try again.")
-
-            print(f"Added corner component '{self.selected_component}' to {len(nodes)} node(s) in layer {layer.name}")
+                    print(f"Warning: sharpen corner failed, sharpen corners manually then try again.")
+
+                print(f"Added corner component '{self.selected_component}' to {len(nodes)} node(s) in layer {layer.name}")
 
         if self.w.closeAfter.get():
             self.w.close()
@@ -7,17 +7,24 @@ Options for automatic alignment, applying on all masters, and searching through
 
 import GlyphsApp
 from vanilla import *
+from kwb.nameSearch import NameSearchIndex
+from kwb.glyphsAdapter import suspendedInterface, undoGroup
+
+# the list only ever gets this many rows, however many glyphs match
+MAX_RESULTS = 200
 
 class AddReplaceComponentDialog(object):
 
     def __init__(self):
-        # Get all available glyphs
-        self.all_glyphs = sorted([g.name for g in Glyphs.font.glyphs])
-        
+        # Index all available glyphs once; keystrokes only query the index
+        self.search_index = NameSearchIndex(g.name for g in Glyphs.font.glyphs)
+        visible_glyphs, total = self.search_index.search("", MAX_RESULTS)
+
         # Set up the dialog
         self.w = FloatingWindow((300, 400), "Add or Replace with Component")
         self.w.search = SearchBox((10, 10, -10, 20), callback=self.search_callback)
-        self.w.componentList = List((10, 40, -10, -90), self.all_glyphs, selectionCallback=self.on_selection)
+        self.w.componentList = List((10, 40, -10, -110), visible_glyphs, selectionCallback=self.on_selection)
+        self.w.resultCount = TextBox((10, -105, -10, 17), self.count_text(len(visible_glyphs), total), sizeStyle='small')
         self.w.autoAlign = CheckBox((10, -80, -10, 20), "Enable automatic alignment", value=True)
         self.w.allMasters = CheckBox((10, -60, -10, 20), "Apply on all masters", value=True)
         self.w.closeAfter = CheckBox((10, -40, -10, 20), "Close popup after running", value=True)
@@ -27,19 +34,18 @@ class AddReplaceComponentDialog(object):
         
         self.selected_component = None
 
+    def count_text(self, shown, total):
+        if shown < total:
+            return f"Showing {shown} of {total} glyphs"
+        return f"{total} glyphs"
+
     def search_callback(self, sender):
-        search_text = sender.get().strip()
-        if search_text.endswith(" "):
-            # Exact match if the search ends with a space
-            exact_matches = [g for g in self.all_glyphs if g.lower() == search_text.lower().strip()]
-            partial_matches = [g for g in self.all_glyphs if g.lower().startswith(search_text.lower().strip()) and g not in exact_matches]
-            filtered_glyphs = exact_matches + partial_matches
-        else:
-            # Prioritize glyphs that start with the search text, then include partial matches
-            starts_with = [g for g in self.all_glyphs if g.lower().startswith(search_text.lower())]
-            contains = [g for g in self.all_glyphs if search_text.lower() in g.lower() and g not in starts_with]
-            filtered_glyphs = starts_with + contains
+        # A trailing space asks for the exact name and names starting with it;
+        # otherwise glyphs that start with the search text come before partial matches
+        search_text = sender.get() or ""
+        filtered_glyphs, total = self.search_index.search(search_text.lstrip(), MAX_RESULTS)
         self.w.componentList.set(filtered_glyphs)
+        self.w.resultCount.set(self.count_text(len(filtered_glyphs), total))
 
     def on_selection(self, sender):
         selection = sender.getSelection()
@@ -81,33 +87,34 @@ class AddReplaceComponentDialog(object):
 
         layers_to_process = glyph.layers if all_masters else [active_layer]
 
-        for layer in layers_to_process:
-            if selected_shape_index < len(layer.shapes):
-                shape_to_replace = layer.shapes[selected_shape_index]
+        with suspendedInterface(font), undoGroup(glyph):
+            for layer in layers_to_process:
+                if selected_shape_index < len(layer.shapes):
+                    shape_to_replace = layer.shapes[selected_shape_index]
                 
-                # Get the bounds of the shape to replace
-                bounds = shape_to_replace.bounds
-
-                # Remove the shape
-                del layer.shapes[selected_shape_index]
-
-                # Add new component
-                new_component = GSComponent(self.selected_component)
-                layer.shapes.append(new_component)
-
-                if auto_align:
-                    new_component.automaticAlignment = True
+                    # Get the bounds of the shape to replace
+                    bounds = shape_to_replace.bounds
+
+                    # Remove the shape
+                    del layer.shapes[selected_shape_index]
+
+                    # Add new component
+                    new_component = GSComponent(self.selected_component)
+                    layer.shapes.append(new_component)
+
+                    if auto_align:
+                        new_component.automaticAlignment = True
+                    else:
+                        # Center the new component where the old shape was
+                        new_bounds = new_component.bounds
+                        new_component.position = (
+                            bounds.origin.x + (bounds.size.width - new_bounds.size.width) / 2,
+                            bounds.origin.y + (bounds.size.height - new_bounds.size.height) / 2
+                        )
+
+                    print(f"Replaced shape with component '{self.selected_component}' in layer {layer.name}")
                 else:
-                    # Center the new component where the old shape was
-                    new_bounds = new_component.bounds
-                    new_component.position = (
-                        bounds.origin.x + (bounds.size.width - new_bounds.size.width) / 2,
-                        bounds.origin.y + (bounds.size.height - new_bounds.size.height) / 2
-                    )
-
-                print(f"Replaced shape with component '{self.selected_component}' in layer {layer.name}")
-            else:
-                print(f"No corresponding shape found in layer {layer.name}")
+                    print(f"No corresponding shape found in layer {layer.name}")
 
         if self.w.closeAfter.get():
             self.w.close()
@@ -8,6 +8,7 @@ Each corner component is a square with rounded corners based on the specified cu
 from GlyphsApp import Glyphs, GSGlyph, GSLayer, GSPath, GSNode
 from vanilla import FloatingWindow, TextBox, EditText, Slider, CheckBox, Button
 import math
+from kwb.glyphsAdapter import suspendedInterface, undoGroup
 
 
 class CreateCornerComponentsDialog(object):
@@ -144,36 +145,38 @@ class CreateCornerComponentsDialog(object):
             
             created_count = 0
             
-            for size in sizes:
-                # Format size for glyph name (remove decimal if whole number)
-                if size == int(size):
-                    size_str = str(int(size))
-                else:
-                    size_str = str(size)
+            with suspendedInterface(font):
+                for size in sizes:
+                    # Format size for glyph name (remove decimal if whole number)
+                    if size == int(size):
+                        size_str = str(int(size))
+                    else:
+                        size_str = str(size)
                 
-                glyph_name = f"_corner.{size_str}x{size_str}"
+                    glyph_name = f"_corner.{size_str}x{size_str}"
                 
-                # Check if glyph already exists
-                existing_glyph = font.glyphs[glyph_name]
-                if existing_glyph:
-                    print(f"⚠️ Glyph '{glyph_name}' already exists, skipping")
-                    continue
+                    # Check if glyph already exists
+                    existing_glyph = font.glyphs[glyph_name]
+                    if existing_glyph:
+                        print(f"⚠️ Glyph '{glyph_name}' already exists, skipping")
+                        continue
                 
-                # Create new glyph
-                new_glyph = GSGlyph(glyph_name)
-                font.glyphs.append(new_glyph)
+                    # Create new glyph
+                    new_glyph = GSGlyph(glyph_name)
+                    font.glyphs.append(new_glyph)
                 
-                # Create the corner path for each master
-                for master in font.masters:
-                    layer = new_glyph.layers[master.id]
-                    layer.width = 0  # Corner components typically have 0 width
+                    with undoGroup(new_glyph):
+                        # Create the corner path for each master
+                        for master in font.masters:
+                            layer = new_glyph.layers[master.id]
+                            layer.width = 0  # Corner components typically have 0 width
                     
-                    # Create and add the corner path
-                    corner_path = self.create_corner_path(size, tension)
-                    layer.paths.append(corner_path)
+                            # Create and add the corner path
+                            corner_path = self.create_corner_path(size, tension)
+                            layer.paths.append(corner_path)
                 
-                print(f"✓ Created '{glyph_name}'")
-                created_count += 1
+                    print(f"✓ Created '{glyph_name}'")
+                    created_count += 1
             
             print()
             if created_count > 0:
@@ -7,6 +7,7 @@ Enable automatic alignment for all components in selected glyphs across all laye
 
 import vanilla
 from GlyphsApp import Glyphs
+from kwb.glyphsAdapter import suspendedInterface, undoGroup
 
 class EnableAutomaticAlignment(object):
     def __init__(self):
@@ -61,20 +62,22 @@ class EnableAutomaticAlignment(object):
             glyphsChanged = []
             componentsChanged = 0
             
-            for glyph in selectedGlyphs:
-                glyphModified = False
+            with suspendedInterface(Font):
+                for glyph in selectedGlyphs:
+                    glyphModified = False
                 
-                # Process all layers of the glyph
-                for layer in glyph.layers:
-                    # Enable automatic alignment for all components in this layer
-                    for component in layer.components:
-                        if not component.automaticAlignment:
-                            component.automaticAlignment = True
-                            componentsChanged += 1
-                            glyphModified = True
+                    with undoGroup(glyph):
+                        # Process all layers of the glyph
+                        for layer in glyph.layers:
+                            # Enable automatic alignment for all components in this layer
+                            for component in layer.components:
+                                if not component.automaticAlignment:
+                                    component.automaticAlignment = True
+                                    componentsChanged += 1
+                                    glyphModified = True
                 
-                if glyphModified:
-                    glyphsChanged.append(glyph.name)
+                    if glyphModified:
+                        glyphsChanged.append(glyph.name)
             
             # Report results
             if glyphsChanged:
@@ -6,6 +6,7 @@ Mirrors the components of the active layer to all other masters, updating any di
 
 import GlyphsApp
 from vanilla import *
+from kwb.glyphsAdapter import suspendedInterface, undoGroup
 
 class MirrorComponentsAcrossMastersDialog(object):
 
@@ -28,44 +29,45 @@ class MirrorComponentsAcrossMastersDialog(object):
             print("No glyph selected")
             return
         
-        for activeLayer in selectedLayers:
-            glyph = activeLayer.parent
-            print(f"Processing glyph: {glyph.name}")
-            print(f"Active layer: {activeLayer.name}")
+        with suspendedInterface(font):
+            for activeLayer in selectedLayers:
+                glyph = activeLayer.parent
+                print(f"Processing glyph: {glyph.name}")
+                print(f"Active layer: {activeLayer.name}")
             
-            # Get the components of the active layer
-            activeComponents = [shape for shape in activeLayer.shapes if isinstance(shape, GSComponent)]
-            print(f"Active layer has {len(activeComponents)} components:")
-            for i, comp in enumerate(activeComponents):
-                print(f"  Component {i+1}: {comp.componentName} at position {comp.position}")
+                with undoGroup(glyph):
+                    # Get the components of the active layer
+                    activeComponents = [shape for shape in activeLayer.shapes if isinstance(shape, GSComponent)]
+                    print(f"Active layer has {len(activeComponents)} components:")
+                    for i, comp in enumerate(activeComponents):
+                        print(f"  Component {i+1}: {comp.componentName} at position {comp.position}")
             
-            for master in font.masters:
-                if master.id == activeLayer.master.id:
-                    print(f"Skipping active master: {master.name}")
-                    continue  # Skip the active master
+                    for master in font.masters:
+                        if master.id == activeLayer.master.id:
+                            print(f"Skipping active master: {master.name}")
+                            continue  # Skip the active master
                 
-                layer = glyph.layers[master.id]
-                print(f"Processing master: {master.name}")
+                        layer = glyph.layers[master.id]
+                        print(f"Processing master: {master.name}")
                 
-                # Log existing components
-                existingComponents = [shape for shape in layer.shapes if isinstance(shape, GSComponent)]
-                print(f"  Before: Layer has {len(existingComponents)} components")
+                        # Log existing components
+                        existingComponents = [shape for shape in layer.shapes if isinstance(shape, GSComponent)]
+                        print(f"  Before: Layer has {len(existingComponents)} components")
                 
-                # Remove all existing shapes (including components)
-                layer.shapes = []
-                print("  Removed all existing shapes")
+                        # Remove all existing shapes (including components)
+                        layer.shapes = []
+                    print("  Removed all existing shapes")
                 
-                # Copy components from active layer
-                for comp in activeComponents:
-                    newComp = comp.copy()
-                    layer.shapes.append(newComp)
-                    print(f"  Added component: {newComp.componentName} at position {newComp.position}")
+                    # Copy components from active layer
+                    for comp in activeComponents:
+                        newComp = comp.copy()
+                        layer.shapes.append(newComp)
+                        print(f"  Added component: {newComp.componentName} at position {newComp.position}")
                 
-                print(f"  After: Layer now has {len(layer.shapes)} shapes")
+                    print(f"  After: Layer now has {len(layer.shapes)} shapes")
             
-            glyph.updateGlyphInfo()
+                glyph.updateGlyphInfo()
 
-        font.enableUpdateInterface()
         print("Mirroring components complete")
         
         if self.w.closeAfter.get():
@@ -6,6 +6,7 @@ Resets the scale of all components in the selected glyph to 100% with options fo
 
 import GlyphsApp
 from vanilla import *
+from kwb.glyphsAdapter import suspendedInterface, undoGroup
 
 class ResetComponentScalesDialog(object):
 
@@ -32,38 +33,39 @@ class ResetComponentScalesDialog(object):
         allMasters = self.w.allMasters.get()
         autoAlign = self.w.autoAlign.get()
         
-        for layer in selectedLayers:
-            glyph = layer.parent
-            print(f"Processing glyph: {glyph.name}")
+        with suspendedInterface(font):
+            for layer in selectedLayers:
+                glyph = layer.parent
+                print(f"Processing glyph: {glyph.name}")
             
-            if allMasters:
-                layers = [glyph.layers[m.id] for m in font.masters]
-            else:
-                layers = [layer]
+                with undoGroup(glyph):
+                    if allMasters:
+                        layers = [glyph.layers[m.id] for m in font.masters]
+                    else:
+                        layers = [layer]
             
-            for l in layers:
-                print(f"  Processing layer: {l.name}")
-                for component in l.components:
-                    initial_scale = component.scale
-                    initial_alignment = component.automaticAlignment
+                    for l in layers:
+                        print(f"  Processing layer: {l.name}")
+                        for component in l.components:
+                            initial_scale = component.scale
+                            initial_alignment = component.automaticAlignment
                     
-                    if component.scale != (1, 1):
-                        print(f"    Resetting component {component.componentName}")
-                        print(f"      Initial scale: {initial_scale}")
-                        component.scale = (1, 1)
-                        print(f"      New scale: {component.scale}")
+                            if component.scale != (1, 1):
+                                print(f"    Resetting component {component.componentName}")
+                                print(f"      Initial scale: {initial_scale}")
+                                component.scale = (1, 1)
+                                print(f"      New scale: {component.scale}")
                     
-                    if autoAlign:
-                        print(f"      Initial automatic alignment: {initial_alignment}")
-                        component.automaticAlignment = True
-                        print(f"      New automatic alignment: {component.automaticAlignment}")
+                            if autoAlign:
+                                print(f"      Initial automatic alignment: {initial_alignment}")
+                                component.automaticAlignment = True
+                                print(f"      New automatic alignment: {component.automaticAlignment}")
                     
-                    if component.scale != (1, 1) or (autoAlign and not component.automaticAlignment):
-                        print(f"    Warning: Failed to update component {component.componentName}")
+                            if component.scale != (1, 1) or (autoAlign and not component.automaticAlignment):
+                                print(f"    Warning: Failed to update component {component.componentName}")
             
-            glyph.updateGlyphInfo()
+                    glyph.updateGlyphInfo()
 
-        font.enableUpdateInterface()
         print("Component scales reset complete")
         
         if self.w.closeAfter.get():
@@ -4,6 +4,7 @@
 
 import vanilla
 import GlyphsApp
+from kwb.glyphsAdapter import suspendedInterface, undoGroup
 
 class ReverseComponentPathDirection(object):
     def __init__(self):
@@ -29,18 +30,20 @@ class ReverseComponentPathDirection(object):
         font = Glyphs.font
         selectedLayers = font.selectedLayers
 
-        for layer in selectedLayers:
-            component = next((c for c in layer.components if c.selected), None)
-            if component:
-                # Toggle the orientation property (-1 or 1)
-                component.attributes['reversePaths'] = False if component.attributes['reversePaths'] == True else True
+        with suspendedInterface(font):
+            for layer in selectedLayers:
+                with undoGroup(layer.parent):
+                    component = next((c for c in layer.components if c.selected), None)
+                    if component:
+                        # Toggle the orientation property (-1 or 1)
+                        component.attributes['reversePaths'] = False if component.attributes['reversePaths'] == True else True
                 
-                # Apply to all masters if checkbox is checked
-                if self.w.applyAllMasters.get():
-                    for masterLayer in font.glyphs[layer.parent.name].layers:
-                        for masterComponent in masterLayer.components:
-                            if masterComponent.name == component.name:
-                                masterComponent.attributes['reversePaths'] = False if masterComponent.attributes['reversePaths'] == True else True
+                        # Apply to all masters if checkbox is checked
+                        if self.w.applyAllMasters.get():
+                            for masterLayer in font.glyphs[layer.parent.name].layers:
+                                for masterComponent in masterLayer.components:
+                                    if masterComponent.name == component.name:
+                                        masterComponent.attributes['reversePaths'] = False if masterComponent.attributes['reversePaths'] == True else True
         
         # Close window if checkbox is checked
         if self.w.closeAfterRun.get():
@@ -7,6 +7,7 @@ Optionally includes inactive instances and can use weight/width classes instead
 
 import vanilla
 from GlyphsApp import Glyphs
+from kwb.fontInfo import axisLocations, instancesToProcess
 
 class SetAxisLocationDialog:
     """Dialog for setting axis location parameters"""
@@ -92,11 +93,10 @@ def set_axis_locations(options):
     print(f"Setting axis locations with options: {options}")
     
     # Get instances to process
+    instances_to_process = instancesToProcess(font, options["includeInactive"])
     if options["includeInactive"]:
-        instances_to_process = font.instances
         print(f"Processing all {len(font.instances)} instances (including inactive)")
     else:
-        instances_to_process = [instance for instance in font.instances if instance.active]
         print(f"Processing {len(instances_to_process)} active instances")
     
     if not instances_to_process:
@@ -105,34 +105,10 @@ def set_axis_locations(options):
     
     # Process each instance
     for instance in instances_to_process:
-        axis_locations = []
-        
-        # Process each axis in the font
-        for i, axis in enumerate(font.axes):
-            axis_name = axis.name
-            axis_tag = axis.axisTag
-            
-            # Determine the value to use for this axis
-            if axis_tag == "wght" and options["setWeightByClass"]:
-                # Use weight class
-                weight_value = get_weight_from_class(instance.weightClass)
-                axis_locations.append(create_axis_location_entry(axis_name, weight_value))
-                print(f"  {instance.name}: {axis_name} = {weight_value} (from weight class {instance.weightClass})")
-                
-            elif axis_tag == "wdth" and options["setWidthByClass"]:
-                # Use width class
-                width_value = get_width_from_class(instance.widthClass)
-                axis_locations.append(create_axis_location_entry(axis_name, width_value))
-                print(f"  {instance.name}: {axis_name} = {width_value} (from width class {instance.widthClass})")
-                
-            else:
-                # Use axis coordinates from instance
-                try:
-                    coord_value = instance.coordinateForAxisIndex_(i)
-                    axis_locations.append(create_axis_location_entry(axis_name, coord_value))
-                    print(f"  {instance.name}: {axis_name} = {coord_value} (from axis coordinates)")
-                except Exception as e:
-                    print(f"  Error getting axis value for {instance.name}, {axis_name}: {e}")
+        axis_locations = [
+            create_axis_location_entry(axis_name, value)
+            for axis_name, value in axisLocations(font, instance, options["setWeightByClass"], options["setWidthByClass"], log=print)
+        ]
         
         # Set the axis location parameter
         if axis_locations:
@@ -148,40 +124,6 @@ def create_axis_location_entry(axis_name, location_value):
     from Foundation import NSDictionary
     return NSDictionary.alloc().initWithObjects_forKeys_((axis_name, location_value), ("Axis", "Location"))
 
-def get_weight_from_class(weight_class):
-    """Convert weight class to weight axis value"""
-    # Standard weight class to weight axis mapping
-    weight_mapping = {
-        100: 100,   # Thin
-        200: 200,   # Extra Light
-        300: 300,   # Light
-        400: 400,   # Regular
-        500: 500,   # Medium
-        600: 600,   # Semi Bold
-        700: 700,   # Bold
-        800: 800,   # Extra Bold
-        900: 900,   # Black
-    }
-    
-    return weight_mapping.get(weight_class, weight_class)
-
-def get_width_from_class(width_class):
-    """Convert width class to width axis value"""
-    # Standard width class to width axis percentage mapping
-    width_mapping = {
-        1: 50,    # Ultra Condensed
-        2: 62.5,  # Extra Condensed
-        3: 75,    # Condensed
-        4: 87.5,  # Semi Condensed
-        5: 100,   # Normal
-        6: 112.5, # Semi Expanded
-        7: 125,   # Expanded
-        8: 150,   # Extra Expanded
-        9: 200,   # Ultra Expanded
-    }
-    
-    return width_mapping.get(width_class, 100)
-
 # Run the script
 if __name__ == "__main__":
     # Check if we have a font open
@@ -2,13 +2,15 @@
 # -*- coding: utf-8 -*-
 from __future__ import division, print_function, unicode_literals
 __doc__ = """
-Takes a list of glyphname1=glyphname2 pairs and swaps glyph names in the font accordingly. When you input "A=A.ss12", A becomes A.ss12 and A.ss12 becomes A. Optionally updates component references.
+Takes a list of glyphname1=glyphname2 pairs and swaps glyph names in the font accordingly. When you input "A=A.ss12", A becomes A.ss12 and A.ss12 becomes A. Optionally updates component references. Preview lists every composite that would change, including ones that only use a swapped glyph through nested components.
 """
 
 import vanilla
 import uuid
 from AppKit import NSFont
 from GlyphsApp import Glyphs
+from kwb.componentIndex import ComponentIndex
+from kwb.glyphsAdapter import suspendedInterface
 
 
 class SwapGlyphNames:
@@ -42,7 +44,8 @@ class SwapGlyphNames:
 		self.w.updateComponents = vanilla.CheckBox((10, -65, 250, 20), "Keep composite glyphs unchanged (maintain old design)", value=self.preferences["updateComponents"], callback=self.savePreferences, sizeStyle="small")
 		self.w.allFonts = vanilla.CheckBox((10, -40, 100, 20), "⚠️ ALL Fonts", value=self.preferences["allFonts"], callback=self.savePreferences, sizeStyle="small")
 
-		# Run Button:
+		# Run Buttons:
+		self.w.previewButton = vanilla.Button((-190, -35, -105, -15), "Preview", callback=self.previewSwap)
 		self.w.runButton = vanilla.Button((-100, -35, -15, -15), "Swap", callback=self.SwapGlyphNamesMain)
 
 		# Open window and focus on it:
@@ -55,6 +58,56 @@ class SwapGlyphNames:
 		self.preferences["allFonts"] = self.w.allFonts.get()
 		self.preferences["updateComponents"] = self.w.updateComponents.get()
 
+	def swapPairs(self):
+		"""glyphname1=glyphname2 lines as (glyphName1, glyphName2) tuples"""
+		swapPairs = []
+		for thisLine in self.preferences["renameList"].splitlines():
+			if thisLine.strip() and "=" in thisLine:
+				parts = thisLine.split("=")
+				if len(parts) == 2:
+					glyphName1 = parts[0].strip()
+					glyphName2 = parts[1].strip()
+					if glyphName1 and glyphName2:
+						swapPairs.append((glyphName1, glyphName2))
+		return swapPairs
+
+	def theseFonts(self):
+		if self.preferences["allFonts"]:
+			return Glyphs.fonts
+		return [Glyphs.font, ]
+
+	def reportDependents(self, componentIndex, swapPairs):
+		"""Prints the composites a swap reaches, directly or through nested components"""
+		swappedNames = set()
+		for glyphName1, glyphName2 in swapPairs:
+			swappedNames.update((glyphName1, glyphName2))
+		reachedFrom = componentIndex.dependents(swappedNames)
+		if not reachedFrom:
+			print("  No composites use the swapped glyphs")
+			return reachedFrom
+		print(f"  Composites affected: {len(reachedFrom)}")
+		for compositeName in sorted(reachedFrom):
+			chain = [compositeName]
+			while chain[-1] in reachedFrom:
+				chain.append(reachedFrom[chain[-1]])
+			print(f"    {' → '.join(chain)}")
+		return reachedFrom
+
+	def previewSwap(self, sender):
+		try:
+			Glyphs.clearLog()
+			self.savePreferences()
+			swapPairs = self.swapPairs()
+			for thisFont in self.theseFonts():
+				print(f"Preview for font: {thisFont.familyName}")
+				self.reportDependents(ComponentIndex().build(thisFont), swapPairs)
+			Glyphs.showMacroWindow()
+		except Exception as e:
+			Glyphs.showMacroWindow()
+			print(f"Swap Glyph Names Error: {e}")
+			import traceback
+			print(traceback.format_exc())
+
 	def SwapGlyphNamesMain(self, sender):
 		try:
 			# clear macro window log:
@@ -63,61 +116,53 @@ class SwapGlyphNames:
 			# update settings to the latest user input:
 			self.savePreferences()
 
-			if self.preferences["allFonts"]:
-				theseFonts = Glyphs.fonts
-			else:
-				theseFonts = [Glyphs.font, ]
+			# Collect all swap pairs first
+			swapPairs = self.swapPairs()
 
-			for thisFont in theseFonts:
+			for thisFont in self.theseFonts():
 				print(f"Processing font: {thisFont.familyName}")
-				
-				# Collect all swap pairs first
-				swapPairs = []
-				for thisLine in self.preferences["renameList"].splitlines():
-					if thisLine.strip() and "=" in thisLine:
-						parts = thisLine.split("=")
-						if len(parts) == 2:
-							glyphName1 = parts[0].strip()
-							glyphName2 = parts[1].strip()
-							if glyphName1 and glyphName2:
-								swapPairs.append((glyphName1, glyphName2))
-
-				# Perform the swaps
-				for glyphName1, glyphName2 in swapPairs:
-					glyph1 = thisFont.glyphs[glyphName1]
-					glyph2 = thisFont.glyphs[glyphName2]
+
+				# index component users while the glyphs still have their old names
+				componentIndex = ComponentIndex().build(thisFont)
+				self.reportDependents(componentIndex, swapPairs)
+
+				with suspendedInterface(thisFont):
+					# Perform the swaps
+					for glyphName1, glyphName2 in swapPairs:
+						glyph1 = thisFont.glyphs[glyphName1]
+						glyph2 = thisFont.glyphs[glyphName2]
 					
-					if glyph1 and glyph2:
-						print(f"Swapping: {glyphName1} ↔ {glyphName2}")
+						if glyph1 and glyph2:
+							print(f"Swapping: {glyphName1} ↔ {glyphName2}")
 						
-						# Create unique temporary name to avoid conflicts
-						tempName = f"__temp_swap_{uuid.uuid4().hex[:8]}"
+							# Create unique temporary name to avoid conflicts
+							tempName = f"__temp_swap_{uuid.uuid4().hex[:8]}"
 						
-						# Perform three-way swap
-						glyph1.name = tempName
-						glyph2.name = glyphName1
-						glyph1.name = glyphName2
+							# Perform three-way swap
+							glyph1.name = tempName
+							glyph2.name = glyphName1
+							glyph1.name = glyphName2
 						
-						# Swap export status
-						glyph1Export = glyph1.export
-						glyph1.export = glyph2.export
-						glyph2.export = glyph1Export
+							# Swap export status
+							glyph1Export = glyph1.export
+							glyph1.export = glyph2.export
+							glyph2.export = glyph1Export
 						
-					elif glyph1 and not glyph2:
-						print(f"Renaming: {glyphName1} → {glyphName2} (target doesn't exist)")
-						glyph1.name = glyphName2
-					elif not glyph1 and glyph2:
-						print(f"Renaming: {glyphName2} → {glyphName1} (source doesn't exist)")
-						glyph2.name = glyphName1
+						elif glyph1 and not glyph2:
+							print(f"Renaming: {glyphName1} → {glyphName2} (target doesn't exist)")
+							glyph1.name = glyphName2
+						elif not glyph1 and glyph2:
+							print(f"Renaming: {glyphName2} → {glyphName1} (source doesn't exist)")
+							glyph2.name = glyphName1
+						else:
+							print(f"Warning: Neither {glyphName1} nor {glyphName2} found in font.")
+
+					# Update components if requested
+					if self.preferences["updateComponents"]:
+						print("Updating component references to maintain old designs...")
+						self.updateComponentReferences(componentIndex, swapPairs)
 					else:
-						print(f"Warning: Neither {glyphName1} nor {glyphName2} found in font.")
-
-				# Update components if requested
-				if self.preferences["updateComponents"]:
-					print("Updating component references to maintain old designs...")
-					self.updateComponentReferences(thisFont, swapPairs)
-				else:
-					print("Component references unchanged - composite glyphs will use new designs automatically")
+						print("Component references unchanged - composite glyphs will use new designs automatically")
 
 			print("Swap operation completed!")
 
@@ -129,7 +174,7 @@ class SwapGlyphNames:
 			import traceback
 			print(traceback.format_exc())
 
-	def updateComponentReferences(self, font, swapPairs):
+	def updateComponentReferences(self, componentIndex, swapPairs):
 		"""Update component references to maintain old designs after glyph name swap"""
 		# Create a mapping of old names to new names
 		nameMapping = {}
@@ -137,19 +182,13 @@ class SwapGlyphNames:
 			nameMapping[name1] = name2
 			nameMapping[name2] = name1
 		
-		# Go through all glyphs and update component references
+		# Only the indexed users of the swapped glyphs are touched
 		# This ensures composite glyphs keep their original appearance
-		componentsUpdated = 0
-		for glyph in font.glyphs:
-			for layer in glyph.layers:
-				for component in layer.components:
-					oldComponentName = component.componentName
-					if oldComponentName in nameMapping:
-						newComponentName = nameMapping[oldComponentName]
-						component.componentName = newComponentName
-						print(f"  Updated component in {glyph.name}: {oldComponentName} → {newComponentName}")
-						componentsUpdated += 1
-		
+		updates = componentIndex.renameBases(nameMapping)
+		for glyph, layer, component, oldComponentName, newComponentName in updates:
+			print(f"  Updated component in {glyph.name}: {oldComponentName} → {newComponentName}")
+		componentsUpdated = len(updates)
+
 		if componentsUpdated > 0:
 			print(f"  Total components updated: {componentsUpdated}")
 		else:
@@ -0,0 +1,68 @@
+#MenuTitle: Compatibility Helper (Font)
+# -*- coding: utf-8 -*-
+__doc__="""
+Runs the Compatibility Helper checks on every glyph of the font and opens the glyphs with issues in a new tab. Glyphs are read in the app; the checks themselves can be spread over worker processes (see com.kylewaynebenson.batch.workers in the README).
+Results are written as JSON lines next to the font file (MyFamily.compatibility.jsonl). Glyphs that have not changed since that report, checked by the same version of the checks, are not checked again.
+"""
+
+import os
+import tempfile
+from GlyphsApp import Glyphs
+from kwb.compatibility import CHECKS, summarizeGlyph, scanFont, readReport, writeReport, reportPathFor
+from kwb.glyphsAdapter import pathFromGS
+
+def read_paths(layer):
+	return [pathFromGS(path) for path in layer.paths]
+
+def summarize(glyph):
+	return summarizeGlyph(glyph, read_paths)
+
+def main():
+	font = Glyphs.font
+
+	if not font:
+		print("⛔️ No font open")
+		return
+
+	if font.filepath:
+		report_path = reportPathFor(font.filepath)
+	else:
+		# unsaved fonts get a fresh report every time
+		report_path = os.path.join(tempfile.gettempdir(), f"{font.familyName}.compatibility.jsonl")
+	previous = readReport(report_path) if font.filepath else {}
+
+	print(f"\n{'='*60}")
+	print(f"Compatibility Check: {font.familyName}, {len(font.glyphs)} glyphs, {len(font.masters)} masters")
+	print(f"{'='*60}\n")
+
+	records, checked_count = scanFont(
+		font.glyphs,
+		summarize,
+		previous=previous,
+		workers=Glyphs.defaults["com.kylewaynebenson.batch.workers"],
+		python=Glyphs.defaults["com.kylewaynebenson.batch.python"],
+		log=print,
+	)
+	writeReport(report_path, records)
+
+	headings = dict((check_name, heading) for check_name, heading, check in CHECKS)
+	failing = [record for record in records if record.get("issues")]
+	for record in failing:
+		print(f"{record['glyph']}:")
+		for issue in record["issues"]:
+			print(f"  ⚠️  {headings.get(issue['check'], issue['check'])}: {issue['message']}")
+
+	print(f"\n{'='*60}")
+	print(f"Checked {checked_count} glyph(s), skipped {len(records) - checked_count} unchanged")
+	if failing:
+		print(f"Found issues in {len(failing)} glyph(s)")
+	else:
+		print("✅ No compatibility issues found!")
+	print(f"Report: {report_path}")
+	print(f"{'='*60}\n")
+
+	if failing:
+		font.newTab("/" + "/".join(record["glyph"] for record in failing))
+
+if __name__ == "__main__":
+	main()
@@ -6,14 +6,12 @@ Count and compare on curve points between layers
 """
 import vanilla.dialogs as vd
 import GlyphsApp
+from kwb import geometry
+from kwb.glyphsAdapter import nodeTypes
 
 def countMyNodes( thisLayer):
-	nodeTotal = 0
-	for thisPath in thisLayer.paths:
-		for thisNode in thisPath.nodes:
-			if (thisNode.type == GSCURVE) or (thisNode.type == LINE):
-				nodeTotal += 1
-	return nodeTotal
+	types = [nodeTypes( thisPath ) for thisPath in thisLayer.paths]
+	return sum( len(t) - t.count(geometry.OFFCURVE) for t in types )
 
 try:
 	font = Glyphs.font
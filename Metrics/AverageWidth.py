@@ -2,42 +2,76 @@
 #Created by Kyle Wayne Benson
 # -*- coding: utf-8 -*-
 __doc__="""
-Figure out the average width of selected glyphs in a layer
+Figure out the average width of selected glyphs, or of the whole font, in
+every master. Also reports median, spread and percentiles per category,
+subcategory, suffix and script, and can save the table as CSV.
 """
 
+import vanilla
 import vanilla.dialogs as vd
 import GlyphsApp
+from GlyphsApp import Glyphs
+from kwb.widthStats import GROUPINGS, ALL, WidthStats, formatTable, writeTable
 
+GROUPING_TITLES = {
+	"category": "Category",
+	"subCategory": "Subcategory",
+	"suffix": "Suffix",
+	"script": "Script",
+}
 
-def averageWidth():
-	Glyphs.clearLog()
-	try:
-		averageWidth = 0
-		count = 0
-		alreadyCheckedGlyphs = []
-		msg_txt = ""
-		for layer in Glyphs.font.selectedLayers:
-			thisGlyph = layer.parent
-			
-			if thisGlyph.name is None: continue
-			if thisGlyph.name == "None": continue
-			if thisGlyph.name in alreadyCheckedGlyphs: continue # this will omitt glyphs.width that was already checked
-			
-			averageWidth += layer.width
-			count += 1
-			print("\t", thisGlyph.name)
-			msg_txt += "'" + str(thisGlyph.name) + "' " + "width: " + str(layer.width) + "\n"
-			print("\t" "Width =>", layer.width)
-			alreadyCheckedGlyphs.append(thisGlyph.name)
-			
-		averageWidth = averageWidth/count
-		print("Average Width =>", averageWidth)
-		msg_txt += "\n\nAverage Width: %s" % averageWidth
-		vd.message(msg_txt)
-
-	except Exception as e:
-		# print error
-		Glyphs.showMacroWindow()
-		print("Change Width Centered Error: %s" % e)
-
-averageWidth()
+
+class AverageWidthDialog(object):
+	def __init__(self):
+		self.w = vanilla.FloatingWindow((260, 250), "Average Width")
+		y = 10
+		self.w.groupLabel = vanilla.TextBox((10, y, 240, 20), "Group by:")
+		for grouping in GROUPINGS:
+			y += 22
+			setattr(self.w, grouping, vanilla.CheckBox((20, y, 230, 20), GROUPING_TITLES[grouping], value=True))
+		y += 32
+		self.w.wholeFont = vanilla.CheckBox((10, y, 240, 20), "Whole font instead of selection", value=False)
+		y += 22
+		self.w.exportingOnly = vanilla.CheckBox((10, y, 240, 20), "Exporting glyphs only", value=True)
+		y += 22
+		self.w.saveReport = vanilla.CheckBox((10, y, 240, 20), "Save report as CSV", value=False)
+		self.w.runButton = vanilla.Button((-90, -30, -10, 20), "Measure", callback=self.averageWidth)
+		self.w.setDefaultButton(self.w.runButton)
+		self.w.open()
+
+	def averageWidth(self, sender):
+		Glyphs.clearLog()
+		try:
+			font = Glyphs.font
+			groupings = [grouping for grouping in GROUPINGS if getattr(self.w, grouping).get()]
+			if self.w.wholeFont.get():
+				glyphs = font.glyphs
+			else:
+				glyphs = [layer.parent for layer in font.selectedLayers if layer.parent]
+			# repeated glyphs in the selection count once
+			stats = WidthStats(font.masters, groupings).collect(glyphs, exportingOnly=self.w.exportingOnly.get())
+			if not stats.glyphNames:
+				Glyphs.showNotification("Average Width", "No glyphs to measure")
+				return
+
+			rows = stats.rows()
+			Glyphs.showMacroWindow()
+			print("\n".join(formatTable(rows)))
+
+			if self.w.saveReport.get():
+				path = vd.putFile(title="Save width report", fileName="%s widths.csv" % font.familyName, fileTypes=["csv"])
+				if path:
+					writeTable(path, rows)
+					print("Report: %s" % path)
+
+			msg = ["%d glyphs" % len(stats.glyphNames), ""]
+			msg += ["%s: average width %.1f, median %.1f" % (row["master"], row["mean"], row["median"]) for row in rows if row["grouping"] == ALL]
+			vd.message("Average Width", "\n".join(msg))
+
+		except Exception as e:
+			# print error
+			Glyphs.showMacroWindow()
+			print("Average Width Error: %s" % e)
+
+
+AverageWidthDialog()
@@ -3,18 +3,21 @@
 # -*- coding: utf-8 -*-
 __doc__="""
 Kind of like a multiplexer, but more boring. Uniformly changes width, but keeps character centered.
+Can also set a width per glyph name pattern, e.g. *.tf = 600 and *.tosf = 580, in every master.
 """
 
 import vanilla
 import GlyphsApp
+from kwb.metrics import applyCenteredWidth, centeredWidthPlan, parseWidthTargets, targetWidth
+from kwb.glyphsAdapter import suspendedInterface, undoGroup
 
 class ChangeWidthCentered( object ):
 	def __init__( self ):
 		# Window 'self.w':
 		windowWidth  = 250
-		windowHeight = 130
+		windowHeight = 290
 		windowWidthResize  = 300 # user can resize width by this value
-		windowHeightResize = 0   # user can resize height by this value
+		windowHeightResize = 300 # user can resize height by this value
 		self.w = vanilla.Window(
 			( windowWidth, windowHeight ), # default window size
 			"Change Width Centered", # window title
@@ -30,6 +33,13 @@ class ChangeWidthCentered( object ):
 
 		self.w.checkBox = vanilla.CheckBox((-120, 40, 0, 20), "All layers", value=False)
 		
+		# Width per glyph name pattern, first match wins:
+		self.w.useTargets = vanilla.CheckBox((15, 70, -15, 20), "Use widths per pattern instead:", value=False, sizeStyle='small', callback=self.toggleTargets )
+		self.w.targets = vanilla.TextEditor( (15, 95, -15, -115), "*.tf = 600\n*.tosf = 580" )
+		self.w.wholeFont = vanilla.CheckBox((15, -110, -15, 20), "Whole font, not just the selection", value=False, sizeStyle='small')
+		self.w.log = vanilla.CheckBox((15, -85, -15, 20), "Log every layer", value=True, sizeStyle='small')
+		self.toggleTargets( self.w.useTargets )
+		
 		# Run Button:
 		self.w.runButton = vanilla.Button((-130, -20-15, -15, -15), "Change Width", sizeStyle='regular', callback=self.changeWidth )
 		self.w.setDefaultButton( self.w.runButton )
@@ -38,36 +48,70 @@ class ChangeWidthCentered( object ):
 		self.w.makeKey()
 
 
+	def toggleTargets( self, sender ):
+		useTargets = bool(sender.get())
+		self.w.newWidth.enable(not useTargets)
+		self.w.targets.enable(useTargets)
+		self.w.wholeFont.enable(useTargets)
+
+
+	def widthEntries( self, font, AllLayers ):
+		"""(glyph, layers, new width) for every glyph to change"""
+		if not self.w.useTargets.get():
+			NewWidth = float(self.w.newWidth.get())
+			entries = []
+			seen = set()
+			for layer in font.selectedLayers:
+				thisGlyph = layer.parent
+				if AllLayers:
+					if thisGlyph.name not in seen:
+						entries.append((thisGlyph, list(thisGlyph.layers), NewWidth))
+				else:
+					entries.append((thisGlyph, [layer], NewWidth))
+				seen.add(thisGlyph.name)
+			return entries
+
+		targets = parseWidthTargets(self.w.targets.get())
+		if self.w.wholeFont.get():
+			glyphs = font.glyphs
+		else:
+			glyphs = []
+			for layer in font.selectedLayers:
+				if layer.parent and layer.parent not in glyphs:
+					glyphs.append(layer.parent)
+		entries = []
+		for thisGlyph in glyphs:
+			NewWidth = targetWidth(thisGlyph.name, targets)
+			if NewWidth is None:
+				continue
+			if AllLayers:
+				layers = list(thisGlyph.layers)
+			else:
+				layers = [thisGlyph.layers[master.id] for master in font.masters]
+			entries.append((thisGlyph, layers, NewWidth))
+		return entries
+
+
 	def changeWidth( self, sender ):
-		NewWidth = float(self.w.newWidth.get())
 		AllLayers = self.w.checkBox.get()
+		Log = self.w.log.get()
+		font = Glyphs.font
 		Glyphs.clearLog()
-		Glyphs.showMacroWindow()
+		if Log:
+			Glyphs.showMacroWindow()
 		try:
-			for layer in Glyphs.font.selectedLayers:
-				thisGlyph = layer.parent
-				print("\n" + thisGlyph.name)
-				allLayers = len(thisGlyph.layers)
-				count = 0
-				if AllLayers == True:
-					for thisLayer in thisGlyph.layers:
-						AddToSides = (NewWidth - thisLayer.width) / 2
-						print("\t%s" % thisLayer.name)
-						print("\t\tCurrent Width => %s" % thisLayer.width)
-						print("\t\tAdded to Sides => %s" % AddToSides)
-						thisLayer.LSB = thisLayer.LSB + AddToSides
-						thisLayer.RSB = thisLayer.RSB + AddToSides
-						print("\t\tNew Width => %s" % thisLayer.width)
-				else:
-					AddToSides = (NewWidth - layer.width) / 2
-					print("\t%s" % layer.name)
-					print("\t\tCurrent Width => %s" % layer.width)
-					print("\t\tAdded to Sides => %s" % AddToSides)
-					layer.LSB = layer.LSB + AddToSides
-					layer.RSB = layer.RSB + AddToSides
-					print("\t\tNew Width => %s" % layer.width)
-				if count == allLayers:
-					thisGlyph.color = 6
+			# every delta is worked out before the first layer changes
+			plan = centeredWidthPlan(self.widthEntries(font, AllLayers))
+			layerCount = 0
+			with suspendedInterface(font):
+				for thisGlyph, changes in plan:
+					with undoGroup(thisGlyph):
+						for thisLayer, AddToSides in changes:
+							if Log:
+								print("%s / %s: %s => %s (%+g each side)" % (thisGlyph.name, thisLayer.name, thisLayer.width, thisLayer.width + 2 * AddToSides, AddToSides))
+							applyCenteredWidth(thisLayer, AddToSides)
+					layerCount += len(changes)
+			print("Changed %d layer(s) in %d glyph(s)" % (layerCount, len(plan)))
 		except Exception as e:
 			# print error
 			Glyphs.showMacroWindow()
@@ -2,12 +2,16 @@
 #Description: Find metrics with specific characteristics and open in tab
 
 import vanilla
-from GlyphsApp import Glyphs, GSGlyph, GSFont
+from GlyphsApp import Glyphs, GSGlyph, GSFont, UPDATEINTERFACE
+from kwb.metricsIndex import MetricsIndex
 
 class FindMetricsDialog:
     def __init__(self):
         # Window dimensions
-        self.w = vanilla.FloatingWindow((300, 270), "Find Metrics")
+        self.w = vanilla.FloatingWindow((300, 350), "Find Metrics")
+        self.index = None
+        self.indexedFont = None
+        self.indexStale = False
         
         # UI elements
         y = 10
@@ -45,39 +49,102 @@ class FindMetricsDialog:
         y+= 25
         self.w.onlyComponents = vanilla.CheckBox((10, y, 280, 20), "Search composite glyphs too")
         
-        y += 35
+        # dividing line
+        y += 30
+        self.w.dividingLine3 = vanilla.HorizontalLine((10, y, 280, 1))
+        
+        # live range: sliders update the match count as they move
+        y += 10
+        self.w.rangeLabel = vanilla.TextBox((10, y, 60, 20), "Range:")
+        self.w.rangeField = vanilla.PopUpButton((70, y, 100, 20), ["LSB", "RSB", "Width"], callback=self.resetRange)
+        self.w.rangeButton = vanilla.Button((200, y, 90, 20), "Find", callback=self.findInRange)
+        y += 28
+        self.w.rangeMin = vanilla.Slider((10, y, 280, 20), minValue=0, maxValue=1, value=0, callback=self.updateRange, continuous=True)
+        y += 22
+        self.w.rangeMax = vanilla.Slider((10, y, 280, 20), minValue=0, maxValue=1, value=1, callback=self.updateRange, continuous=True)
+        y += 25
+        self.w.rangeText = vanilla.TextBox((10, y, 280, 20), "", sizeStyle='small')
+        
+        y += 30
         self.w.statusText = vanilla.TextBox((10, y, 280, 20), "")
         
+        # edits only mark the index stale; the next search catches it up
+        Glyphs.addCallback(self.fontChanged, UPDATEINTERFACE)
+        self.w.bind("close", self.windowClosed)
+        
         self.w.open()
+        self.resetRange(None)
+    
+    def fontChanged(self, notification):
+        self.indexStale = True
+    
+    def windowClosed(self, sender):
+        Glyphs.removeCallback(self.fontChanged)
     
-    def getScope(self):
-        """Determine which glyphs to check based on checkbox selections"""
+    def getIndex(self, refresh=True):
+        """Sidebearing index of the current font, brought up to date if the font was edited since"""
         font = Glyphs.font
+        if self.index is None or self.indexedFont != font:
+            self.index = MetricsIndex().build(font)
+            self.indexedFont = font
+            self.indexStale = False
+        elif refresh and self.indexStale:
+            self.index.refresh(font)
+            self.indexStale = False
+        return self.index
+    
+    def rangeFieldName(self):
+        return ["LSB", "RSB", "width"][self.w.rangeField.get()]
+    
+    def resetRange(self, sender):
+        """Spread the sliders over the values found in the current master"""
+        if not Glyphs.font:
+            return
+        index = self.getIndex()
+        valueRange = index.valueRange(Glyphs.font.selectedFontMaster.id, self.rangeFieldName())
+        low, high = valueRange if valueRange else (0, 1)
+        if high <= low:
+            high = low + 1
+        for slider, value in ((self.w.rangeMin, low), (self.w.rangeMax, high)):
+            slider.setMinValue(low)
+            slider.setMaxValue(high)
+            slider.set(value)
+        self.updateRange(None)
+    
+    def rangeMatches(self, refresh=True):
+        font, scope = self.getScope(refresh)
+        low = round(min(self.w.rangeMin.get(), self.w.rangeMax.get()))
+        high = round(max(self.w.rangeMin.get(), self.w.rangeMax.get()))
+        names = self.index.between(font.selectedFontMaster.id, self.rangeFieldName(), low, high)
+        return low, high, [name for name in names if name in scope]
+    
+    def updateRange(self, sender):
+        # sliders fire continuously, so they query the index without refreshing it
+        low, high, names = self.rangeMatches(refresh=False)
+        self.w.rangeText.set(f"{self.rangeFieldName()} {low} to {high}: {len(names)} glyphs")
+    
+    def findInRange(self, sender):
+        low, high, names = self.rangeMatches()
+        self.openInTab(names)
+    
+    def getScope(self, refresh=True):
+        """Names of the glyphs to check based on checkbox selections"""
+        font = Glyphs.font
+        index = self.getIndex(refresh)
         selectedOnly = self.w.selectedGlyphsOnly.get()
         includeComponents = self.w.onlyComponents.get()
         
         if selectedOnly:
-            glyphs = [layer.parent for layer in font.selectedLayers]
+            names = set(layer.parent.name for layer in font.selectedLayers)
         else:
-            glyphs = font.glyphs
+            names = set(index.hasPaths)
         
-        # Filter out composite glyphs if checkbox is not checked
+        # Filter out composite glyphs if checkbox is not checked:
+        # include a glyph only if it has paths in any layer
         if not includeComponents:
-            filtered_glyphs = []
-            for glyph in glyphs:
-                # Check if any layer has paths (not just components)
-                has_paths = False
-                for layer in glyph.layers:
-                    if len(layer.paths) > 0:
-                        has_paths = True
-                        break
-                
-                # Include glyph if it has paths in any layer
-                if has_paths:
-                    filtered_glyphs.append(glyph)
-            glyphs = filtered_glyphs
-            
-        return font, glyphs
+            names = set(name for name in names if index.hasPaths.get(name))
+            
+        return font, names
     
     def openInTab(self, glyphNames):
         """Open the given glyph names in a new tab"""
@@ -170,11 +237,12 @@ class FindMetricsDialog:
             # Only check the current master
             master = font.selectedFontMaster
             
-            for glyph in glyphs:
-                layer = glyph.layers[master.id]
-                # Only check the selected sides
-                if (checkLeftSide and layer.LSB < value) or (checkRightSide and layer.RSB < value):
-                    matchingGlyphs.append(glyph.name)
+            # Only check the selected sides
+            if checkLeftSide:
+                matchingGlyphs += self.index.smallerThan(master.id, "LSB", value)
+            if checkRightSide:
+                matchingGlyphs += self.index.smallerThan(master.id, "RSB", value)
+            matchingGlyphs = [name for name in matchingGlyphs if name in glyphs]
             
             self.openInTab(matchingGlyphs)
             
@@ -201,11 +269,12 @@ class FindMetricsDialog:
             # Only check the current master
             master = font.selectedFontMaster
             
-            for glyph in glyphs:
-                layer = glyph.layers[master.id]
-                # Only check the selected sides
-                if (checkLeftSide and layer.LSB > value) or (checkRightSide and layer.RSB > value):
-                    matchingGlyphs.append(glyph.name)
+            # Only check the selected sides
+            if checkLeftSide:
+                matchingGlyphs += self.index.largerThan(master.id, "LSB", value)
+            if checkRightSide:
+                matchingGlyphs += self.index.largerThan(master.id, "RSB", value)
+            matchingGlyphs = [name for name in matchingGlyphs if name in glyphs]
             
             self.openInTab(matchingGlyphs)
             
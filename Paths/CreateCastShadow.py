@@ -5,8 +5,13 @@ __doc__="""
 Replace each selected glyphs with a cast shadow
 """
 
+import math
 import vanilla
 import GlyphsApp
+from kwb import geometry
+from kwb.nodeCleanup import cleanPaths
+from kwb.sweep import castShadowPieces
+from kwb.glyphsAdapter import pathFromGS, pathToGS, layerSnapshot, writeSnapshot, removeSnapshotNodes, removePaths, suspendedInterface, undoGroup, appProfiler, gsNodeCount
 
 class CastShadow( object ):
 	def __init__( self ):
@@ -36,6 +41,8 @@ class CastShadow( object ):
 
 		self.w.text_5 = vanilla.TextBox( (-110, 90, 52, 20), "Gap:", sizeStyle='regular' )
 		self.w.gap = vanilla.EditText( (-70, 90-1, 50, 21), "0", sizeStyle='regular' )
+
+		self.w.sweep = vanilla.CheckBox( (15, 120, -15, 20), "Sweep extrusion (fast, exact)", value=True, sizeStyle='small' )
 		
 		
 		# Run Button:
@@ -48,45 +55,50 @@ class CastShadow( object ):
 
 	
 	def deleteStrayPoints( self, thisLayer):
-		for i in range(len(thisLayer.paths))[::-1]:
-			thisPath = thisLayer.paths[i]
-			for a, b in zip(thisPath.nodes, thisPath.nodes[1:]):
-				if (int(a.x) == int(b.x)) & ((abs(int(a.y) - int(b.y)) == 1) | (abs(int(b.y) - int(a.y)) == 1)):
-					thisPath.removeNodeCheckKeepShape_(b)
-			for a, b in zip(thisPath.nodes, thisPath.nodes[1:]):
-				if (a.type == b.type): 
-					if (int(a.x) == int(b.x)) & (int(a.y) == int(b.y)):
-						thisPath.removeNodeCheckKeepShape_(b)
+		# plan every deletion on the snapshot, then write the layer back in one go
+		snapshot = layerSnapshot( thisLayer )
+		paths, dropped, removedNodes = cleanPaths( [path for thisPath, path, nodes in snapshot] )
+		writeSnapshot( snapshot, paths )
+		removePaths( thisLayer, dropped )
+
 	#This section modified from Mekkablue thread https://forum.glyphsapp.com/t/suggestion-reduce-points-command/3490/2
 	def cleanUpPath( self, thisLayer, threshold ):
 		if threshold > 12:
 			threshold = 12
 		for t in range(3):
-			for i in range(len(thisLayer.paths))[::-1]:
-				thisPath = thisLayer.paths[i]
-				pathlength = len(thisPath)
+			for thisPath, path, nodes in layerSnapshot( thisLayer ):
+				types, coords = path.types, path.coords
+				pathlength = len(nodes)
+				removals = []
+				# removing a node changes its neighbours, so within one pass
+				# only nodes below the previous neighbour of the last removal qualify
+				limit, floor = pathlength, 0
 				for i in range(pathlength)[::-1]:
-					n = thisPath.nodes[i]
-					previousNode = None
-					if i > 0:
-						previousNode = thisPath.nodes[i-1]
-						if previousNode.type == 65 and i > 2:
-							previousNode = thisPath.nodes[i-3]
-
-					nextNode = None
-					if i < pathlength:
-						nextNode = thisPath.nodes[i+1]
-						if nextNode.type == 65 and i < pathlength-2:
-							nextNode = thisPath.nodes[(i+3)%pathlength]
-
-					if nextNode and previousNode:
-						nextDistance = distance(nextNode.position, n.position)
-						previousDistance = distance(previousNode.position, n.position)
-						nextDistanceIsSmall = previousDistance < threshold
-						previousDistanceIsSmall = nextDistance < threshold
-				
-						if (nextDistanceIsSmall and previousDistanceIsSmall):
-							thisPath.removeNodeCheckKeepShape_( n )
+					if i >= limit or i <= floor:
+						continue
+					previousIndex = i - 1
+					if types[previousIndex] == geometry.OFFCURVE and i > 2:
+						previousIndex = i - 3
+
+					if i + 1 < pathlength:
+						nextIndex = i + 1
+					elif path.closed:
+						nextIndex = 0
+					else:
+						continue
+					if types[nextIndex] == geometry.OFFCURVE and i < pathlength-2:
+						nextIndex = (i+3) % pathlength
+
+					x, y = coords[2*i], coords[2*i+1]
+					nextDistance = math.hypot(coords[2*nextIndex] - x, coords[2*nextIndex+1] - y)
+					previousDistance = math.hypot(coords[2*previousIndex] - x, coords[2*previousIndex+1] - y)
+					if nextDistance < threshold and previousDistance < threshold:
+						removals.append( i )
+						limit = previousIndex
+						if nextIndex < i:
+							# the neighbour wrapped around to the start of the path
+							floor = nextIndex
+				removeSnapshotNodes( thisPath, nodes, removals )
 
 
 	def CastShadowMain( self, sender ):
@@ -100,82 +112,105 @@ class CastShadow( object ):
 		offsetY = float(self.w.offset.get())
 		shadowLen = int(max(abs(yAxis), abs(xAxis)))
 		distance = int(self.w.gap.get())
+		sweep = self.w.sweep.get()
 		glyphsChanged = []
 		try:
 
-			for thisLayer in selectedLayers:
-
-				glyphsChanged.append( thisLayer.parent.name )
-				thisLayer.parent.beginUndo() # wrapper for undo function
-
-				thisLayer.decomposeComponents() # decompose components
-				thisLayer.correctPathDirection() # double counter (B and 8) get missed here?
-				thisLayer.correctPathDirection() # single counters (D O) get bad now too
-
-				addPathList = NSMutableArray.array()
-				prePathList = NSMutableArray.array()
+			profiler = appProfiler("Create Cast Shadow")
+			with profiler, suspendedInterface(Font): # suppresses UI updates in Font View
+				for thisLayer in selectedLayers:
+
+					glyphName = thisLayer.parent.name
+					glyphsChanged.append( glyphName )
+					nodes = lambda: gsNodeCount( thisLayer )
+					with undoGroup(thisLayer.parent): # wrapper for undo function
+						with profiler.stage( "decompose", glyphName, nodes ):
+							thisLayer.decomposeComponents() # decompose components
+							thisLayer.correctPathDirection() # double counter (B and 8) get missed here?
+							thisLayer.correctPathDirection() # single counters (D O) get bad now too
+
+						addPathList = NSMutableArray.array()
+						prePathList = NSMutableArray.array()
 				
-				#save original outline
-				for thisPath in thisLayer.paths:
-					prePathList.append( thisPath )
-
-				for thisPath in thisLayer.paths:
-					count = 1 + distance
-					for i in range(shadowLen):
-						newPath = GSPath()
-						#each layer of the cast shadow
-						for n in thisPath.nodes:
-							newNode = GSNode()
-							# print "new guy \n"
-							# print thisNode.x, thisNode.y
-							if xAxis < 0:
-								setX = n.x - count
-							if yAxis < 0:
-								setY = n.y - count
-							if xAxis > 0:
-								setX = n.x + count
-							if yAxis > 0:
-								setY = n.y + count
-							newNode.type = n.type
-							newNode.setPosition_((setX, setY))
-							newPath.addNode_( newNode )
-						#add shadow stack duplicate array
-						newPath.closed = thisPath.closed
-						addPathList.append( newPath )
-						count += 1
+						#save original outline
+						for thisPath in thisLayer.paths:
+							prePathList.append( thisPath )
+
+						with profiler.stage( "sweep" if sweep else "stack", glyphName ):
+							if sweep:
+								# the stacked copies run from (1+gap) to (shadowLen+gap) units along the diagonal,
+								# so shift once to the first copy and sweep its silhouette across the rest
+								dirX = (xAxis > 0) - (xAxis < 0)
+								dirY = (yAxis > 0) - (yAxis < 0)
+								startX, startY = dirX * (1 + distance), dirY * (1 + distance)
+								sweepX, sweepY = dirX * (shadowLen - 1), dirY * (shadowLen - 1)
+								for path in castShadowPieces( [pathFromGS( p ) for p in prePathList], startX, startY, sweepX, sweepY ):
+									addPathList.append( pathToGS( path ) )
+							else:
+								for thisPath in thisLayer.paths:
+									count = 1 + distance
+									for i in range(shadowLen):
+										newPath = GSPath()
+										#each layer of the cast shadow
+										for n in thisPath.nodes:
+											newNode = GSNode()
+											# print "new guy \n"
+											# print thisNode.x, thisNode.y
+											if xAxis < 0:
+												setX = n.x - count
+											if yAxis < 0:
+												setY = n.y - count
+											if xAxis > 0:
+												setX = n.x + count
+											if yAxis > 0:
+												setY = n.y + count
+											newNode.type = n.type
+											newNode.setPosition_((setX, setY))
+											newPath.addNode_( newNode )
+										#add shadow stack duplicate array
+										newPath.closed = thisPath.closed
+										addPathList.append( newPath )
+										count += 1
 				
-				#merge shadow into path
-				for thisPath in addPathList:
-					thisLayer.addPath_( thisPath )
-
-				thisLayer.removeOverlap()
-				self.deleteStrayPoints( thisLayer )
-				self.cleanUpPath( thisLayer, shadowLen )
-
-				#offset shadow
-				if (offsetX != 0) & (offsetY != 0): #setting stroke thickness
-					self.offsetCurveFilter.offsetLayer_offsetX_offsetY_makeStroke_position_error_shadow_( thisLayer, offsetX, offsetY, False, 0.5, None, None )
-
-				self.deleteStrayPoints( thisLayer )
-
-				#reverse shadow
-				for thisPath in thisLayer.paths:
-					thisPath.reverse()
+						#merge shadow into path
+						with profiler.stage( "removeOverlap", glyphName, nodes ):
+							for thisPath in addPathList:
+								thisLayer.addPath_( thisPath )
+							thisLayer.removeOverlap()
+						with profiler.stage( "deleteStrayPoints", glyphName, nodes ):
+							self.deleteStrayPoints( thisLayer )
+						if not sweep:
+							# smooths the stair-stepping left by the stacked copies, the sweep has none
+							with profiler.stage( "cleanUpPath", glyphName, nodes ):
+								self.cleanUpPath( thisLayer, shadowLen )
+
+						#offset shadow
+						if (offsetX != 0) & (offsetY != 0): #setting stroke thickness
+							with profiler.stage( "offset", glyphName, nodes ):
+								self.offsetCurveFilter.offsetLayer_offsetX_offsetY_makeStroke_position_error_shadow_( thisLayer, offsetX, offsetY, False, 0.5, None, None )
+
+						with profiler.stage( "deleteStrayPoints", glyphName, nodes ):
+							self.deleteStrayPoints( thisLayer )
+
+						with profiler.stage( "punchOut", glyphName, nodes ):
+							#reverse shadow
+							for thisPath in thisLayer.paths:
+								thisPath.reverse()
 				
-				#punch out the old drawing
-				pathOp.removeOverlapPaths_error_( prePathList, None)
-				for thisPath in prePathList:
-					thisLayer.addPath_( thisPath )
+							#punch out the old drawing
+							pathOp.removeOverlapPaths_error_( prePathList, None)
+							for thisPath in prePathList:
+								thisLayer.addPath_( thisPath )
 				
-				thisLayer.correctPathDirection()
-				thisLayer.parent.endUndo() # wrapper for undo function
+							thisLayer.correctPathDirection()
 
-			print "Created cast shadow for these glyphs:", glyphsChanged
+			print("Created cast shadow for these glyphs:", glyphsChanged)
+			profiler.report(print)
 		
 
-		except Exception, e:
+		except Exception as e:
 			# print error
 			Glyphs.showMacroWindow()
-			print "Create Cast Shadow Error: %s" % e
+			print("Create Cast Shadow Error: %s" % e)
 
 CastShadow()
\ No newline at end of file
@@ -9,6 +9,10 @@ import vanilla
 from vanilla import *
 import GlyphsApp
 from GlyphsApp import Glyphs, GSLayer, GSPath, GSNode
+from kwb import booleans
+from kwb.geometry import Layer
+from kwb.profiling import Profiler
+from kwb.glyphsAdapter import pathFromGS, pathToGS, appOutlineCache, CleanOutlines, offsetAndClean, morphologicalOpen, suspendedInterface, undoGroup, appProfiler, gsNodeCount
 
 class HandtoolEffect(object):
     def __init__(self):
@@ -65,6 +69,8 @@ class HandtoolEffect(object):
         
         YOffset += 25
 
+        self.w.useCache = vanilla.CheckBox((15, YOffset, -15, 20), "Reuse results for unchanged glyphs", value=True)
+
         # Run Button:
         self.w.runButton = vanilla.Button((-130, -20-15, -15, -15), "Create Handtool", 
             sizeStyle='regular', callback=self.HandtoolMain)
@@ -74,41 +80,6 @@ class HandtoolEffect(object):
         self.w.open()
         self.w.makeKey()
     
-    def applyOffsetToPaths(self, paths, offsetValue):
-        """Apply offset to paths and return new paths"""
-        from Foundation import NSClassFromString
-        OffsetCurveFilter = NSClassFromString("GlyphsFilterOffsetCurve")
-        
-        newPaths = []
-        for path in paths:
-            # offsetPath returns a list of new paths
-            result = OffsetCurveFilter.offsetPath_offsetX_offsetY_makeStroke_position_objects_capStyleStart_capStyleEnd_(
-                path, 
-                offsetValue, 
-                offsetValue, 
-                False,  # makeStroke = False for pure offset
-                0.5,    # position
-                False,  # objects
-                0,      # capStyleStart
-                0       # capStyleEnd
-            )
-            if result:
-                for newPath in result:
-                    newPaths.append(newPath)
-        
-        return newPaths
-    
-    def removeSmallPaths(self, paths, areaThreshold):
-        """Remove paths with area below threshold"""
-        filteredPaths = []
-        for path in paths:
-            pathArea = abs(path.area())
-            if pathArea >= areaThreshold:
-                filteredPaths.append(path)
-            else:
-                print("  Removing small artifact path with area: %f" % pathArea)
-        return filteredPaths
-
     def HandtoolMain(self, sender):
         try:
             Font = Glyphs.font
@@ -133,6 +104,16 @@ class HandtoolEffect(object):
             print("Using area threshold: %f" % areaThreshold)
             
             allMasters = self.w.allMasters.get()
+            cache = appOutlineCache() if self.w.useCache.get() else None
+            # shared base glyphs are cleaned once, however many composites use them
+            cleanOutlines = CleanOutlines(cache)
+            params = {
+                "thinnestPart": thinnestPart,
+                "borderSize": borderSize,
+                "shadowX": shadowX,
+                "shadowY": shadowY,
+            }
+            reusedCount = 0
             
             glyphsChanged = []
             
@@ -148,199 +129,61 @@ class HandtoolEffect(object):
                 Glyphs.showNotification("Handtool Effect", "No glyphs selected")
                 return
             
-            for glyph in selectedGlyphs:
-                glyphsChanged.append(glyph.name)
+            profiler = appProfiler("Create Handtooled")
+            with profiler, suspendedInterface(Font):
+                for glyph in selectedGlyphs:
+                    glyphsChanged.append(glyph.name)
                 
-                for master in masters:
-                    srcLayer = glyph.layers[master.id]
-
-                    if len(srcLayer.paths) == 0 and len(srcLayer.components) == 0:
-                        continue
-
-                    # 1) Start with cleaned outline - decompose everything including corner components
-                    baseLayer = srcLayer.copy()
-                    
-                    # Method 1: Try decomposeCorners (Glyphs 3.2+)
-                    if hasattr(baseLayer, 'decomposeCorners'):
-                        try:
-                            baseLayer.decomposeCorners()
-                        except:
-                            pass
-                    
-                    # Method 2: Decompose regular components
-                    if baseLayer.components:
-                        try:
-                            baseLayer.decomposeComponents()
-                        except:
-                            pass
-                    
-                    # Method 3: Use flattenOutlines if available - this handles all special components
-                    if hasattr(baseLayer, 'flattenOutlines'):
-                        try:
-                            baseLayer.flattenOutlines()
-                        except:
-                            pass
-                    
-                    # If still no paths, skip this glyph
-                    if len(baseLayer.paths) == 0:
-                        print(f"Warning: {glyph.name} has no paths after decomposition, skipping")
-                        continue
-                    
-                    baseLayer.removeOverlap()
-                    baseLayer.correctPathDirection()
-
-                    # Store cleaned paths (keep original clean for final outline)
-                    cleanPaths = [p.copy() for p in baseLayer.paths]
-
-                    # 2) Create inset version for the shadow boundary
-                    # First, smooth out thin parts using thinnestPart value
-                    print("Smoothing thin parts for inset: offset in by %f, then out by %f" % (thinnestPart, thinnestPart))
-                    
-                    thinnestPartHalf = thinnestPart / 2.0
-                    # Start with clean paths for smoothing
-                    smoothPaths = self.applyOffsetToPaths(cleanPaths, -thinnestPartHalf)
-                    
-                    # Create temp layer for cleanup
-                    tempLayer = GSLayer()
-                    for p in smoothPaths:
-                        tempLayer.paths.append(p)
-                    tempLayer.removeOverlap()
-                    tempLayer.correctPathDirection()
-                    smoothPaths = [p.copy() for p in tempLayer.paths]
-                    
-                    # Clean up small artifacts after first offset
-                    print("Cleaning artifacts after inward offset")
-                    smoothPaths = self.removeSmallPaths(smoothPaths, areaThreshold)
-                    
-                    # Then offset outward by thinnestPart to restore size
-                    smoothPaths = self.applyOffsetToPaths(smoothPaths, thinnestPartHalf)
-                    
-                    # Create temp layer for final cleanup
-                    tempLayer2 = GSLayer()
-                    for p in smoothPaths:
-                        tempLayer2.paths.append(p)
-                    tempLayer2.removeOverlap()
-                    tempLayer2.correctPathDirection()
-                    smoothedPaths = [p.copy() for p in tempLayer2.paths]
-                    
-                    # Clean up small artifacts after second offset
-                    print("Cleaning artifacts after outward offset")
-                    smoothedPaths = self.removeSmallPaths(smoothedPaths, areaThreshold)
-                    
-                    # Now apply the actual border inset to the smoothed paths
-                    insetLayer = GSLayer()
-                    
-                    # Apply offset to the smoothed paths
-                    insetValue = -borderSize
-                    print("Applying inset offset: %f" % insetValue)
-                    
-                    insetPaths = self.applyOffsetToPaths(smoothedPaths, insetValue)
-                    
-                    # Add the offset paths to the layer
-                    for p in insetPaths:
-                        insetLayer.paths.append(p)
-                    
-                    insetLayer.removeOverlap()
-                    insetLayer.correctPathDirection()
-                    insetPaths = [p.copy() for p in insetLayer.paths]
-                    
-                    # Clean up small artifacts from final inset
-                    print("Cleaning artifacts after final inset")
-                    insetPaths = self.removeSmallPaths(insetPaths, areaThreshold)
-
-                    # 3) Create inner shadow by shifting the original shape
-                    shadowLayer = GSLayer()
-                    for p in cleanPaths:
-                        shadowPath = p.copy()
-                        for node in shadowPath.nodes:
-                            node.position = (node.position.x + shadowX, node.position.y + shadowY)
-                        shadowLayer.paths.append(shadowPath)
-
-                    # 4) Crop shadow to the part between original and inset
-                    # Get bounds of all paths to create a big rectangle
-                    margin = 400
-                    allNodes = []
-                    for p in cleanPaths:
-                        for node in p.nodes:
-                            allNodes.append(node.position)
-                    for p in shadowLayer.paths:
-                        for node in p.nodes:
-                            allNodes.append(node.position)
-                    
-                    if allNodes:
-                        minX = min(n.x for n in allNodes) - margin
-                        maxX = max(n.x for n in allNodes) + margin
-                        minY = min(n.y for n in allNodes) - margin
-                        maxY = max(n.y for n in allNodes) + margin
-                        
-                        # Create big rectangle (clockwise = filled)
-                        bigRect = GSPath()
-                        bigRect.closed = True
-                        bigRect.nodes = [
-                            GSNode((minX, minY)),
-                            GSNode((maxX, minY)),
-                            GSNode((maxX, maxY)),
-                            GSNode((minX, maxY))
-                        ]
-                        
-                        # Create mask layer: big rect + reversed inset (inset becomes a hole)
-                        maskLayer = GSLayer()
-                        maskLayer.paths.append(bigRect)
-                        for p in insetPaths:
-                            holePath = p.copy()
-                            holePath.reverse()
-                            maskLayer.paths.append(holePath)
-                        maskLayer.removeOverlap()
-                        maskLayer.correctPathDirection()
-                        
-                        # Intersect shadow with mask
-                        visibleShadowLayer = GSLayer()
-                        
-                        # Add shadow
-                        for p in shadowLayer.paths:
-                            visibleShadowLayer.paths.append(p.copy())
-                        
-                        # Add mask
-                        for p in maskLayer.paths:
-                            visibleShadowLayer.paths.append(p.copy())
-                        
-                        visibleShadowLayer.removeOverlap()
-                        
-                        # Now subtract the mask (reversed) to keep only shadow part
-                        for p in maskLayer.paths:
-                            cutPath = p.copy()
-                            cutPath.reverse()
-                            visibleShadowLayer.paths.append(cutPath)
-                        
-                        visibleShadowLayer.removeOverlap()
-                        
-                        innerShadowPaths = [p.copy() for p in visibleShadowLayer.paths]
-                    else:
-                        innerShadowPaths = []
-
-                    # 5) Build final layer: original outline + visible shadow
-                    finalLayer = GSLayer()
-                    # Add inner shadow paths
-                    for p in innerShadowPaths:
-                        finalLayer.paths.append(p.copy())
-
-                    # Add the original clean outline
-                    for p in cleanPaths:
-                        finalLayer.paths.append(p.copy())
-
-                    finalLayer.correctPathDirection()
-                    
-                    # Copy attributes and replace layer
-                    finalLayer.layerId = srcLayer.layerId
-                    finalLayer.associatedMasterId = srcLayer.associatedMasterId
-                    finalLayer.width = srcLayer.width
-                    
-                    glyph.layers[master.id] = finalLayer
+                    with undoGroup(glyph):
+                        for master in masters:
+                            srcLayer = glyph.layers[master.id]
+
+                            if len(srcLayer.paths) == 0 and len(srcLayer.components) == 0:
+                                continue
+
+                            finalLayer = GSLayer()
+
+                            # Unchanged outline with the same settings: reuse the last result
+                            cachedLayer = None
+                            if cache:
+                                with profiler.stage("cacheLookup", glyph.name):
+                                    resultKey = cache.resultKey("handtooled", cleanOutlines.fingerprint(srcLayer), params)
+                                    cachedLayer = cache.get(resultKey)
+
+                            if cachedLayer is not None:
+                                for p in cachedLayer.paths:
+                                    finalLayer.paths.append(pathToGS(p))
+                                reusedCount += 1
+                            else:
+                                # 1) Start with cleaned outline - decompose everything including corner components
+                                with profiler.stage("cleanOutline", glyph.name, lambda: sum(len(p.nodes) for p in cleanPaths)):
+                                    cleanPaths = [pathToGS(p) for p in cleanOutlines.paths(srcLayer)]
+                                if not cleanPaths:
+                                    print(f"Warning: {glyph.name} has no paths after decomposition, skipping")
+                                    continue
+                                for p in self.handtooledPaths(cleanPaths, thinnestPart, borderSize, shadowX, shadowY, areaThreshold, profiler, glyph.name):
+                                    finalLayer.paths.append(p)
+                                finalLayer.correctPathDirection()
+                                if cache:
+                                    cache.put(resultKey, Layer([pathFromGS(p) for p in finalLayer.paths]))
+                    
+                            # Copy attributes and replace layer
+                            finalLayer.layerId = srcLayer.layerId
+                            finalLayer.associatedMasterId = srcLayer.associatedMasterId
+                            finalLayer.width = srcLayer.width
+                    
+                            glyph.layers[master.id] = finalLayer
             
+            print("Cleaned %d outline(s), reused %d" % (cleanOutlines.cleaned, cleanOutlines.reused))
+            if cache:
+                print("Reused %d cached result(s)" % reusedCount)
+                cache.trim()
+
             # Report results
             if glyphsChanged:
                 print("Created handtool effect for: %s" % ", ".join(glyphsChanged))
                 Glyphs.showNotification("Handtool Effect", "Applied to %d glyph(s)" % len(glyphsChanged))
+            profiler.report(print)
                 
         except Exception as e:
             # Print error
@@ -349,5 +192,44 @@ class HandtoolEffect(object):
             import traceback
             print(traceback.format_exc())
 
+    def handtooledPaths(self, cleanPaths, thinnestPart, borderSize, shadowX, shadowY, areaThreshold, profiler=None, glyphName=None):
+        """Inner shadow paths cropped to the border, followed by copies of the clean outline"""
+        if profiler is None:
+            profiler = Profiler("Create Handtooled", enabled=False)
+        # One working layer holds the outline through every offset and cleanup
+        workLayer = GSLayer()
+        nodes = lambda: gsNodeCount(workLayer)
+
+        # 2) Create inset version for the shadow boundary
+        # First, smooth out thin parts using thinnestPart value
+        print("Smoothing thin parts for inset: offset in by %f, then out by %f" % (thinnestPart, thinnestPart))
+        with profiler.stage("smoothThinParts", glyphName, nodes):
+            morphologicalOpen(workLayer, thinnestPart, areaThreshold, log=print, sourcePaths=cleanPaths)
+        
+        # Now apply the actual border inset to the smoothed paths
+        print("Applying inset offset: %f" % -borderSize)
+        with profiler.stage("inset", glyphName, nodes):
+            offsetAndClean(workLayer, -borderSize, areaThreshold, log=print)
+        insetPaths = workLayer.paths
+
+        # 3) Create inner shadow by shifting the original shape
+        with profiler.stage("shift", glyphName):
+            shadowPaths = []
+            for p in cleanPaths:
+                shadowPath = p.copy()
+                for node in shadowPath.nodes:
+                    node.position = (node.position.x + shadowX, node.position.y + shadowY)
+                shadowPaths.append(shadowPath)
+
+        # 4) Crop shadow to the inset
+        with profiler.stage("crop", glyphName):
+            innerShadowPaths = booleans.intersect(shadowPaths, insetPaths)
+
+        # 5) Final paths: visible shadow + original outline
+        finalPaths = list(innerShadowPaths)
+        finalPaths += [p.copy() for p in cleanPaths]
+        return finalPaths
+
+
 # Run the script
 HandtoolEffect()
\ No newline at end of file
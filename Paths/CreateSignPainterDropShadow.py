@@ -95,62 +95,67 @@ class DropShadow( object ):
 		glyphsChanged = []
 		try:
 
-			for thisLayer in selectedLayers:
-
-				glyphsChanged.append( thisLayer.parent.name )
-				thisLayer.parent.beginUndo() # wrapper for undo function
-
-				thisLayer.correctPathDirection() #
-				thisLayer.correctPathDirection() #
-				thisLayer.correctPathDirection() #
-
-				shadowPathList = NSMutableArray.array()
-				prePathList = NSMutableArray.array()
+			Font.disableUpdateInterface() # suppresses UI updates in Font View
+			try:
+				for thisLayer in selectedLayers:
+
+					glyphsChanged.append( thisLayer.parent.name )
+					thisLayer.parent.beginUndo() # wrapper for undo function
+					try:
+						thisLayer.correctPathDirection() #
+						thisLayer.correctPathDirection() #
+						thisLayer.correctPathDirection() #
+
+						shadowPathList = NSMutableArray.array()
+						prePathList = NSMutableArray.array()
 				
-				#save original outline
-				for thisPath in thisLayer.paths:
-					newPath = GSPath()
-					for n in thisPath.nodes:
-						newNode = GSNode()
-						setX = n.x + xAxis
-						setY = n.y + yAxis
-						newNode.type = n.type
-						newNode.setPosition_((setX, setY))
-						newPath.addNode_( newNode )
-					newPath.closed = thisPath.closed
-					shadowPathList.append( newPath )
-					prePathList.append( thisPath )
-
-				self.offsetCurveFilter.offsetLayer_offsetX_offsetY_makeStroke_position_error_shadow_( thisLayer, round(offsetX*1.5), round(offsetY*1.5), False, 0.5, None, None )
-
-				for thisPath in thisLayer.paths:
-					shadowPathList.append( thisPath )
-
-				pathOp.removeOverlapPaths_error_( shadowPathList, None)
-
-				#reverse shadow
-				for thisPath in thisLayer.paths:
-					thisPath.reverse()
-
-				#punch out the old drawing
-				for shadowPath in shadowPathList:
-					thisLayer.addPath_( shadowPath )
-
-				thisLayer.removeOverlap()
-				self.removeTinyPaths( thisLayer , max(xAxis,yAxis) )
-				thisLayer.removeOverlap()
-				self.roundCorner( thisLayer , goopy )
-				self.offsetCurveFilter.offsetLayer_offsetX_offsetY_makeStroke_position_error_shadow_( thisLayer, round(goopy/2), round(goopy/2), False, 0.5, None, None )
-				self.removeTinyPaths( thisLayer , max(xAxis,yAxis)*10 )
-				self.roundCorner( thisLayer , goopy*2 )
-
-				if (self.w.checkBox.get() == True):
-					for prePath in prePathList:
-						thisLayer.addPath_( prePath )
-
-
-				thisLayer.correctPathDirection()
-				thisLayer.parent.endUndo() # wrapper for undo function
+						#save original outline
+						for thisPath in thisLayer.paths:
+							newPath = GSPath()
+							for n in thisPath.nodes:
+								newNode = GSNode()
+								setX = n.x + xAxis
+								setY = n.y + yAxis
+								newNode.type = n.type
+								newNode.setPosition_((setX, setY))
+								newPath.addNode_( newNode )
+							newPath.closed = thisPath.closed
+							shadowPathList.append( newPath )
+							prePathList.append( thisPath )
+
+						self.offsetCurveFilter.offsetLayer_offsetX_offsetY_makeStroke_position_error_shadow_( thisLayer, round(offsetX*1.5), round(offsetY*1.5), False, 0.5, None, None )
+
+						for thisPath in thisLayer.paths:
+							shadowPathList.append( thisPath )
+
+						pathOp.removeOverlapPaths_error_( shadowPathList, None)
+
+						#reverse shadow
+						for thisPath in thisLayer.paths:
+							thisPath.reverse()
+
+						#punch out the old drawing
+						for shadowPath in shadowPathList:
+							thisLayer.addPath_( shadowPath )
+
+						thisLayer.removeOverlap()
+						self.removeTinyPaths( thisLayer , max(xAxis,yAxis) )
+						thisLayer.removeOverlap()
+						self.roundCorner( thisLayer , goopy )
+						self.offsetCurveFilter.offsetLayer_offsetX_offsetY_makeStroke_position_error_shadow_( thisLayer, round(goopy/2), round(goopy/2), False, 0.5, None, None )
+						self.removeTinyPaths( thisLayer , max(xAxis,yAxis)*10 )
+						self.roundCorner( thisLayer , goopy*2 )
+
+						if (self.w.checkBox.get() == True):
+							for prePath in prePathList:
+								thisLayer.addPath_( prePath )
+
+
+						thisLayer.correctPathDirection()
+					finally:
+						thisLayer.parent.endUndo() # wrapper for undo function
+			finally:
+				Font.enableUpdateInterface() # re-enables UI updates even if a glyph fails
 
 			print "Created drop shadow for these glyphs:", glyphsChanged
 
@@ -12,13 +12,15 @@ import vanilla
 from vanilla import *
 import GlyphsApp
 from GlyphsApp import Glyphs, GSLayer, GSPath, GSNode
+from kwb.glyphsAdapter import pathToGS, appOutlineCache, CleanOutlines, suspendedInterface, undoGroup, appProfiler, gsNodeCount
+from kwb.batch import runBatch
 import traceback
 
 
 class SlotMachineEffect(object):
 	def __init__(self):
 		windowWidth = 300
-		windowHeight = 255
+		windowHeight = 280
 		windowWidthResize = 100
 		windowHeightResize = 0
 		self.w = vanilla.Window(
@@ -68,6 +70,10 @@ class SlotMachineEffect(object):
 
 		self.w.allMasters = vanilla.CheckBox((15, YOffset, 260, 20), "Apply on all masters", value=False)
 
+		YOffset += 25
+
+		self.w.useCache = vanilla.CheckBox((15, YOffset, 260, 20), "Reuse results for unchanged glyphs", value=True)
+
 		# Run button
 		self.w.runButton = vanilla.Button((-170, -20 - 15, -15, -15), "Create Slot Machine",
 			sizeStyle='regular', callback=self.SlotMachineMain)
@@ -90,86 +96,6 @@ class SlotMachineEffect(object):
 			return master.descender
 		return 0
 
-	def clipPaths(self, srcPaths, cutY, keepBelow=True, margin=2000):
-		"""
-		Clip paths at a horizontal line.
-		keepBelow=True keeps everything below cutY, False keeps above.
-		Uses a two-step mask approach (union then subtract) to avoid
-		leaving the clipping rectangle as a visible artifact.
-		"""
-		if not srcPaths:
-			return []
-
-		tempLayer = GSLayer()
-		for p in srcPaths:
-			tempLayer.paths.append(p.copy())
-
-		bounds = tempLayer.bounds
-		minX = bounds.origin.x - margin
-		maxX = bounds.origin.x + bounds.size.width + margin
-		minY = bounds.origin.y - margin
-		maxY = bounds.origin.y + bounds.size.height + margin
-
-		# Build a mask covering the area to REMOVE
-		# Big rectangle covering everything
-		bigRect = GSPath()
-		bigRect.closed = True
-		bigRect.nodes = [
-			GSNode((minX, minY)),
-			GSNode((maxX, minY)),
-			GSNode((maxX, maxY)),
-			GSNode((minX, maxY))
-		]
-
-		# Keep-area rectangle (reversed to punch a hole in the big rect)
-		keepRect = GSPath()
-		keepRect.closed = True
-		if keepBelow:
-			keepRect.nodes = [
-				GSNode((minX, minY)),
-				GSNode((maxX, minY)),
-				GSNode((maxX, cutY)),
-				GSNode((minX, cutY))
-			]
-		else:
-			keepRect.nodes = [
-				GSNode((minX, cutY)),
-				GSNode((maxX, cutY)),
-				GSNode((maxX, maxY)),
-				GSNode((minX, maxY))
-			]
-		keepRect.reverse()
-
-		maskLayer = GSLayer()
-		maskLayer.paths.append(bigRect)
-		maskLayer.paths.append(keepRect)
-		maskLayer.removeOverlap()
-		maskLayer.correctPathDirection()
-
-		# Step 1: Union the letter paths with the mask
-		clipLayer = GSLayer()
-		for p in srcPaths:
-			clipLayer.paths.append(p.copy())
-		for p in maskLayer.paths:
-			clipLayer.paths.append(p.copy())
-		clipLayer.removeOverlap()
-
-		# Step 2: Subtract the mask, leaving only letter parts in the keep area
-		for p in maskLayer.paths:
-			cutPath = p.copy()
-			cutPath.reverse()
-			clipLayer.paths.append(cutPath)
-		clipLayer.removeOverlap()
-		clipLayer.correctPathDirection()
-
-		return [p.copy() for p in clipLayer.paths]
-
-	def shiftPaths(self, paths, dx, dy):
-		"""Shift all nodes in a list of paths by (dx, dy)."""
-		for path in paths:
-			for node in path.nodes:
-				node.position = (node.position.x + dx, node.position.y + dy)
-
 	def SlotMachineMain(self, sender):
 		try:
 			Font = Glyphs.font
@@ -197,6 +123,9 @@ class SlotMachineEffect(object):
 
 			allMasters = self.w.allMasters.get()
 			closeAfterRunning = self.w.closeAfterRunning.get()
+			cache = appOutlineCache() if self.w.useCache.get() else None
+			# shared base glyphs are cleaned once, however many composites use them
+			cleanOutlines = CleanOutlines(cache)
 
 			# Determine which masters to process
 			if allMasters:
@@ -204,100 +133,99 @@ class SlotMachineEffect(object):
 			else:
 				masters = [Font.selectedFontMaster]
 
-			selectedGlyphs = set([layer.parent for layer in Font.selectedLayers if layer.parent])
+			# selection order, without duplicates, so results come back in a stable order
+			selectedGlyphs = []
+			for layer in Font.selectedLayers:
+				if layer.parent and layer.parent not in selectedGlyphs:
+					selectedGlyphs.append(layer.parent)
 
 			if not selectedGlyphs:
 				Glyphs.showNotification("Slot Machine", "No glyphs selected")
 				return
 
-			glyphsChanged = []
-			Font.disableUpdateInterface()
-
-			for glyph in selectedGlyphs:
-				glyph.beginUndo()
-
-				for master in masters:
-					srcLayer = glyph.layers[master.id]
-
-					if len(srcLayer.paths) == 0 and len(srcLayer.components) == 0:
-						continue
-
-					topCropY = self.getMetricValue(master, topCropName)
-					bottomCropY = self.getMetricValue(master, bottomCropName)
-
-					# Prepare clean outlines
-					baseLayer = srcLayer.copy()
-
-					if hasattr(baseLayer, 'decomposeCorners'):
-						try:
-							baseLayer.decomposeCorners()
-						except:
-							pass
-
-					if baseLayer.components:
-						try:
-							baseLayer.decomposeComponents()
-						except:
-							pass
-
-					if hasattr(baseLayer, 'flattenOutlines'):
-						try:
-							baseLayer.flattenOutlines()
-						except:
-							pass
-
-					if len(baseLayer.paths) == 0:
-						print("Warning: %s has no paths after decomposition, skipping" % glyph.name)
-						continue
-
-					baseLayer.removeOverlap()
-					baseLayer.correctPathDirection()
-					cleanPaths = [p.copy() for p in baseLayer.paths]
-
-					# Shift all paths up by Y Shift amount
-					shiftedPaths = [p.copy() for p in cleanPaths]
-					self.shiftPaths(shiftedPaths, 0, yShift)
-
-					# Cut with gap: widen the slice at topCropY by the gap amount
-					# Upper portion: keep below (topCropY - half the gap)
-					# Overflow: keep above (topCropY + half the gap)
-					halfGap = gap / 2.0
-					upperPaths = self.clipPaths(shiftedPaths, topCropY - halfGap, keepBelow=True)
-					overflowPaths = self.clipPaths(shiftedPaths, topCropY + halfGap, keepBelow=False)
-
-					# Shift upper piece up so its top sits at the top crop line
-					if upperPaths:
-						self.shiftPaths(upperPaths, 0, halfGap)
-
-					# Reposition overflow: shift down so the gap is preserved
-					if overflowPaths:
-						self.shiftPaths(overflowPaths, 0, -topCropY - halfGap)
-
-					# Build final layer
-					finalLayer = GSLayer()
-					for p in upperPaths:
-						finalLayer.paths.append(p.copy())
-					for p in overflowPaths:
-						finalLayer.paths.append(p.copy())
-					finalLayer.correctPathDirection()
-
-					# Preserve layer attributes
-					finalLayer.layerId = srcLayer.layerId
-					finalLayer.associatedMasterId = srcLayer.associatedMasterId
-					finalLayer.width = srcLayer.width
-					for anchor in srcLayer.anchors:
-						finalLayer.anchors.append(anchor.copy())
-
-					glyph.layers[master.id] = finalLayer
-
-				glyph.endUndo()
-				glyphsChanged.append(glyph.name)
-
-			Font.enableUpdateInterface()
-
-			if glyphsChanged:
-				print("Created slot machine effect for: %s" % ", ".join(glyphsChanged))
-				Glyphs.showNotification("Slot Machine", "Applied to %d glyph(s)" % len(glyphsChanged))
+			profiler = appProfiler("Create Slot Machine")
+			with profiler:
+				# Collect clean outlines, one job per glyph and master
+				jobs = []
+				jobOrder = []
+				resultsByKey = {}
+				resultKeys = {}
+				for glyph in selectedGlyphs:
+					for master in masters:
+						srcLayer = glyph.layers[master.id]
+
+						if len(srcLayer.paths) == 0 and len(srcLayer.components) == 0:
+							continue
+
+						key = (glyph.name, master.id)
+						params = {
+							"topCropY": self.getMetricValue(master, topCropName),
+							"bottomCropY": self.getMetricValue(master, bottomCropName),
+							"yShift": yShift,
+							"gap": gap,
+						}
+
+						# Unchanged outlines with the same settings: reuse the last result
+						if cache:
+							with profiler.stage("cacheLookup", glyph.name):
+								resultKeys[key] = cache.resultKey("slotMachine", cleanOutlines.fingerprint(srcLayer), params)
+								cachedLayer = cache.get(resultKeys[key])
+							if cachedLayer is not None:
+								jobOrder.append(key)
+								resultsByKey[key] = cachedLayer
+								continue
+
+						# Prepare clean outlines
+						with profiler.stage("cleanOutline", glyph.name):
+							cleanLayer = cleanOutlines.layer(srcLayer)
+						if not cleanLayer.paths:
+							print("Warning: %s has no paths after decomposition, skipping" % glyph.name)
+							continue
+
+						jobOrder.append(key)
+						jobs.append((key, cleanLayer, params))
+
+				# Slice all layers, spread across processes only where batch.workers is set
+				with profiler.stage("slice"):
+					for key, resultLayer in runBatch("slotMachine", jobs, workers=Glyphs.defaults["com.kylewaynebenson.batch.workers"], python=Glyphs.defaults["com.kylewaynebenson.batch.python"], log=print):
+						resultsByKey[key] = resultLayer
+						if cache:
+							cache.put(resultKeys[key], resultLayer)
+				results = [(key, resultsByKey[key]) for key in jobOrder]
+
+				print("Cleaned %d outline(s), reused %d" % (cleanOutlines.cleaned, cleanOutlines.reused))
+				if cache:
+					print("Reused %d cached result(s), computed %d" % (len(jobOrder) - len(jobs), len(jobs)))
+					cache.trim()
+
+				glyphsChanged = []
+				with suspendedInterface(Font):
+					for (glyphName, masterId), resultLayer in results:
+						glyph = Font.glyphs[glyphName]
+						srcLayer = glyph.layers[masterId]
+						with undoGroup(glyph), profiler.stage("writeLayer", glyphName, lambda: gsNodeCount(glyph.layers[masterId])):
+							# Build final layer
+							finalLayer = GSLayer()
+							for p in resultLayer.paths:
+								finalLayer.paths.append(pathToGS(p))
+							finalLayer.correctPathDirection()
+
+							# Preserve layer attributes
+							finalLayer.layerId = srcLayer.layerId
+							finalLayer.associatedMasterId = srcLayer.associatedMasterId
+							finalLayer.width = srcLayer.width
+							for anchor in srcLayer.anchors:
+								finalLayer.anchors.append(anchor.copy())
+
+							glyph.layers[masterId] = finalLayer
+						if glyphName not in glyphsChanged:
+							glyphsChanged.append(glyphName)
+
+				if glyphsChanged:
+					print("Created slot machine effect for: %s" % ", ".join(glyphsChanged))
+					Glyphs.showNotification("Slot Machine", "Applied to %d glyph(s)" % len(glyphsChanged))
+
+			profiler.report(print)
 
 			if closeAfterRunning:
 				self.w.close()
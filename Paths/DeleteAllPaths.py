@@ -7,6 +7,7 @@ Finds and deletes all paths
 """
 from AppKit import NSMutableIndexSet
 import GlyphsApp
+from kwb.glyphsAdapter import suspendedInterface, undoGroup
 thisFont = Glyphs.font # frontmost font
 thisFontMaster = thisFont.selectedFontMaster # active master
 listOfSelectedLayers = thisFont.selectedLayers # active layers of selected glyphs
@@ -40,12 +41,7 @@ def deleteSmallestPath( thisLayer ):
 			for thatIndex in reversed( sorted( indexesOfPathsToBeRemoved ) ):
 				thisLayer.removePathAtIndex_( thatIndex )
 
-thisFont.disableUpdateInterface() # suppresses UI updates in Font View
-
-for thisLayer in listOfSelectedLayers:
-	thisGlyph = thisLayer.parent
-	thisGlyph.beginUndo() # begin undo grouping
-	deleteSmallestPath( thisLayer )
-	thisGlyph.endUndo()   # end undo grouping
-
-thisFont.enableUpdateInterface() # re-enables UI updates in Font View
\ No newline at end of file
+with suspendedInterface(thisFont): # suppresses UI updates in Font View
+	for thisLayer in listOfSelectedLayers:
+		with undoGroup(thisLayer.parent): # one undo step per glyph
+			deleteSmallestPath( thisLayer )
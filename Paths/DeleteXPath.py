@@ -5,9 +5,11 @@ __doc__="""
 Finds and deletes a specific path, with the option to delete across all masters.
 """
 
-from AppKit import NSMutableIndexSet
 import GlyphsApp
 from vanilla import Window, PopUpButton, CheckBox, Button, TextBox
+from kwb.pathops import pathIndexToDelete
+from kwb.pathMetrics import PathMetricsCache, extremeIndexes
+from kwb.glyphsAdapter import gsPathMetrics, layerKey, removePaths, suspendedInterface, undoGroup
 
 class DeletePathDialog:
     """Dialog for delete path settings"""
@@ -87,42 +89,39 @@ def delete_path_with_options(options):
     print(f"Deleting {options['path_type']} path(s)")
     print(f"Options: {options}")
     
-    font.disableUpdateInterface() # suppresses UI updates in Font View
+    # path areas are measured once per layer, however often the layer comes up
+    metrics_cache = PathMetricsCache(gsPathMetrics)
     
-    for layer in font.selectedLayers:
-        glyph = layer.parent
-        glyph.beginUndo() # begin undo grouping
-        
-        # For "selected" mode, get the selected path index from the current layer
-        selected_path_index = None
-        if options['path_type'] == 'selected':
-            selected_path_index = get_selected_path_index(layer)
-            if selected_path_index is None:
-                print(f"No path selected in {glyph.name}")
-                glyph.endUndo()
-                continue
-        
-        if options['all_masters']:
-            # Delete from all masters
-            for master in font.masters:
-                target_layer = glyph.layers[master.id]
-                if target_layer and target_layer.paths:
-                    if options['path_type'] == 'selected':
-                        # Use the same path index across all masters
-                        delete_path_by_index(target_layer, selected_path_index)
-                    else:
-                        delete_specific_path(target_layer, options['path_type'])
-        else:
-            # Delete only from current layer
-            if layer.paths:
+    with suspendedInterface(font): # suppresses UI updates in Font View
+        for layer in font.selectedLayers:
+            glyph = layer.parent
+            with undoGroup(glyph): # one undo step per glyph
+                # For "selected" mode, get the selected path index from the current layer
+                selected_path_index = None
                 if options['path_type'] == 'selected':
-                    delete_path_by_index(layer, selected_path_index)
+                    selected_path_index = get_selected_path_index(layer)
+                    if selected_path_index is None:
+                        print(f"No path selected in {glyph.name}")
+                        continue
+        
+                if options['all_masters']:
+                    # Delete from all masters
+                    for master in font.masters:
+                        target_layer = glyph.layers[master.id]
+                        if target_layer and target_layer.paths:
+                            if options['path_type'] == 'selected':
+                                # Use the same path index across all masters
+                                delete_path_by_index(target_layer, selected_path_index)
+                            else:
+                                delete_specific_path(target_layer, options['path_type'], metrics_cache)
                 else:
-                    delete_specific_path(layer, options['path_type'])
-        
-        glyph.endUndo() # end undo grouping
-    
-    font.enableUpdateInterface() # re-enables UI updates in Font View
+                    # Delete only from current layer
+                    if layer.paths:
+                        if options['path_type'] == 'selected':
+                            delete_path_by_index(layer, selected_path_index)
+                        else:
+                            delete_specific_path(layer, options['path_type'], metrics_cache)
+
 
 def get_selected_path_index(layer):
     """Get the index of the currently selected path"""
@@ -150,117 +149,40 @@ def delete_path_by_index(layer, path_index):
         print(f"Path index {path_index} out of range (layer has {len(layer.paths)} paths)")
         return
     
-    if Glyphs.versionNumber >= 3:
-        # Glyphs 3 code - need to find the shape index that corresponds to this path index
-        target_path = layer.paths[path_index]
-        shape_index = None
-        
-        for i, shape in enumerate(layer.shapes):
-            if hasattr(shape, 'nodes') and shape == target_path:
-                shape_index = i
-                break
-        
-        if shape_index is not None:
-            pathsToBeRemoved = NSMutableIndexSet.alloc().init()
-            pathsToBeRemoved.addIndex_(shape_index)
-            layer.removeShapesAtIndexes_(pathsToBeRemoved)
-        else:
-            print(f"Could not find shape index for path {path_index}")
-    else:
-        # Glyphs 2 code
-        layer.removePathAtIndex_(path_index)
+    removePaths(layer, [path_index])
 
-def delete_specific_path(layer, path_type):
+def delete_specific_path(layer, path_type, metrics_cache=None):
     """Delete a specific path based on the criteria"""
     
     if not layer.paths:
         print(f"No paths to delete in layer")
         return
     
-    path_to_delete_index = get_path_index_to_delete(layer, path_type)
+    path_to_delete_index = get_path_index_to_delete(layer, path_type, metrics_cache)
     
     if path_to_delete_index is None:
         print(f"Could not find {path_type} path to delete")
         return
     
-    if Glyphs.versionNumber >= 3:
-        # Glyphs 3 code
-        pathsToBeRemoved = NSMutableIndexSet.alloc().init()
-        pathsToBeRemoved.addIndex_(path_to_delete_index)
-        layer.removeShapesAtIndexes_(pathsToBeRemoved)
-    else:
-        # Glyphs 2 code
-        layer.removePathAtIndex_(path_to_delete_index)
+    removePaths(layer, [path_to_delete_index])
+    if metrics_cache:
+        metrics_cache.removePaths(layerKey(layer), [path_to_delete_index])
 
-def get_path_index_to_delete(layer, path_type):
+def get_path_index_to_delete(layer, path_type, metrics_cache=None):
     """Get the index of the path to delete based on criteria"""
     
     if not layer.paths:
         return None
     
-    num_paths = len(layer.paths)
-    
-    if path_type == "smallest":
-        areas = [path.area() for path in layer.paths]
-        min_area = min(areas)
-        return areas.index(min_area)
-    
-    elif path_type == "largest":
-        areas = [path.area() for path in layer.paths]
-        max_area = max(areas)
-        return areas.index(max_area)
-    
-    elif path_type == "first":
-        return 0
-    
-    elif path_type == "last":
-        return num_paths - 1
-    
-    elif path_type == "second":
-        return 1 if num_paths > 1 else None
-    
-    elif path_type == "third":
-        return 2 if num_paths > 2 else None
-    
-    elif path_type == "fourth":
-        return 3 if num_paths > 3 else None
-    
-    elif path_type == "fifth":
-        return 4 if num_paths > 4 else None
-    
-    elif path_type == "sixth":
-        return 5 if num_paths > 5 else None
-    
-    return None
+    metrics = None
+    if metrics_cache and path_type in ("smallest", "largest"):
+        metrics = metrics_cache.metrics(layerKey(layer), layer.paths)
+    return pathIndexToDelete(layer.paths, path_type, metrics)
 
 def deleteLargestPath( thisLayer ):
 	"""Original function - kept for backward compatibility"""
-	layerarea = []
-	for thisPath in thisLayer.paths:
-		layerarea.append(thisPath.area())
-	if Glyphs.versionNumber >= 3:
-		# Glyphs 3 code
-		pathsToBeRemoved = NSMutableIndexSet.alloc().init()
-
-		for i, thisPath in enumerate(thisLayer.shapes) :
-			if thisPath.area() == min(layerarea):
-				pathsToBeRemoved.addIndex_( i )
-
-		thisLayer.removeShapesAtIndexes_( pathsToBeRemoved )
-	else:
-		# Glyphs 2 code
-		indexesOfPathsToBeRemoved = []
-
-		numberOfPaths = len(thisLayer.paths)
-		for thisPathNumber in range( numberOfPaths ):
-			if thisPathNumber < (numberOfPaths - 1):
-				thisPath = thisLayer.paths[thisPathNumber]
-				if thisPath.area() == min(layerarea):
-					indexesOfPathsToBeRemoved.append( thisPathNumber )
-		
-		if indexesOfPathsToBeRemoved:
-			for thatIndex in reversed( sorted( indexesOfPathsToBeRemoved )):
-				thisLayer.removePathAtIndex_( thatIndex )
+	pathsToBeRemoved = extremeIndexes([gsPathMetrics(p) for p in thisLayer.paths], largest=False)
+	removePaths( thisLayer, pathsToBeRemoved )
 
 # Run the script
 if __name__ == "__main__":
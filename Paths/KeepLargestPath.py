@@ -6,47 +6,19 @@ __doc__="""
 deletes everything except for the largest path
 """
 
-from AppKit import NSMutableIndexSet
 import GlyphsApp
+from kwb.pathMetrics import extremeIndexes, allBut
+from kwb.glyphsAdapter import gsPathMetrics, removePaths, suspendedInterface, undoGroup
 thisFont = Glyphs.font # frontmost font
 thisFontMaster = thisFont.selectedFontMaster # active master
 listOfSelectedLayers = thisFont.selectedLayers # active layers of selected glyphs
 
-def deleteLargestPath( thisLayer ):
-	layerarea = []
-	for thisPath in thisLayer.paths:
-		layerarea.append(thisPath.area())
-	if Glyphs.versionNumber >= 3:
-		# Glyphs 3 code
-		pathsToBeRemoved = NSMutableIndexSet.alloc().init()
+def keepLargestPath( thisLayer ):
+	metrics = [gsPathMetrics( thisPath ) for thisPath in thisLayer.paths] # each path measured once
+	pathsToBeRemoved = allBut(extremeIndexes(metrics, largest=True), len(metrics))
+	removePaths( thisLayer, pathsToBeRemoved )
 
-		for i, thisPath in enumerate(thisLayer.shapes) :
-			if thisPath.area() != max(layerarea):
-				pathsToBeRemoved.addIndex_( i )
-
-
-		thisLayer.removeShapesAtIndexes_( pathsToBeRemoved )
-	else:
-		# Glyphs 2 code
-		indexesOfPathsToBeRemoved = []
-
-		numberOfPaths = len(thisLayer.paths)
-		for thisPathNumber in range( numberOfPaths ):
-			if thisPathNumber < (numberOfPaths - 1):
-				thisPath = thisLayer.paths[thisPathNumber]
-				if thisPath.area() != max(layerarea):
-					indexesOfPathsToBeRemoved.append( thisPathNumber )
-		
-		if indexesOfPathsToBeRemoved:
-			for thatIndex in reversed( sorted( indexesOfPathsToBeRemoved )):
-				thisLayer.removePathAtIndex_( thatIndex )
-
-thisFont.disableUpdateInterface() # suppresses UI updates in Font View
-
-for thisLayer in listOfSelectedLayers:
-	thisGlyph = thisLayer.parent
-	thisGlyph.beginUndo() # begin undo grouping
-	deleteLargestPath( thisLayer )
-	thisGlyph.endUndo()   # end undo grouping
-
-thisFont.enableUpdateInterface() # re-enables UI updates in Font View
\ No newline at end of file
+with suspendedInterface(thisFont): # suppresses UI updates in Font View
+	for thisLayer in listOfSelectedLayers:
+		with undoGroup(thisLayer.parent): # one undo step per glyph
+			keepLargestPath( thisLayer )
@@ -9,12 +9,14 @@ import vanilla
 from vanilla import *
 import GlyphsApp
 import random
+from kwb.jitter import jitterRandom, jitterPaths
+from kwb.glyphsAdapter import pathFromGS, updateGSPath, suspendedInterface, undoGroup
 
 class RandomlyMove( object ):
 	def __init__( self ):
 		# Window 'self.w':
 		windowWidth  = 250
-		windowHeight = 190
+		windowHeight = 250
 		windowWidthResize  = 300 # user can resize width by this value
 		windowHeightResize = 0   # user can resize height by this value
 		self.w = vanilla.Window(
@@ -46,6 +48,15 @@ class RandomlyMove( object ):
 		YOffset += LineHeight
 		
 		self.w.checkBox = CheckBox((15, YOffset, 0, 20), "Only move OCPs", value=False)
+
+		YOffset += LineHeight
+
+		self.w.text_4 = vanilla.TextBox( ( 15, YOffset, 80, 20), "Seed", sizeStyle='regular' )
+		self.w.seed = vanilla.EditText( ( 65, YOffset, -15, 21), "", placeholder="random", sizeStyle='regular' )
+
+		YOffset += LineHeight
+
+		self.w.sameInMasters = CheckBox((15, YOffset, 0, 20), "Same moves in all masters", value=True)
 		
 		# Run Button:
 		self.w.runButton = vanilla.Button((-130, -20-15, -15, -15), "Shake", sizeStyle='regular', callback=self.RamdonlyMovePoints )
@@ -63,21 +74,26 @@ class RandomlyMove( object ):
 		moveGrid = abs(float(self.w.moveGrid.get()) / 2)
 		if moveGrid == 0:
 			moveGrid = 1
+		seed = self.w.seed.get().strip()
+		if not seed:
+			seed = str(random.randint(0, 999999))
+			self.w.seed.set(seed)
+		print("Randomly Move Points seed: %s" % seed)
+		onlyOCPs = self.w.checkBox.get()
+		sameInMasters = self.w.sameInMasters.get()
 		try:
-			for thisLayer in selectedLayers:
-				thisLayer.parent.beginUndo()
-				for thisPath in thisLayer.paths:
-					for thisNode in thisPath.nodes:
-						if (self.w.checkBox.get() == True):
-							if (thisNode.type == GSCURVE) or (thisNode.type == LINE):
-								thisNode.x += (random.randint(-moveRange,moveRange) * moveGrid)
-								thisNode.y += (random.randint(-moveRange,moveRange) * moveGrid)
+			with suspendedInterface(Font):
+				for thisLayer in selectedLayers:
+					with undoGroup(thisLayer.parent):
+						if sameInMasters:
+							rng = jitterRandom( seed, thisLayer.parent.name )
 						else:
-							thisNode.x += (random.randint(-moveRange,moveRange) * moveGrid)
-							thisNode.y += (random.randint(-moveRange,moveRange) * moveGrid)
-						
-					thisPath.checkConnections()
-				thisLayer.parent.endUndo()
+							rng = jitterRandom( seed, thisLayer.parent.name, thisLayer.associatedMasterId )
+						gsPaths = thisLayer.paths
+						paths = jitterPaths( [pathFromGS(p) for p in gsPaths], moveRange, moveGrid, rng, onlyOCPs )
+						for thisPath, path in zip( gsPaths, paths ):
+							updateGSPath( thisPath, path )
+							thisPath.checkConnections()
 		except Exception as e:
 			# print error
 			Glyphs.showMacroWindow()
@@ -7,12 +7,16 @@ Reduce amount of nodes. Best for grungy and textured vectors.
 
 import vanilla
 import GlyphsApp
+from kwb.simplify import simplifyPath
+from kwb.nodeCleanup import cleanPaths
+from kwb import geometry
+from kwb.glyphsAdapter import pathFromGS, updateGSPath, nodeTypes, layerSnapshot, writeSnapshot, removePaths, suspendedInterface, undoGroup
 
 class SimplifyShape( object ):
 	def __init__( self ):
 		# Window 'self.w':
 		windowWidth  = 250
-		windowHeight = 140
+		windowHeight = 190
 		windowWidthResize  = 300 # user can resize width by this value
 		windowHeightResize = 0   # user can resize height by this value
 		self.w = vanilla.Window(
@@ -34,6 +38,15 @@ class SimplifyShape( object ):
 		self.w.nodeCount = vanilla.EditText( ( 15, YOffset, 40, 21), "3", sizeStyle='regular' )
 		self.w.text_2 = vanilla.TextBox( ( 65, YOffset, 80, 20), "nodes", sizeStyle='regular' )
 		
+		YOffset += 30
+		
+		self.w.fitCurves = vanilla.CheckBox( (15, YOffset, -15, 20), "Refit curves instead, max deviation:", value=False, sizeStyle='small' )
+		
+		YOffset += LineHeight
+		
+		self.w.maxDeviation = vanilla.EditText( ( 15, YOffset, 40, 21), "2", sizeStyle='regular' )
+		self.w.text_3 = vanilla.TextBox( ( 65, YOffset, 80, 20), "units", sizeStyle='regular' )
+		
 		# Run Button:
 		self.w.runButton = vanilla.Button((-130, -20-15, -15, -15), "Simplify", sizeStyle='regular', callback=self.SimplifyShapeMain )
 		self.w.setDefaultButton( self.w.runButton )
@@ -45,50 +58,57 @@ class SimplifyShape( object ):
 	
 	def deletePoints( self, thisLayer, nodeCount ):
 		for thisPath in thisLayer.paths:
+			# node references stay valid while the app removes others, indexes would not
+			gsNodes = list( thisPath.nodes )
+			types = nodeTypes( thisPath )
 			counter = 0
-			pathlength = len(thisPath)
-			for i in range(pathlength)[::-1]:
-				thisNode = thisPath.nodes[i]
-				if (thisNode.type == GSCURVE) or (thisNode.type == LINE):
+			for i in range(len(gsNodes))[::-1]:
+				if types[i] in (geometry.LINE, geometry.CURVE):
 					counter += 1
 					if counter == nodeCount:
-						thisPath.removeNodeCheckKeepShape_( thisNode )
+						thisPath.removeNodeCheckKeepShape_( gsNodes[i] )
 						counter = 0
 
+	def fitPoints( self, thisLayer, maxDeviation ):
+		"""Refits every path within maxDeviation units, returns the largest deviation"""
+		worst = 0.0
+		for thisPath in thisLayer.paths:
+			simplifiedPath, error = simplifyPath( pathFromGS( thisPath ), maxDeviation )
+			updateGSPath( thisPath, simplifiedPath )
+			worst = max( worst, error )
+		return worst
+
 	def deleteOverlappingPoints( self, thisLayer):
-		for i in range(len(thisLayer.paths))[::-1]:
-			thisPath = thisLayer.paths[i]
-			for a, b in zip(thisPath.nodes, thisPath.nodes[1:]):
-				if (int(a.x) == int(b.x)) & (int(a.y) == int(b.y)):
-					thisPath.removeNodeCheckKeepShape_(b)
+		snapshot = layerSnapshot( thisLayer )
+		paths, dropped, removedNodes = cleanPaths( [path for thisPath, path, nodes in snapshot] )
+		writeSnapshot( snapshot, paths )
+		removePaths( thisLayer, dropped )
 
 	def countMyNodes( self, thisLayer):
-		nodeTotal = 0
-		for thisPath in thisLayer.paths:
-			for thisNode in thisPath.nodes:
-				if (thisNode.type == GSCURVE) or (thisNode.type == LINE):
-					nodeTotal += 1
-		return nodeTotal
+		types = [nodeTypes( thisPath ) for thisPath in thisLayer.paths]
+		return sum( len(t) - t.count(geometry.OFFCURVE) for t in types )
 
 	def SimplifyShapeMain( self, sender ):
 		Font = Glyphs.font
 		selectedLayers = Font.selectedLayers
 		nodeCount = float(self.w.nodeCount.get())
+		fitCurves = self.w.fitCurves.get()
+		maxDeviation = float(self.w.maxDeviation.get())
 
 		try:
-			for thisLayer in selectedLayers:
-
-				thisLayer.parent.beginUndo() # wrapper for undo function
-
-				print(thisLayer.name)
-				print("On curve node count:", self.countMyNodes( thisLayer))
+			with suspendedInterface(Font):
+				for thisLayer in selectedLayers:
+					with undoGroup(thisLayer.parent): # wrapper for undo function
+						print(thisLayer.name)
+						print("On curve node count:", self.countMyNodes( thisLayer))
 				
-				self.deletePoints( thisLayer, nodeCount )
-				self.deleteOverlappingPoints( thisLayer )
+						if fitCurves:
+							print("Max deviation:", round( self.fitPoints( thisLayer, maxDeviation ), 2 ))
+						else:
+							self.deletePoints( thisLayer, nodeCount )
+						self.deleteOverlappingPoints( thisLayer )
 				
-				print("New on curve node count:", self.countMyNodes( thisLayer))
-
-				thisLayer.parent.endUndo() # wrapper for undo function
+						print("New on curve node count:", self.countMyNodes( thisLayer))
 
 		except Exception as e:
 			Glyphs.showMacroWindow()
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Shared helpers for Kyle Wayne Benson's Glyphs scripts.
+
+Everything in here except glyphsAdapter is pure Python and runs without Glyphs.app,
+so the math behind the scripts can be profiled and batch-run on any machine.
+"""
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Anchor placement shared by the Anchors scripts. Works on GSLayer and
+fileFont.FileLayer alike.
+
+Horizontal positions are measured from the layer's bounds. Vertical ones are
+measured from the bounds too, or from a vertical metric zone of the layer's
+master. Zones come from a MetricsTable built once per run.
+"""
+
+ZONES = ("ascender", "cap height", "x-height", "baseline", "descender")
+NEAREST_ZONE = "zone"
+
+
+def layerBounds(layer):
+	"""(left, bottom, right, top) of a layer; empty layers span the advance width at the baseline"""
+	bounds = layer.bounds
+	# GSLayer and FileLayer both give a zero rect, which is truthy, for a layer without shapes
+	if bounds is None or (bounds.size.width == 0 and bounds.size.height == 0):
+		return 0, 0, layer.width, 0
+	left, bottom = bounds.origin.x, bounds.origin.y
+	return left, bottom, left + bounds.size.width, bottom + bounds.size.height
+
+
+def referencePoint(bounds, xPosition, yPosition):
+	"""Point on the bounds picked by 'left'/'center'/'right' and 'top'/'center'/'bottom'"""
+	left, bottom, right, top = bounds
+	if xPosition == "left":
+		x = left
+	elif xPosition == "right":
+		x = right
+	else:
+		x = (left + right) / 2
+	if yPosition == "top":
+		y = top
+	elif yPosition == "bottom":
+		y = bottom
+	else:
+		y = (top + bottom) / 2
+	return x, y
+
+
+def mirroredPosition(anchorPosition, sourceBounds, targetBounds, xPosition, yPosition, relativeToShapes=True):
+	"""
+	Where an anchor at anchorPosition on the source layer goes on the target layer:
+	the same offset from the reference point, or the reference point itself.
+	"""
+	targetX, targetY = referencePoint(targetBounds, xPosition, yPosition)
+	if not relativeToShapes:
+		return targetX, targetY
+	sourceX, sourceY = referencePoint(sourceBounds, xPosition, yPosition)
+	x, y = anchorPosition
+	return targetX + x - sourceX, targetY + y - sourceY
+
+
+class MetricsTable(object):
+	"""
+	{zone: (position, overshoot)} for every master, read once. metricOf(master,
+	zone) returns a (position, overshoot) pair or None; the default calls
+	fileFont's FileMaster.metric.
+	"""
+
+	def __init__(self, masters, metricOf=None):
+		metricOf = metricOf or (lambda master, zone: master.metric(zone))
+		self.masters = {}
+		for master in masters:
+			zones = {}
+			for zone in ZONES:
+				metric = metricOf(master, zone)
+				if metric is not None:
+					zones[zone] = (float(metric[0]), float(metric[1]))
+			self.masters[master.id] = zones
+
+	def __getitem__(self, masterId):
+		return self.masters[masterId]
+
+
+def isZonePosition(yPosition):
+	return yPosition == NEAREST_ZONE or yPosition in ZONES
+
+
+def zoneEdge(metric, overshoot=False):
+	"""The zone's position, or the far edge of its overshoot"""
+	position, size = metric
+	return position + size if overshoot else position
+
+
+def nearestZone(zones, y):
+	return min(zones, key=lambda zone: abs(zones[zone][0] - y))
+
+
+def zonedY(y, sourceZones, targetZones, yPosition, relativeToShapes=True, overshoot=False):
+	"""
+	Where y on the source master goes on the target master: the same distance
+	from the zone named by yPosition, or from the zone nearest to y, or on the
+	zone itself. Zones missing from either master leave y as it is.
+	"""
+	zone = nearestZone(sourceZones, y) if yPosition == NEAREST_ZONE and sourceZones else yPosition
+	if zone not in sourceZones or zone not in targetZones:
+		return y
+	targetY = zoneEdge(targetZones[zone], overshoot)
+	if not relativeToShapes:
+		return targetY
+	return targetY + y - zoneEdge(sourceZones[zone], overshoot)
+
+
+def mirroredAnchors(sourceLayer, targetLayers, anchorNames, xPosition, yPosition, relativeToShapes=True, metrics=None, overshoot=False):
+	"""
+	[(targetLayer, anchorName, (x, y))] for the anchors of sourceLayer named in
+	anchorNames, or all of them if anchorNames is None, on every target layer.
+	Each layer's bounds are read once, however many anchors it gets. A zone
+	yPosition needs metrics, a MetricsTable covering the layers' masters.
+	"""
+	sourceAnchors = [
+		(anchor.name, (anchor.position.x, anchor.position.y))
+		for anchor in sourceLayer.anchors
+		if anchorNames is None or anchor.name in anchorNames
+	]
+	if not sourceAnchors:
+		return []
+	zoned = isZonePosition(yPosition)
+	if zoned and metrics is None:
+		raise ValueError("placing anchors on '%s' needs a metrics table" % yPosition)
+	sourceBounds = layerBounds(sourceLayer)
+	placements = []
+	for targetLayer in targetLayers:
+		targetBounds = layerBounds(targetLayer)
+		for name, position in sourceAnchors:
+			if not zoned:
+				placements.append((targetLayer, name, mirroredPosition(position, sourceBounds, targetBounds, xPosition, yPosition, relativeToShapes)))
+				continue
+			x = mirroredPosition(position, sourceBounds, targetBounds, xPosition, "bottom", relativeToShapes)[0]
+			y = zonedY(
+				position[1], metrics[sourceLayer.associatedMasterId], metrics[targetLayer.associatedMasterId],
+				yPosition, relativeToShapes, overshoot,
+			)
+			placements.append((targetLayer, name, (x, y)))
+	return placements
+
+
+def anchorMoves(placements, tolerance=0.01):
+	"""
+	[(layer, anchorName, oldPosition, newPosition)] for the placements that
+	would change something; oldPosition is None for anchors still to be added.
+	"""
+	moves = []
+	for layer, name, (x, y) in placements:
+		anchor = layer.anchors[name]
+		if not anchor:
+			moves.append((layer, name, None, (x, y)))
+		elif abs(anchor.position.x - x) > tolerance or abs(anchor.position.y - y) > tolerance:
+			moves.append((layer, name, (anchor.position.x, anchor.position.y), (x, y)))
+	return moves
+
+
+def formatMove(glyphName, layerName, anchorName, oldPosition, newPosition):
+	"""One line of a dry-run diff"""
+	if oldPosition is None:
+		return "+ %s / %s / %s: (%g, %g)" % (glyphName, layerName, anchorName, newPosition[0], newPosition[1])
+	return "~ %s / %s / %s: (%g, %g) -> (%g, %g)" % (
+		glyphName, layerName, anchorName, oldPosition[0], oldPosition[1], newPosition[0], newPosition[1],
+	)
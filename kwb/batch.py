@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Runs an effect on many layers across a pool of worker processes.
+
+Every glyph x master job is independent: the layer is sent to a worker as a
+pickled geometry.Layer, the effect runs there, and the results come back in
+the order the jobs were given, however the work was spread. Small batches,
+or machines where no worker can be started, run in this process instead.
+
+The pool is opt-in: runBatch runs serially unless it is given a worker
+count. Starting workers and pickling layers to them has not yet been shown
+to beat the serial loop (run `python -m kwb.bench --scaling 400` on a
+multi-core machine before turning it on). Only effects with a headless core
+in kwb.effects can run here; Create Handtooled offsets and removes overlap
+with the app's own filters and stays in the app.
+
+Workers are started as `python -m kwb.batch --worker`, which imports only
+kwb. multiprocessing's spawn would re-import the calling script as __main__,
+and a menu script imports GlyphsApp and vanilla, which a plain python does
+not have. Each worker reads (task, chunk) pickles on stdin and answers each
+with one pickle on stdout until stdin closes.
+"""
+
+import os
+import sys
+import pickle
+import shutil
+import threading
+import traceback
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from kwb.effects import EFFECTS
+from kwb.compatibility import checkGlyph
+
+# everything a worker can run: the layer effects plus other per-glyph tasks,
+# which take any picklable payload in place of the layer
+TASKS = dict(EFFECTS)
+TASKS["compatibility"] = checkGlyph
+
+# below this many jobs starting workers costs more than it saves
+MINIMUM_POOL_JOBS = 16
+# readable by any python 3 the app and the worker interpreter may differ in
+PICKLE_PROTOCOL = 4
+
+
+def pythonExecutable(preferred=None):
+	"""
+	An interpreter that can start workers. Inside Glyphs.app sys.executable is the
+	app itself, so fall back on a python found on the PATH.
+	"""
+	candidates = [preferred]
+	if os.path.basename(sys.executable or "").lower().startswith("python"):
+		candidates.append(sys.executable)
+	candidates += [shutil.which("python3"), shutil.which("python")]
+	for candidate in candidates:
+		if candidate and os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+			return candidate
+	return None
+
+
+def workerCount(jobCount, workers=None):
+	"""None runs serially, 0 means one worker per core"""
+	if not workers and workers is not None:
+		workers = os.cpu_count() or 1
+	return max(1, min(workers or 1, jobCount))
+
+
+def _runChunk(effectName, chunk):
+	effect = TASKS[effectName]
+	return [(key, effect(layer, params)) for key, layer, params in chunk]
+
+
+def _chunks(jobs, count):
+	"""Splits jobs into about four chunks per worker so uneven glyphs even out"""
+	size = max(1, -(-len(jobs) // (count * 4)))
+	return [jobs[i:i+size] for i in range(0, len(jobs), size)]
+
+
+def runSerial(effectName, jobs):
+	return _runChunk(effectName, jobs)
+
+
+class WorkerError(RuntimeError):
+	pass
+
+
+class _Worker(object):
+	"""One `python -m kwb.batch --worker` process"""
+
+	def __init__(self, executable):
+		# the directory holding the kwb package, so the worker imports this very copy
+		packageRoot = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+		env = dict(os.environ)
+		env["PYTHONPATH"] = os.pathsep.join([packageRoot] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+		self.process = subprocess.Popen(
+			[executable, "-m", "kwb.batch", "--worker"],
+			stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, cwd=packageRoot,
+		)
+
+	def run(self, effectName, chunk):
+		try:
+			pickle.dump((effectName, chunk), self.process.stdin, PICKLE_PROTOCOL)
+			self.process.stdin.flush()
+			status, payload = pickle.load(self.process.stdout)
+		except (OSError, EOFError, pickle.UnpicklingError) as e:
+			raise WorkerError("worker exited (%s)" % e)
+		if status != "ok":
+			raise WorkerError(payload)
+		return payload
+
+	def close(self):
+		try:
+			self.process.stdin.close()
+		except OSError:
+			pass
+		try:
+			self.process.wait(5)
+		except subprocess.TimeoutExpired:
+			self.process.kill()
+
+
+def _runOnWorkers(effectName, chunks, count, executable):
+	"""Hands chunks to count workers as they free up; results in chunk order"""
+	workers = [_Worker(executable) for i in range(count)]
+	results = [None] * len(chunks)
+	nextChunk = iter(range(len(chunks)))
+	lock = threading.Lock()
+
+	def drain(worker):
+		while True:
+			with lock:
+				index = next(nextChunk, None)
+			if index is None:
+				return
+			results[index] = worker.run(effectName, chunks[index])
+
+	try:
+		# threads only wait on the pipes, the work happens in the worker processes
+		with ThreadPoolExecutor(max_workers=count) as threads:
+			for future in [threads.submit(drain, worker) for worker in workers]:
+				future.result()
+	finally:
+		for worker in workers:
+			worker.close()
+	return [result for chunkResults in results for result in chunkResults]
+
+
+def runBatch(effectName, jobs, workers=None, python=None, log=None):
+	"""
+	jobs: [(key, geometry.Layer, params), ...] where key identifies the glyph and master.
+	Tasks other than effects take their own payload in place of the layer.
+	workers: None runs in this process, 0 starts one worker per core.
+	Returns [(key, resultLayer), ...] in job order.
+	"""
+	jobs = list(jobs)
+	if effectName not in TASKS:
+		raise KeyError("Unknown effect: %s" % effectName)
+	count = workerCount(len(jobs), workers)
+	if count == 1 or len(jobs) < MINIMUM_POOL_JOBS:
+		return runSerial(effectName, jobs)
+
+	executable = pythonExecutable(python)
+	if not executable:
+		if log:
+			log("No python interpreter found for worker processes, running in this process")
+		return runSerial(effectName, jobs)
+
+	try:
+		results = _runOnWorkers(effectName, _chunks(jobs, count), count, executable)
+	except (OSError, WorkerError) as e:
+		# interpreters that cannot be started, or workers that failed; a failing
+		# effect fails again here, with a traceback from this process
+		if log:
+			log("Worker processes failed (%s), running in this process" % e)
+		return runSerial(effectName, jobs)
+	if log:
+		log("Ran %d %s jobs on %d workers" % (len(jobs), effectName, count))
+	return results
+
+
+def workerMain(stdin, stdout):
+	"""Answers (task, chunk) pickles from stdin until it closes"""
+	while True:
+		try:
+			effectName, chunk = pickle.load(stdin)
+		except EOFError:
+			return
+		try:
+			reply = ("ok", _runChunk(effectName, chunk))
+		except Exception:
+			reply = ("error", traceback.format_exc())
+		pickle.dump(reply, stdout, PICKLE_PROTOCOL)
+		stdout.flush()
+
+
+if __name__ == "__main__" and sys.argv[1:] == ["--worker"]:
+	# keep stray prints off the pipe the results travel on
+	protocolOut = sys.stdout.buffer
+	sys.stdout = sys.stderr
+	workerMain(sys.stdin.buffer, protocolOut)
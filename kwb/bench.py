@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Benchmarks the headless cores of the Paths effects on synthetic glyphs:
+
+	python -m kwb.bench
+	python -m kwb.bench --baseline
+	python -m kwb.bench --baseline benchmarks.json --effects castShadow simplifyShape
+	python -m kwb.bench --save benchmarks.json
+	python -m kwb.bench --scaling 400
+
+Each effect runs on every fixture size. The report shows the best wall time
+of several runs, the peak memory of one traced run, and how many nodes the
+effect produced per node it was given. With --baseline, the run fails if an
+effect got slower or hungrier than the tolerance allows, or if its output
+changed size. Without a file name, --baseline and --save use
+kwb/benchBaseline.json, the baseline kept with the code. Node counts are
+always compared. Peak memory is only compared under the Python version the
+baseline was saved with, and times only on the machine that saved it, so
+save a baseline of your own to gate times elsewhere. Create Drop Shadow, Create Sign Painter Drop Shadow and
+Create Handtooled are built on the app's offset filter and overlap removal,
+so only Glyphs.app can time them (see kwb.benchHandtooled).
+
+--scaling N times Create Slot Machine on N medium layers through the worker
+pool of kwb.batch against running them in this process.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from kwb import batch, fixtures
+from kwb.effects import slotMachine
+from kwb.geometry import Layer
+from kwb.nodeCleanup import cleanPaths
+from kwb.pathops import deleteEveryNthNode
+from kwb.simplify import simplifyPaths
+from kwb.sweep import castShadowPieces
+
+BASELINE_VERSION = 2
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchBaseline.json")
+
+# contours, on-curve nodes per contour, share of curves, component depth
+SIZES = {
+	"small": (2, 24, 0.5, 0),
+	"medium": (6, 120, 0.5, 2),
+	"large": (12, 600, 0.7, 4),
+}
+
+
+def castShadow(paths):
+	"""
+	Create Cast Shadow up to its overlap removal: the sweep pieces. The script's
+	stray node cleanup runs on the merged outline, which only the app can make.
+	"""
+	return castShadowPieces(paths, -1, -1, -40, -40)
+
+
+def slotMachineEffect(paths):
+	return slotMachine(Layer(paths), {"topCropY": 150.0, "yShift": 80.0, "gap": 10.0}).paths
+
+
+def simplifyShape(paths):
+	"""Simplify Shape in curve fitting mode, followed by its overlapping point cleanup"""
+	newPaths = simplifyPaths(paths, 2.0)[0]
+	cleaned, dropped, removedNodes = cleanPaths(newPaths)
+	return [p for i, p in enumerate(cleaned) if i not in dropped]
+
+
+def simplifyShapeNodes(paths):
+	"""Headless Simplify Shape removing every third node (the script itself uses the app's removal)"""
+	return [deleteEveryNthNode(p, 3) for p in paths]
+
+
+BENCHMARKS = {
+	"castShadow": castShadow,
+	"slotMachine": slotMachineEffect,
+	"simplifyShape": simplifyShape,
+	"simplifyShapeNodes": simplifyShapeNodes,
+}
+
+
+def fixturePaths(size, seed=0):
+	"""The decomposed outline of the top glyph of a fixture size"""
+	contours, nodes, curveRatio, componentDepth = SIZES[size]
+	glyphs, top = fixtures.syntheticGlyphs(contours, nodes, curveRatio, componentDepth, seed)
+	return fixtures.fixtureName(contours, nodes, curveRatio, componentDepth), glyphs, top
+
+
+def nodeCount(paths):
+	return sum(len(p) for p in paths)
+
+
+def measure(effect, glyphs, top, repeats=5):
+	"""Best wall time, peak traced memory and node counts of effect on a fixture, decomposition included"""
+	best = None
+	for i in range(repeats):
+		start = time.perf_counter()
+		effect(fixtures.decomposed(glyphs, top))
+		elapsed = time.perf_counter() - start
+		best = elapsed if best is None else min(best, elapsed)
+	paths = fixtures.decomposed(glyphs, top)
+	tracemalloc.start()
+	try:
+		result = effect(fixtures.decomposed(glyphs, top))
+		peak = tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+	return {
+		"seconds": best,
+		"peakKB": peak / 1024.0,
+		"nodesIn": nodeCount(paths),
+		"nodesOut": nodeCount(result),
+	}
+
+
+def run(effectNames=None, sizes=None, repeats=5, log=None):
+	"""{"effect/size": record} for the chosen effects and fixture sizes"""
+	results = {}
+	for size in sizes or SIZES:
+		fixture, glyphs, top = fixturePaths(size)
+		for effectName in effectNames or BENCHMARKS:
+			record = measure(BENCHMARKS[effectName], glyphs, top, repeats)
+			record.update(effect=effectName, size=size, fixture=fixture)
+			results["%s/%s" % (effectName, size)] = record
+			if log:
+				log(formatRow(record))
+	return results
+
+
+def formatRow(record, change=""):
+	growth = float(record["nodesOut"]) / record["nodesIn"] if record["nodesIn"] else 0.0
+	return "%-20s %-7s %-18s %10.2f %10.0f %8d %8d %6.2fx %s" % (
+		record["effect"], record["size"], record["fixture"],
+		record["seconds"] * 1000, record["peakKB"], record["nodesIn"], record["nodesOut"], growth, change,
+	)
+
+
+HEADER = "%-20s %-7s %-18s %10s %10s %8s %8s %7s" % ("effect", "size", "fixture", "ms", "peak KB", "nodes", "out", "growth")
+
+
+def environment():
+	"""What times and peak memory depend on besides the code"""
+	return {"machine": platform.node(), "platform": platform.platform(), "python": platform.python_version()}
+
+
+def readBaseline(path):
+	"""(results, environment) of a baseline file"""
+	with open(path) as f:
+		data = json.load(f)
+	if data.get("version") != BASELINE_VERSION:
+		raise ValueError("%s was written by another version of the benchmarks" % path)
+	return data["results"], data["environment"]
+
+
+def writeBaseline(path, results):
+	with open(path, "w") as f:
+		json.dump({"version": BASELINE_VERSION, "environment": environment(), "results": results}, f, indent=1, sort_keys=True)
+		f.write("\n")
+
+
+def regressions(results, baseline, timeTolerance=0.25, memoryTolerance=0.25):
+	"""Messages for every result that is worse than its baseline entry; a tolerance of None skips that comparison"""
+	messages = []
+	for key, record in sorted(results.items()):
+		before = baseline.get(key)
+		if not before:
+			continue
+		if record["nodesOut"] != before["nodesOut"]:
+			messages.append("%s: output has %d nodes, was %d" % (key, record["nodesOut"], before["nodesOut"]))
+		# a millisecond of slack keeps tiny fixtures from failing on timer noise
+		if timeTolerance is not None and record["seconds"] > before["seconds"] * (1 + timeTolerance) + 0.001:
+			messages.append("%s: %.2f ms, was %.2f ms" % (key, record["seconds"] * 1000, before["seconds"] * 1000))
+		if memoryTolerance is not None and record["peakKB"] > before["peakKB"] * (1 + memoryTolerance) + 16:
+			messages.append("%s: peak %.0f KB, was %.0f KB" % (key, record["peakKB"], before["peakKB"]))
+	return messages
+
+
+def batchScaling(jobCount, workerCounts, log=print):
+	"""Seconds for jobCount Slot Machine jobs serially and on each worker count"""
+	fixture, glyphs, top = fixturePaths("medium")
+	layer = Layer(fixtures.decomposed(glyphs, top))
+	jobs = [(i, layer, {"topCropY": 150.0, "yShift": 80.0, "gap": 10.0}) for i in range(jobCount)]
+	start = time.perf_counter()
+	batch.runSerial("slotMachine", jobs)
+	serial = time.perf_counter() - start
+	log("%d slotMachine jobs on %s, %d cores" % (jobCount, fixture, os.cpu_count() or 1))
+	log("%-10s %10.2f s" % ("serial", serial))
+	timings = {"serial": serial}
+	for workers in workerCounts:
+		start = time.perf_counter()
+		batch.runBatch("slotMachine", jobs, workers=workers)
+		seconds = time.perf_counter() - start
+		timings[workers] = seconds
+		log("%-10s %10.2f s %6.2fx" % ("%d workers" % workers, seconds, serial / seconds))
+	return timings
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog="python -m kwb.bench", description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--effects", nargs="*", choices=sorted(BENCHMARKS), help="effects to run (default: all)")
+	parser.add_argument("--sizes", nargs="*", choices=list(SIZES), help="fixture sizes (default: all)")
+	parser.add_argument("--repeats", type=int, default=5, help="timed runs per effect, the best one counts")
+	parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="JSON file from an earlier --save to compare against (default: kwb/benchBaseline.json)")
+	parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="write the results here as the new baseline (default: kwb/benchBaseline.json)")
+	parser.add_argument("--time-tolerance", type=float, default=0.25, help="allowed slowdown (default: 0.25, 25%%)")
+	parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed growth of peak memory")
+	parser.add_argument("--scaling", type=int, metavar="JOBS", help="time the worker pool on this many jobs instead")
+	parser.add_argument("--workers", type=int, nargs="*", default=[2, 4, 8], help="worker counts for --scaling")
+	args = parser.parse_args(argv)
+
+	if args.scaling:
+		batchScaling(args.scaling, args.workers)
+		return 0
+
+	baseline, baselineEnvironment = readBaseline(args.baseline) if args.baseline else ({}, None)
+	print(HEADER)
+	results = run(args.effects, args.sizes, max(1, args.repeats), log=print)
+	if args.save:
+		writeBaseline(args.save, results)
+		print("Saved baseline: %s" % args.save)
+	if not baseline:
+		return 0
+	current = environment()
+	timeTolerance, memoryTolerance = args.time_tolerance, args.memory_tolerance
+	if baselineEnvironment != current:
+		timeTolerance = None
+		print("Times not compared: the baseline was saved on %s, Python %s" % (baselineEnvironment["platform"], baselineEnvironment["python"]))
+	if baselineEnvironment["python"] != current["python"]:
+		memoryTolerance = None
+		print("Peak memory not compared: the baseline was saved with Python %s" % baselineEnvironment["python"])
+	messages = regressions(results, baseline, timeTolerance, memoryTolerance)
+	for message in messages:
+		print("REGRESSION %s" % message)
+	if messages:
+		return 1
+	print("No regressions against %s" % args.baseline)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
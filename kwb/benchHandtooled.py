@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Times the inner-shadow crop of Create Handtooled on the selected glyphs: the
+old mask construction (big rectangle, reversed inset, three removeOverlap
+calls) against a single boolean intersection. Nothing in the font is
+changed. Needs Glyphs.app, so unlike kwb.bench it runs from the Macro panel:
+
+	from kwb import benchHandtooled
+	benchHandtooled.main()
+
+Select heavy display glyphs to see the difference.
+"""
+
+import time
+from GlyphsApp import Glyphs, GSLayer, GSPath, GSNode
+from kwb import booleans
+from kwb.glyphsAdapter import pathToGS, CleanOutlines, offsetAndClean, morphologicalOpen
+
+REPEATS = 3
+THINNEST_PART = 5.0
+BORDER_SIZE = 10.0
+SHADOW_X, SHADOW_Y = -40.0, 0.0
+
+
+def shiftedCopies(paths, dx, dy):
+	shifted = []
+	for p in paths:
+		path = p.copy()
+		for node in path.nodes:
+			node.position = (node.position.x + dx, node.position.y + dy)
+		shifted.append(path)
+	return shifted
+
+
+def maskCrop(cleanPaths, shadowPaths, insetPaths):
+	"""The crop as Create Handtooled used to do it"""
+	margin = 400
+	allNodes = [node.position for p in cleanPaths + shadowPaths for node in p.nodes]
+	if not allNodes:
+		return []
+	minX = min(n.x for n in allNodes) - margin
+	maxX = max(n.x for n in allNodes) + margin
+	minY = min(n.y for n in allNodes) - margin
+	maxY = max(n.y for n in allNodes) + margin
+	bigRect = GSPath()
+	bigRect.closed = True
+	bigRect.nodes = [GSNode((minX, minY)), GSNode((maxX, minY)), GSNode((maxX, maxY)), GSNode((minX, maxY))]
+
+	maskLayer = GSLayer()
+	maskLayer.paths.append(bigRect)
+	for p in insetPaths:
+		holePath = p.copy()
+		holePath.reverse()
+		maskLayer.paths.append(holePath)
+	maskLayer.removeOverlap()
+	maskLayer.correctPathDirection()
+
+	visibleShadowLayer = GSLayer()
+	for p in shadowPaths:
+		visibleShadowLayer.paths.append(p.copy())
+	for p in maskLayer.paths:
+		visibleShadowLayer.paths.append(p.copy())
+	visibleShadowLayer.removeOverlap()
+	for p in maskLayer.paths:
+		cutPath = p.copy()
+		cutPath.reverse()
+		visibleShadowLayer.paths.append(cutPath)
+	visibleShadowLayer.removeOverlap()
+	return [p.copy() for p in visibleShadowLayer.paths]
+
+
+def bestTime(function, *args):
+	best, result = None, None
+	for i in range(REPEATS):
+		start = time.perf_counter()
+		result = function(*args)
+		elapsed = time.perf_counter() - start
+		best = elapsed if best is None else min(best, elapsed)
+	return best, result
+
+
+def totalArea(paths):
+	return sum(abs(p.area()) for p in paths)
+
+
+def main():
+	font = Glyphs.font
+	if not font or not font.selectedLayers:
+		print("⛔️ Select some glyphs first")
+		return
+	Glyphs.clearLog()
+	Glyphs.showMacroWindow()
+	areaThreshold = THINNEST_PART * THINNEST_PART * 4
+	cleanOutlines = CleanOutlines()
+
+	print("%-20s %8s %12s %12s %8s %10s" % ("glyph", "nodes", "mask (ms)", "boolean (ms)", "speedup", "area diff"))
+	totals = [0.0, 0.0]
+	for layer in font.selectedLayers:
+		cleanPaths = [pathToGS(p) for p in cleanOutlines.paths(layer)]
+		if not cleanPaths:
+			continue
+		workLayer = GSLayer()
+		morphologicalOpen(workLayer, THINNEST_PART, areaThreshold, sourcePaths=cleanPaths)
+		offsetAndClean(workLayer, -BORDER_SIZE, areaThreshold)
+		insetPaths = [p.copy() for p in workLayer.paths]
+		shadowPaths = shiftedCopies(cleanPaths, SHADOW_X, SHADOW_Y)
+
+		maskTime, maskResult = bestTime(maskCrop, cleanPaths, shadowPaths, insetPaths)
+		booleanTime, booleanResult = bestTime(booleans.intersect, shadowPaths, insetPaths)
+		totals[0] += maskTime
+		totals[1] += booleanTime
+		nodes = sum(len(p.nodes) for p in cleanPaths)
+		print("%-20s %8d %12.2f %12.2f %7.1fx %10.1f" % (
+			layer.parent.name, nodes, maskTime * 1000, booleanTime * 1000,
+			maskTime / booleanTime if booleanTime else 0, totalArea(maskResult) - totalArea(booleanResult),
+		))
+
+	if totals[1]:
+		print("\nTotal: mask %.1f ms, boolean %.1f ms, %.1fx faster (best of %d runs each)" % (
+			totals[0] * 1000, totals[1] * 1000, totals[0] / totals[1], REPEATS))
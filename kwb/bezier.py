@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Cubic Bézier math on plain (x, y) tuples. Segments are lists of points:
+two points for a line, four for a cubic curve.
+"""
+
+import math
+
+EPSILON = 1e-9
+
+# 3-point Gauss-Legendre on [0, 1], exact for the degree 5 area integrand of a cubic
+_GAUSS = (
+	(0.5 - 0.5 * math.sqrt(0.6), 5.0 / 18),
+	(0.5, 8.0 / 18),
+	(0.5 + 0.5 * math.sqrt(0.6), 5.0 / 18),
+)
+
+
+def lerp(a, b, t):
+	return (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t)
+
+
+def cubicPoint(pts, t):
+	"""Point on a cubic at parameter t"""
+	(x0, y0), (x1, y1), (x2, y2), (x3, y3) = pts
+	mt = 1 - t
+	a, b, c, d = mt*mt*mt, 3*mt*mt*t, 3*mt*t*t, t*t*t
+	return (a*x0 + b*x1 + c*x2 + d*x3, a*y0 + b*y1 + c*y2 + d*y3)
+
+
+def cubicDerivative(pts, t):
+	"""First derivative of a cubic at parameter t"""
+	(x0, y0), (x1, y1), (x2, y2), (x3, y3) = pts
+	mt = 1 - t
+	a, b, c = 3*mt*mt, 6*mt*t, 3*t*t
+	return (
+		a*(x1 - x0) + b*(x2 - x1) + c*(x3 - x2),
+		a*(y1 - y0) + b*(y2 - y1) + c*(y3 - y2),
+	)
+
+
+def segmentPoint(segment, t):
+	if len(segment) == 2:
+		return lerp(segment[0], segment[1], t)
+	return cubicPoint(segment, t)
+
+
+def segmentTangent(segment, t):
+	"""Derivative of a segment, falling back to the next control point where a handle is retracted"""
+	if len(segment) == 2:
+		return (segment[1][0] - segment[0][0], segment[1][1] - segment[0][1])
+	dx, dy = cubicDerivative(segment, t)
+	if abs(dx) < EPSILON and abs(dy) < EPSILON:
+		p0, p1, p2, p3 = segment
+		a, b = (p0, p2) if t < 0.5 else (p1, p3)
+		dx, dy = b[0] - a[0], b[1] - a[1]
+		if abs(dx) < EPSILON and abs(dy) < EPSILON:
+			dx, dy = p3[0] - p0[0], p3[1] - p0[1]
+	return (dx, dy)
+
+
+def splitCubic(pts, t):
+	"""De Casteljau split of a cubic at t, returns both halves"""
+	p0, p1, p2, p3 = pts
+	a, b, c = lerp(p0, p1, t), lerp(p1, p2, t), lerp(p2, p3, t)
+	d, e = lerp(a, b, t), lerp(b, c, t)
+	f = lerp(d, e, t)
+	return [p0, a, d, f], [f, e, c, p3]
+
+
+def splitSegment(segment, t):
+	if len(segment) == 2:
+		m = lerp(segment[0], segment[1], t)
+		return [segment[0], m], [m, segment[1]]
+	return splitCubic(segment, t)
+
+
+def splitSegmentAtParameters(segment, ts):
+	"""Split a segment at several sorted parameters in (0, 1)"""
+	pieces = []
+	rest, t0 = segment, 0.0
+	for t in ts:
+		if t <= t0 + EPSILON or t >= 1 - EPSILON:
+			continue
+		piece, rest = splitSegment(rest, (t - t0) / (1 - t0))
+		pieces.append(piece)
+		t0 = t
+	pieces.append(rest)
+	return pieces
+
+
+def quadraticToCubic(q0, q1, q2):
+	return [
+		q0,
+		(q0[0] + (q1[0] - q0[0]) * 2.0 / 3, q0[1] + (q1[1] - q0[1]) * 2.0 / 3),
+		(q2[0] + (q1[0] - q2[0]) * 2.0 / 3, q2[1] + (q1[1] - q2[1]) * 2.0 / 3),
+		q2,
+	]
+
+
+def cubicPolynomial(v0, v1, v2, v3):
+	"""Power basis coefficients (a, b, c, d) of one coordinate of a cubic"""
+	return (
+		-v0 + 3*v1 - 3*v2 + v3,
+		3*v0 - 6*v1 + 3*v2,
+		-3*v0 + 3*v1,
+		v0,
+	)
+
+
+def quadraticRoots(a, b, c):
+	"""Real roots of a*t^2 + b*t + c"""
+	if abs(a) < EPSILON:
+		if abs(b) < EPSILON:
+			return []
+		return [-c / b]
+	discriminant = b*b - 4*a*c
+	if discriminant < 0:
+		if discriminant > -EPSILON:
+			return [-b / (2*a)]
+		return []
+	root = math.sqrt(discriminant)
+	# numerically stable form
+	q = -0.5 * (b + math.copysign(root, b))
+	roots = [q / a]
+	if q != 0:
+		roots.append(c / q)
+	return roots
+
+
+def cubicRoots(a, b, c, d):
+	"""Real roots of a*t^3 + b*t^2 + c*t + d"""
+	if abs(a) < EPSILON:
+		return quadraticRoots(b, c, d)
+	b, c, d = b / a, c / a, d / a
+	q = (b*b - 3*c) / 9.0
+	r = (2*b*b*b - 9*b*c + 27*d) / 54.0
+	if r*r < q*q*q:
+		theta = math.acos(max(-1.0, min(1.0, r / math.sqrt(q*q*q))))
+		s = -2 * math.sqrt(q)
+		roots = [
+			s * math.cos(theta / 3) - b / 3,
+			s * math.cos((theta + 2*math.pi) / 3) - b / 3,
+			s * math.cos((theta - 2*math.pi) / 3) - b / 3,
+		]
+	else:
+		A = -math.copysign((abs(r) + math.sqrt(max(r*r - q*q*q, 0.0))) ** (1.0 / 3), r)
+		B = q / A if A != 0 else 0.0
+		roots = [A + B - b / 3]
+	# polish with a couple of Newton steps
+	polished = []
+	for t in roots:
+		for _ in range(2):
+			f = ((t + b) * t + c) * t + d
+			df = (3*t + 2*b) * t + c
+			if abs(df) < EPSILON:
+				break
+			t -= f / df
+		polished.append(t)
+	return polished
+
+
+def parametersInUnitInterval(roots):
+	return sorted(set(t for t in roots if EPSILON < t < 1 - EPSILON))
+
+
+def cubicExtremaParameters(pts):
+	"""Parameters of the horizontal and vertical extrema of a cubic"""
+	ts = []
+	for i in (0, 1):
+		v0, v1, v2, v3 = pts[0][i], pts[1][i], pts[2][i], pts[3][i]
+		ts.extend(quadraticRoots(3*(-v0 + 3*v1 - 3*v2 + v3), 2*(3*v0 - 6*v1 + 3*v2), -3*v0 + 3*v1))
+	return parametersInUnitInterval(ts)
+
+
+def segmentBounds(segment):
+	"""(xMin, yMin, xMax, yMax) of a segment including curve extrema"""
+	points = [segment[0], segment[-1]]
+	if len(segment) == 4:
+		points.extend(cubicPoint(segment, t) for t in cubicExtremaParameters(segment))
+	xs = [p[0] for p in points]
+	ys = [p[1] for p in points]
+	return min(xs), min(ys), max(xs), max(ys)
+
+
+def segmentArea(segment):
+	"""Signed area contribution of a segment (Green's theorem), positive for counterclockwise"""
+	if len(segment) == 2:
+		(x0, y0), (x1, y1) = segment
+		return (x0 * y1 - x1 * y0) * 0.5
+	area = 0.0
+	for t, weight in _GAUSS:
+		x, y = cubicPoint(segment, t)
+		dx, dy = cubicDerivative(segment, t)
+		area += weight * (x * dy - y * dx)
+	return area * 0.5
+
+
+def segmentLength(segment, steps=16):
+	if len(segment) == 2:
+		return math.hypot(segment[1][0] - segment[0][0], segment[1][1] - segment[0][1])
+	length = 0.0
+	previous = segment[0]
+	for i in range(1, steps + 1):
+		point = cubicPoint(segment, float(i) / steps)
+		length += math.hypot(point[0] - previous[0], point[1] - previous[1])
+		previous = point
+	return length
+
+
+def normalize(v):
+	length = math.hypot(v[0], v[1])
+	if length < EPSILON:
+		return (0.0, 0.0)
+	return (v[0] / length, v[1] / length)
+
+
+def chordLengthParameters(points):
+	"""Parameterize a polyline by cumulative chord length in [0, 1]"""
+	distances = [0.0]
+	for a, b in zip(points, points[1:]):
+		distances.append(distances[-1] + math.hypot(b[0] - a[0], b[1] - a[1]))
+	total = distances[-1]
+	if total < EPSILON:
+		return [float(i) / max(len(points) - 1, 1) for i in range(len(points))]
+	return [d / total for d in distances]
+
+
+def fitCubic(points, params, leftTangent, rightTangent):
+	"""
+	Least-squares cubic through the first and last point with fixed unit tangent
+	directions, as in Schneider's 'An Algorithm for Automatically Fitting Digitized Curves'.
+	leftTangent points into the curve from the start, rightTangent into it from the end.
+	"""
+	p0, p3 = points[0], points[-1]
+	c00 = c01 = c11 = x0 = x1 = 0.0
+	for (px, py), u in zip(points, params):
+		mu = 1 - u
+		b0, b1, b2, b3 = mu*mu*mu, 3*mu*mu*u, 3*mu*u*u, u*u*u
+		a0 = (leftTangent[0] * b1, leftTangent[1] * b1)
+		a1 = (rightTangent[0] * b2, rightTangent[1] * b2)
+		c00 += a0[0]*a0[0] + a0[1]*a0[1]
+		c01 += a0[0]*a1[0] + a0[1]*a1[1]
+		c11 += a1[0]*a1[0] + a1[1]*a1[1]
+		tx = px - (p0[0] * (b0 + b1) + p3[0] * (b2 + b3))
+		ty = py - (p0[1] * (b0 + b1) + p3[1] * (b2 + b3))
+		x0 += a0[0]*tx + a0[1]*ty
+		x1 += a1[0]*tx + a1[1]*ty
+	det = c00 * c11 - c01 * c01
+	segmentLengthEstimate = math.hypot(p3[0] - p0[0], p3[1] - p0[1])
+	alphaLeft = alphaRight = 0.0
+	if abs(det) > EPSILON:
+		alphaLeft = (x0 * c11 - x1 * c01) / det
+		alphaRight = (c00 * x1 - c01 * x0) / det
+	minimum = 1e-6 * segmentLengthEstimate
+	if alphaLeft < minimum or alphaRight < minimum:
+		# fall back on Wu/Barsky heuristic
+		alphaLeft = alphaRight = segmentLengthEstimate / 3.0
+	return [
+		p0,
+		(p0[0] + leftTangent[0] * alphaLeft, p0[1] + leftTangent[1] * alphaLeft),
+		(p3[0] + rightTangent[0] * alphaRight, p3[1] + rightTangent[1] * alphaRight),
+		p3,
+	]
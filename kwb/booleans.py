@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Boolean operations on sets of GSPaths, using the app's path operator.
+
+Each call takes two contour sets and returns new paths, leaving the
+inputs untouched. This replaces building masks out of large rectangles
+and reversed paths and running removeOverlap on them several times.
+Needs Glyphs.app, like kwb.glyphsAdapter.
+"""
+
+from Foundation import NSClassFromString, NSMutableArray
+from GlyphsApp import Glyphs
+
+
+def _pathOperator():
+	operator = NSClassFromString("GSPathOperator")
+	if operator is None:
+		raise RuntimeError("This version of Glyphs has no path operator")
+	return operator
+
+
+def _apply(selector, operandPaths, paths):
+	"""Runs GSPathOperator selector with operandPaths on copies of paths and returns the result"""
+	operator = _pathOperator()
+	target = NSMutableArray.arrayWithArray_([p.copy() for p in paths])
+	operands = NSMutableArray.arrayWithArray_([p.copy() for p in operandPaths])
+	if Glyphs.versionNumber >= 3:
+		method = getattr(operator, selector)
+	else:
+		# Glyphs 2 has instance methods only
+		method = getattr(operator.alloc().init(), selector)
+	# - (BOOL)...Paths:(NSArray *)paths from:(NSMutableArray *)target error:(NSError **)error
+	# works on target in place; PyObjC hands back the BOOL and the error
+	succeeded, error = method(operands, target, None)
+	if not succeeded:
+		raise RuntimeError("%s failed: %s" % (selector, error.localizedDescription() if error else "no reason given"))
+	return list(target)
+
+
+def intersect(paths, otherPaths):
+	"""The parts of paths inside otherPaths"""
+	if not paths or not otherPaths:
+		return []
+	return _apply("intersectPaths_from_error_", otherPaths, paths)
+
+
+def subtract(paths, otherPaths):
+	"""The parts of paths outside otherPaths"""
+	if not paths:
+		return []
+	if not otherPaths:
+		return [p.copy() for p in paths]
+	return _apply("subtractPaths_from_error_", otherPaths, paths)
+
+
+def xor(paths, otherPaths):
+	"""The parts covered by exactly one of the two sets"""
+	# the two differences do not overlap, so together they are the result
+	return subtract(paths, otherPaths) + subtract(otherPaths, paths)
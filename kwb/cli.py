@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Runs script logic on .glyphs files and .glyphspackages without Glyphs.app:
+
+	python -m kwb.cli center-width Font.glyphs --width 600 --glyphs zero one two
+	python -m kwb.cli center-width Font.glyphs --targets '*.tf=600' '*.tosf=580'
+	python -m kwb.cli mirror-anchor Font.glyphs --anchor top --glyphs A --x center --y top
+	python -m kwb.cli mirror-anchor Font.glyphs --x center --y zone --overshoot --dry-run
+	python -m kwb.cli axis-location Font.glyphs --weight-by-class
+	python -m kwb.cli compatibility Font.glyphs
+	python -m kwb.cli width-stats Font.glyphs --by category suffix --report widths.csv
+
+Files are rewritten in place unless --output is given. Glyphs are streamed,
+so memory use stays flat however many masters and glyphs the font has.
+"""
+
+import argparse
+import sys
+from kwb.fileFont import GlyphsFileFont
+from kwb.anchors import ZONES, NEAREST_ZONE, MetricsTable, isZonePosition, mirroredAnchors, anchorMoves, formatMove
+from kwb.metrics import applyCenteredWidth, centeredWidthPlan, parseWidthTargets, targetWidth
+from kwb.fontInfo import axisLocations, instancesToProcess
+from kwb.widthStats import GROUPINGS, WidthStats, formatTable, writeTable
+from kwb.compatibility import scanFont, readReport, writeReport, reportPathFor
+
+
+def centerWidth(font, args):
+	if args.width is None and not args.targets:
+		print("center-width needs --width or --targets")
+		return 2
+	targets = parseWidthTargets("\n".join(args.targets)) if args.targets else None
+	for glyph in font.editGlyphs(args.output):
+		if args.glyphs and glyph.name not in args.glyphs:
+			continue
+		newWidth = targetWidth(glyph.name, targets) if targets else args.width
+		if newWidth is None:
+			continue
+		layers = [layer for layer in glyph.layers if layer.isMasterLayer or args.all_layers]
+		for glyph, changes in centeredWidthPlan([(glyph, layers, newWidth)]):
+			for layer, addToSides in changes:
+				applyCenteredWidth(layer, addToSides)
+				if not args.quiet:
+					print("%s / %s: added %s to each side, new width %s" % (glyph.name, layer.name, addToSides, layer.width))
+
+
+def mirrorAnchor(font, args):
+	sourceMaster = font.masters[args.master] if args.master is not None else font.masters[0]
+	anchorNames = set(args.anchor) if args.anchor else None
+	metrics = MetricsTable(font.masters) if isZonePosition(args.y) else None
+	for glyph in (font.glyphs if args.dry_run else font.editGlyphs(args.output)):
+		if args.glyphs and glyph.name not in args.glyphs:
+			continue
+		sourceLayer = glyph.layers[sourceMaster.id]
+		targetLayers = [glyph.layers[master.id] for master in font.masters if master.id != sourceMaster.id and glyph.layers[master.id]]
+		placements = mirroredAnchors(sourceLayer, targetLayers, anchorNames, args.x, args.y, not args.absolute, metrics, args.overshoot) if sourceLayer else []
+		if not placements:
+			if anchorNames:
+				print("%s: no anchor '%s' in %s" % (glyph.name, "', '".join(sorted(anchorNames)), sourceMaster.name))
+			continue
+		if args.dry_run:
+			for targetLayer, anchorName, oldPosition, newPosition in anchorMoves(placements):
+				print(formatMove(glyph.name, targetLayer.name, anchorName, oldPosition, newPosition))
+			continue
+		for targetLayer, anchorName, (x, y) in placements:
+			targetAnchor = targetLayer.anchors[anchorName]
+			if targetAnchor:
+				targetAnchor.position = (x, y)
+			else:
+				targetLayer.anchors.new(anchorName, (x, y))
+			print("%s: placed '%s' in %s at (%s, %s)" % (glyph.name, anchorName, targetLayer.name, x, y))
+
+
+def axisLocation(font, args):
+	for instance in instancesToProcess(font, args.include_inactive):
+		locations = axisLocations(font, instance, args.weight_by_class, args.width_by_class, log=print)
+		if locations:
+			instance.customParameters["Axis Location"] = [{"Axis": name, "Location": value} for name, value in locations]
+	font.save(args.output)
+
+
+def compatibility(font, args):
+	reportPath = args.report or reportPathFor(args.font)
+	previous = {} if args.all else readReport(reportPath)
+	glyphs = (glyph for glyph in font.glyphs if not args.glyphs or glyph.name in args.glyphs)
+	records, checkedCount = scanFont(glyphs, previous=previous, workers=args.workers, log=print)
+	if args.glyphs:
+		# keep what an earlier run found for the glyphs left out this time
+		records += [record for name, record in previous.items() if name not in args.glyphs]
+	writeReport(reportPath, records)
+	failing = [record for record in records if record.get("issues")]
+	for record in failing:
+		for issue in record["issues"]:
+			print("%s: %s" % (record["glyph"], issue["message"]))
+	print("Checked %d of %d glyphs, %d with issues. Report: %s" % (checkedCount, len(records), len(failing), reportPath))
+	return 1 if failing else 0
+
+
+def widthStats(font, args):
+	stats = WidthStats(font.masters, args.by)
+	glyphs = (glyph for glyph in font.glyphs if not args.glyphs or glyph.name in args.glyphs)
+	stats.collect(glyphs, exportingOnly=not args.include_non_exporting)
+	rows = stats.rows()
+	for line in formatTable(rows):
+		print(line)
+	if args.report:
+		writeTable(args.report, rows)
+		print("Report: %s" % args.report)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog="python -m kwb.cli", description=__doc__.strip().splitlines()[0])
+	commands = parser.add_subparsers(dest="command")
+
+	command = commands.add_parser("center-width", help="Change Width Centered")
+	command.add_argument("--width", type=float, help="one width for every glyph")
+	command.add_argument("--targets", nargs="*", help="'pattern=width' pairs such as '*.tf=600'; the first match wins")
+	command.add_argument("--quiet", action="store_true", help="do not list every changed layer")
+	command.add_argument("--all-layers", action="store_true", help="also change brace, bracket and backup layers")
+	command.set_defaults(run=centerWidth)
+
+	command = commands.add_parser("mirror-anchor", help="Mirror anchor across masters")
+	command.add_argument("--anchor", nargs="*", help="anchor names (default: all anchors)")
+	command.add_argument("--master", type=int, help="index of the master to copy from (default: first)")
+	command.add_argument("--x", choices=("left", "center", "right"), default="right")
+	command.add_argument("--y", choices=("top", "center", "bottom", NEAREST_ZONE) + ZONES, default="top", help="a side of the bounds, a metric zone, or 'zone' for the zone nearest each anchor")
+	command.add_argument("--overshoot", action="store_true", help="measure from the far edge of the zone's overshoot")
+	command.add_argument("--absolute", action="store_true", help="place on the bounds or zone instead of keeping the offset")
+	command.add_argument("--dry-run", action="store_true", help="list the anchor moves without changing the font")
+	command.set_defaults(run=mirrorAnchor)
+
+	command = commands.add_parser("axis-location", help="Set Axis Location")
+	command.add_argument("--include-inactive", action="store_true")
+	command.add_argument("--weight-by-class", action="store_true")
+	command.add_argument("--width-by-class", action="store_true")
+	command.set_defaults(run=axisLocation)
+
+	command = commands.add_parser("compatibility", help="Compatibility Helper for the whole font")
+	command.add_argument("--report", help="JSON lines report (default: next to the font)")
+	command.add_argument("--all", action="store_true", help="check every glyph, even unchanged ones")
+	command.add_argument("--workers", type=int, help="worker processes, 0 for one per core (default: run in this process)")
+	command.set_defaults(run=compatibility)
+
+	command = commands.add_parser("width-stats", help="Average Width for the whole font")
+	command.add_argument("--by", nargs="*", choices=GROUPINGS, default=list(GROUPINGS), help="groupings (default: all)")
+	command.add_argument("--include-non-exporting", action="store_true")
+	command.add_argument("--report", help="also write the table to this CSV file")
+	command.set_defaults(run=widthStats)
+
+	for command in commands.choices.values():
+		command.add_argument("font", help=".glyphs file or .glyphspackage")
+		command.add_argument("--output", help="write here instead of overwriting the font")
+		command.add_argument("--glyphs", nargs="*", help="glyph names (default: all)")
+
+	args = parser.parse_args(argv)
+	if not getattr(args, "run", None):
+		parser.print_help()
+		return 2
+	return args.run(GlyphsFileFont(args.font), args) or 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Clipping outlines at horizontal lines without a boolean operation.
+
+Segments are split analytically where they cross the cut, the pieces on the
+kept side are collected into open chains, and the chains are closed again
+along the cut line. Expects overlap-free outlines with correct path direction.
+"""
+
+from bisect import bisect_right
+from kwb import bezier
+from kwb.geometry import Path
+
+MINIMUM_AREA = 1e-3
+
+
+def crossingParameters(segment, y):
+	"""Parameters in (0, 1) where a segment crosses the horizontal line at y"""
+	if len(segment) == 2:
+		(x0, y0), (x1, y1) = segment
+		if (y0 - y) * (y1 - y) >= 0 or y0 == y1:
+			return []
+		return [(y - y0) / (y1 - y0)]
+	ys = [p[1] for p in segment]
+	if min(ys) >= y or max(ys) <= y:
+		return []
+	a, b, c, d = bezier.cubicPolynomial(*ys)
+	return bezier.parametersInUnitInterval(bezier.cubicRoots(a, b, c, d - y))
+
+
+def bandPieces(path, levels):
+	"""
+	Splits the segments of a path at every level and labels each piece with its band:
+	0 below levels[0], 1 between levels[0] and levels[1], and so on.
+	Points exactly on a level count as above it.
+	"""
+	pieces = []
+	for segment in path.segments():
+		cuts = []
+		for y in levels:
+			cuts.extend((t, y) for t in crossingParameters(segment, y))
+		cuts.sort()
+		split = bezier.splitSegmentAtParameters(segment, [t for t, y in cuts])
+		if len(split) == len(cuts) + 1:
+			# snap the split points exactly onto their cut line
+			for i, (t, y) in enumerate(cuts):
+				x = split[i][-1][0]
+				split[i][-1] = (x, y)
+				split[i+1][0] = (x, y)
+		for piece in split:
+			midY = bezier.segmentPoint(piece, 0.5)[1]
+			pieces.append((piece, bisect_right(levels, midY)))
+	return pieces
+
+
+def _chains(pieces, keep):
+	"""Runs of consecutive kept pieces of a closed contour, starting after a discarded piece"""
+	count = len(pieces)
+	first = None
+	for i in range(count):
+		if pieces[i][1] in keep and pieces[i-1][1] not in keep:
+			first = i
+			break
+	chains = []
+	current = None
+	for k in range(count):
+		piece, band = pieces[(first + k) % count]
+		if band in keep:
+			if current is None:
+				current = []
+				chains.append(current)
+			current.append(piece)
+		else:
+			current = None
+	return chains
+
+
+def _closeChains(chains, cutY):
+	"""Links chain ends to chain starts along the cut line and returns closed paths"""
+	events = []
+	for i, chain in enumerate(chains):
+		events.append((chain[-1][-1][0], 0, i)) # chain end
+		events.append((chain[0][0][0], 1, i)) # chain start
+	events.sort()
+	link = {}
+	unmatchedEnds, unmatchedStarts = [], []
+	# the cut line runs through material between every second pair of crossings
+	for k in range(0, len(events) - 1, 2):
+		a, b = events[k], events[k+1]
+		if a[1] != b[1]:
+			end, start = (a, b) if a[1] == 0 else (b, a)
+			link[end[2]] = start[2]
+		else:
+			for event in (a, b):
+				(unmatchedEnds if event[1] == 0 else unmatchedStarts).append(event)
+	if len(events) % 2:
+		event = events[-1]
+		(unmatchedEnds if event[1] == 0 else unmatchedStarts).append(event)
+	# inconsistent directions: fall back on the nearest free start along the line
+	for x, kind, i in unmatchedEnds:
+		if not unmatchedStarts:
+			break
+		nearest = min(unmatchedStarts, key=lambda e: abs(e[0] - x))
+		unmatchedStarts.remove(nearest)
+		link[i] = nearest[2]
+
+	paths = []
+	used = set()
+	for i in range(len(chains)):
+		if i in used or i not in link:
+			continue
+		segments = []
+		j = i
+		while j not in used:
+			used.add(j)
+			segments.extend(chains[j])
+			following = link.get(j)
+			if following is None:
+				break
+			end, start = chains[j][-1][-1], chains[following][0][0]
+			if end != start:
+				segments.append([end, (start[0], cutY)])
+			j = following
+		path = Path.fromSegments(segments)
+		if path.area() > MINIMUM_AREA:
+			paths.append(path)
+	return paths
+
+
+def _clipBand(contours, keep, cutY):
+	"""Assembles the kept part of labelled contours, closing open chains along cutY"""
+	result, chains = [], []
+	for path, pieces in contours:
+		if not pieces:
+			continue
+		bands = set(band for piece, band in pieces)
+		if bands <= keep:
+			result.append(path.copy())
+		elif not bands & keep:
+			continue
+		elif path.closed:
+			chains.extend(_chains(pieces, keep))
+		else:
+			current = None
+			for piece, band in pieces:
+				if band in keep:
+					if current is None:
+						current = []
+						result.append(current)
+					current.append(piece)
+				else:
+					current = None
+	result = [Path.fromSegments(r, closed=False) if isinstance(r, list) else r for r in result]
+	return result + _closeChains(chains, cutY)
+
+
+def clipAtY(paths, y, keepBelow=True):
+	"""Returns the part of the paths below (or above) the horizontal line at y"""
+	contours = [(path, bandPieces(path, [y])) for path in paths]
+	return _clipBand(contours, set([0]) if keepBelow else set([1]), y)
+
+
+def splitAtY(paths, lowerY, upperY=None):
+	"""
+	Returns (part below lowerY, part above upperY) in one pass over the segments.
+	upperY defaults to lowerY; a larger upperY drops the slice in between.
+	"""
+	if upperY is None or upperY == lowerY:
+		contours = [(path, bandPieces(path, [lowerY])) for path in paths]
+		return _clipBand(contours, set([0]), lowerY), _clipBand(contours, set([1]), lowerY)
+	contours = [(path, bandPieces(path, [lowerY, upperY])) for path in paths]
+	return _clipBand(contours, set([0]), lowerY), _clipBand(contours, set([2]), upperY)
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Interpolation compatibility checks behind Compatibility Helper.
+
+A glyph is first read into a GlyphSummary: for every layer the path
+structure (node types, start point), component order and anchor names.
+The checks only look at summaries, so they run the same on GSGlyph,
+fileFont.FileGlyph and in kwb.batch worker processes. Each summary has a
+fingerprint, and a JSON lines report from an earlier run lets unchanged
+glyphs be skipped, as long as it was written by the same set of checks.
+
+Only the checks run in worker processes. Reading a glyph into its summary
+goes through the app's objects and stays in the calling process.
+"""
+
+import os
+import hashlib
+import json
+from collections import Counter
+
+NODE_LETTERS = "lcqo" # geometry.LINE, CURVE, QCURVE, OFFCURVE
+NODE_NAMES = {"l": "line", "c": "curve", "q": "qcurve", "o": "offcurve"}
+
+
+class PathSummary(object):
+	__slots__ = ("closed", "types", "start", "bounds")
+
+	def __init__(self, closed, types, start, bounds):
+		self.closed = closed
+		self.types = types # one letter of NODE_LETTERS per node
+		self.start = start # (x, y) of the start node
+		self.bounds = bounds # (xMin, yMin, xMax, yMax) of the nodes
+
+	def key(self):
+		# everything the checks read, bounds included for the start point cells
+		return (self.closed, self.types, self.start, self.bounds)
+
+
+class LayerSummary(object):
+	__slots__ = ("name", "isCompared", "paths", "components", "anchors")
+
+	def __init__(self, name, isCompared, paths, components, anchors):
+		self.name = name
+		self.isCompared = isCompared # master and special layers are compared with each other
+		self.paths = paths
+		self.components = components
+		self.anchors = anchors
+
+	def key(self):
+		return (self.name, self.isCompared, [p.key() for p in self.paths], self.components, self.anchors)
+
+
+class GlyphSummary(object):
+	__slots__ = ("name", "layers")
+
+	def __init__(self, name, layers):
+		self.name = name
+		self.layers = layers
+
+	def fingerprint(self):
+		data = repr((self.name, [layer.key() for layer in self.layers]))
+		return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def summarizePath(path):
+	coords = path.coords
+	start = path.startIndex()
+	xs, ys = coords[0::2], coords[1::2]
+	bounds = (min(xs), min(ys), max(xs), max(ys)) if xs else None
+	startPoint = (coords[2*start], coords[2*start+1]) if xs else None
+	return PathSummary(path.closed, "".join(NODE_LETTERS[t] for t in path.types), startPoint, bounds)
+
+
+def summarizeGlyph(glyph, readPaths=None):
+	"""
+	readPaths(layer) returns the layer's outlines as geometry.Path objects;
+	by default layer.paths is used, which suits fileFont layers.
+	"""
+	layers = []
+	for layer in glyph.layers:
+		isCompared = bool(layer.isMasterLayer or layer.isSpecialLayer)
+		if isCompared:
+			name = layer.name if layer.name else layer.associatedMasterId
+		else:
+			name = layer.name
+		paths = readPaths(layer) if readPaths else layer.paths
+		layers.append(LayerSummary(
+			name,
+			isCompared,
+			[summarizePath(p) for p in paths],
+			[c.componentName for c in layer.components],
+			[a.name for a in layer.anchors],
+		))
+	return GlyphSummary(glyph.name, layers)
+
+
+def _mostCommon(values):
+	"""Most frequent value; ties go to the one seen first"""
+	return Counter(values).most_common(1)[0][0]
+
+
+def _comparedLayers(glyph):
+	"""{master name: LayerSummary} of the master and special layers"""
+	layers = {}
+	for layer in glyph.layers:
+		if layer.isCompared:
+			layers[layer.name] = layer
+	return layers
+
+
+def _matchingPaths(glyph):
+	"""
+	Compared layers that have the usual number of paths, and that count;
+	per-path checks only make sense between these.
+	"""
+	layers = _comparedLayers(glyph)
+	if not layers:
+		return {}, 0
+	pathCount = _mostCommon([len(layer.paths) for layer in layers.values()])
+	return dict((name, layer) for name, layer in layers.items() if len(layer.paths) == pathCount), pathCount
+
+
+def checkPathCounts(glyph):
+	"""Check if all masters have the same number of paths."""
+	issues = []
+	layers = _comparedLayers(glyph)
+	if not layers:
+		return issues
+	counts = dict((name, len(layer.paths)) for name, layer in layers.items())
+	mostCommonCount = _mostCommon(list(counts.values()))
+	for masterName, count in counts.items():
+		if count != mostCommonCount:
+			issues.append(f"Master '{masterName}' has {count} path(s), expected {mostCommonCount}")
+	return issues
+
+
+def checkAnchors(glyph):
+	"""Check if all masters have the same anchors."""
+	issues = []
+	masterAnchors = dict((name, set(layer.anchors)) for name, layer in _comparedLayers(glyph).items())
+	if not masterAnchors:
+		return issues
+	allAnchorNames = set()
+	for anchorSet in masterAnchors.values():
+		allAnchorNames.update(anchorSet)
+
+	# For each anchor, check if majority of masters have it
+	numMasters = len(masterAnchors)
+	majorityThreshold = numMasters / 2.0
+	for anchorName in sorted(allAnchorNames):
+		mastersWithAnchor = [master for master, anchors in masterAnchors.items() if anchorName in anchors]
+		mastersWithoutAnchor = [master for master, anchors in masterAnchors.items() if anchorName not in anchors]
+		if len(mastersWithAnchor) > majorityThreshold and mastersWithoutAnchor:
+			for masterName in mastersWithoutAnchor:
+				issues.append(f"Master '{masterName}' is missing anchor '{anchorName}' (present in {len(mastersWithAnchor)}/{numMasters} masters)")
+	return issues
+
+
+def checkDuplicateIntermediateNames(glyph):
+	"""Check for intermediate layers with duplicate names."""
+	counts = Counter(layer.name for layer in glyph.layers if not layer.isCompared and layer.name)
+	return [f"Duplicate intermediate layer name '{name}' found {count} times" for name, count in counts.items() if count > 1]
+
+
+def checkNodeCounts(glyph):
+	"""Check if each path has the same number of nodes in all masters."""
+	issues = []
+	layers, pathCount = _matchingPaths(glyph)
+	for i in range(pathCount):
+		counts = dict((name, len(layer.paths[i].types)) for name, layer in layers.items())
+		mostCommonCount = _mostCommon(list(counts.values()))
+		for masterName, count in counts.items():
+			if count != mostCommonCount:
+				issues.append(f"Master '{masterName}' path {i+1} has {count} node(s), expected {mostCommonCount}")
+	return issues
+
+
+def _typeSequences(glyph):
+	"""Yields (path index, {master name: PathSummary}, usual node types) for paths with matching node counts"""
+	layers, pathCount = _matchingPaths(glyph)
+	for i in range(pathCount):
+		paths = dict((name, layer.paths[i]) for name, layer in layers.items())
+		nodeCount = _mostCommon([len(p.types) for p in paths.values()])
+		paths = dict((name, p) for name, p in paths.items() if len(p.types) == nodeCount)
+		yield i, paths, _mostCommon([p.types for p in paths.values()])
+
+
+def _startOffset(types, usualTypes):
+	"""How many nodes the start point of a closed path is off, if that is all that differs"""
+	if len(types) != len(usualTypes):
+		return None
+	offset = (usualTypes + usualTypes).find(types)
+	return offset if offset > 0 else None
+
+
+def checkNodeTypes(glyph):
+	"""Check if each path has the same sequence of node types in all masters."""
+	issues = []
+	for i, paths, usualTypes in _typeSequences(glyph):
+		for masterName, path in paths.items():
+			if path.types == usualTypes:
+				continue
+			if path.closed and _startOffset(path.types, usualTypes) is not None:
+				# reported by checkStartPoints
+				continue
+			node = next(j for j, (a, b) in enumerate(zip(path.types, usualTypes)) if a != b)
+			issues.append(f"Master '{masterName}' path {i+1} node {node+1} is {NODE_NAMES[path.types[node]]}, expected {NODE_NAMES[usualTypes[node]]}")
+	return issues
+
+
+def _startCell(path):
+	"""Which ninth of the path's bounds the start node sits in"""
+	xMin, yMin, xMax, yMax = path.bounds
+	x, y = path.start
+	column = round(2 * (x - xMin) / (xMax - xMin)) if xMax > xMin else 1
+	row = round(2 * (y - yMin) / (yMax - yMin)) if yMax > yMin else 1
+	return column, row
+
+
+def checkStartPoints(glyph):
+	"""Check if closed paths start at the same node in all masters."""
+	issues = []
+	for i, paths, usualTypes in _typeSequences(glyph):
+		closedPaths = dict((name, p) for name, p in paths.items() if p.closed and p.start is not None)
+		for masterName, path in closedPaths.items():
+			offset = _startOffset(path.types, usualTypes)
+			if path.types != usualTypes and offset is not None:
+				issues.append(f"Master '{masterName}' path {i+1} starts {offset} node(s) off (node types match after moving the start point)")
+		# same node types: compare where in the outline the start node sits
+		sameTypes = dict((name, p) for name, p in closedPaths.items() if p.types == usualTypes)
+		if len(sameTypes) < 2:
+			continue
+		cells = dict((name, _startCell(p)) for name, p in sameTypes.items())
+		usualCell = _mostCommon(list(cells.values()))
+		for masterName, cell in cells.items():
+			if cell != usualCell:
+				issues.append(f"Master '{masterName}' path {i+1} start point is in a different part of the outline than in most masters")
+	return issues
+
+
+def checkComponentOrder(glyph):
+	"""Check if all masters have the same components in the same order."""
+	issues = []
+	layers = _comparedLayers(glyph)
+	if not layers:
+		return issues
+	sequences = dict((name, tuple(layer.components)) for name, layer in layers.items())
+	usual = _mostCommon(list(sequences.values()))
+	for masterName, components in sequences.items():
+		if components == usual:
+			continue
+		if sorted(components) == sorted(usual):
+			issues.append(f"Master '{masterName}' has components in a different order: {', '.join(components)} (expected {', '.join(usual)})")
+		else:
+			issues.append(f"Master '{masterName}' has components {', '.join(components) or 'none'}, expected {', '.join(usual) or 'none'}")
+	return issues
+
+
+# (check name, report heading, check)
+CHECKS = (
+	("path_count", "PATH COUNT ISSUES", checkPathCounts),
+	("anchors", "ANCHOR ISSUES", checkAnchors),
+	("duplicate_intermediate_names", "DUPLICATE INTERMEDIATE LAYER NAMES", checkDuplicateIntermediateNames),
+	("node_count", "NODE COUNT ISSUES", checkNodeCounts),
+	("node_types", "NODE TYPE ISSUES", checkNodeTypes),
+	("start_point", "START POINT ISSUES", checkStartPoints),
+	("component_order", "COMPONENT ISSUES", checkComponentOrder),
+)
+
+
+# bump when a check changes in a way the source hash below cannot see
+CHECKS_VERSION = 1
+
+
+def _checkSetVersion():
+	"""Hash of the check names, CHECKS_VERSION and this module's source"""
+	digest = hashlib.sha1(repr((CHECKS_VERSION, [name for name, heading, check in CHECKS])).encode("utf-8"))
+	try:
+		with open(os.path.splitext(__file__)[0] + ".py", "rb") as f:
+			digest.update(f.read())
+	except (IOError, OSError, NameError):
+		pass
+	return digest.hexdigest()[:12]
+
+
+CHECK_SET_VERSION = _checkSetVersion()
+
+
+def checkGlyph(glyph, params=None):
+	"""
+	Runs all CHECKS on a GlyphSummary and returns [{"check": name, "message": text}].
+	Takes the (payload, params) arguments of a kwb.batch task.
+	"""
+	issues = []
+	for checkName, heading, check in CHECKS:
+		for message in check(glyph):
+			issues.append({"check": checkName, "message": message})
+	return issues
+
+
+# reports
+
+def reportPathFor(fontPath):
+	"""The report sits next to the font: MyFamily.glyphs -> MyFamily.compatibility.jsonl"""
+	return os.path.splitext(fontPath.rstrip("/\\"))[0] + ".compatibility.jsonl"
+
+
+def readReport(path):
+	"""{glyph name: record} from an earlier JSON lines report; missing or broken files give {}"""
+	records = {}
+	try:
+		with open(path, encoding="utf-8") as f:
+			for line in f:
+				try:
+					record = json.loads(line)
+				except ValueError:
+					continue
+				if isinstance(record, dict) and "glyph" in record:
+					records[record["glyph"]] = record
+	except (IOError, OSError):
+		pass
+	return records
+
+
+def writeReport(path, records):
+	"""Writes one JSON object per glyph and line"""
+	with open(path, "w", encoding="utf-8") as f:
+		for record in records:
+			f.write(json.dumps(record, ensure_ascii=False, sort_keys=True))
+			f.write("\n")
+
+
+def scanFont(glyphs, summarize=summarizeGlyph, previous=None, workers=None, python=None, log=None):
+	"""
+	Checks glyphs and returns (records, checkedCount) with one record per glyph
+	in glyph order. A glyph is skipped, keeping its record from previous, when
+	its lastChange or else its fingerprint is the same as then and the record
+	was made by the same CHECK_SET_VERSION.
+	"""
+	# kwb.batch imports this module for its task table
+	from kwb.batch import runBatch
+	previous = previous or {}
+	records, jobs = [], []
+	for glyph in glyphs:
+		old = previous.get(glyph.name)
+		if old and old.get("checks") != CHECK_SET_VERSION:
+			# made by other checks, so its issues say nothing about these
+			old = None
+		stamp = getattr(glyph, "lastChange", None)
+		stamp = str(stamp) if stamp is not None else None
+		if old and stamp is not None and old.get("lastChange") == stamp:
+			records.append(old)
+			continue
+		summary = summarize(glyph)
+		fingerprint = summary.fingerprint()
+		record = {"glyph": glyph.name, "fingerprint": fingerprint, "lastChange": stamp, "checks": CHECK_SET_VERSION}
+		if old and old.get("fingerprint") == fingerprint:
+			record["issues"] = old.get("issues", [])
+		else:
+			jobs.append((len(records), summary, None))
+		records.append(record)
+	for index, issues in runBatch("compatibility", jobs, workers=workers, python=python, log=log):
+		records[index]["issues"] = issues
+	return records, len(jobs)
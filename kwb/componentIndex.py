@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Reverse component index: base glyph name -> the components that use it.
+
+Built in one pass over the font so renames and reports touch only the
+composites involved. Works on GSFont and fileFont.GlyphsFileFont alike.
+"""
+
+from collections import deque
+
+
+class ComponentIndex(object):
+	def __init__(self):
+		self.usersByBase = {} # base glyph name -> [(glyph, layer, component)]
+		self.composites = {} # base glyph name -> set of composite glyph names
+
+	def build(self, font):
+		self.usersByBase, self.composites = {}, {}
+		for glyph in font.glyphs:
+			for layer in glyph.layers:
+				for component in layer.components:
+					baseName = component.componentName
+					self.usersByBase.setdefault(baseName, []).append((glyph, layer, component))
+					self.composites.setdefault(baseName, set()).add(glyph.name)
+		return self
+
+	def users(self, baseName):
+		"""(glyph, layer, component) triples whose component points at baseName"""
+		return self.usersByBase.get(baseName, [])
+
+	def dependents(self, names):
+		"""
+		Glyph names that use any of names, directly or through nested
+		components, mapped to the glyph they were reached through.
+		"""
+		reachedFrom = {}
+		queue = deque(names)
+		while queue:
+			name = queue.popleft()
+			for compositeName in sorted(self.composites.get(name, ())):
+				if compositeName in reachedFrom or compositeName in names:
+					continue
+				reachedFrom[compositeName] = name
+				queue.append(compositeName)
+		return reachedFrom
+
+	def renameBases(self, nameMapping):
+		"""
+		Points every component using a key of nameMapping at its value.
+		Reads each component's current name, so it is safe to call after
+		the glyphs themselves have been renamed. Returns the updated
+		(glyph, layer, component, oldName, newName) in index order.
+		"""
+		updates = []
+		for baseName in nameMapping:
+			for glyph, layer, component in self.users(baseName):
+				oldName = component.componentName
+				if oldName in nameMapping:
+					updates.append((glyph, layer, component, oldName, nameMapping[oldName]))
+		# apply after collecting so a swapped pair is not renamed twice
+		for glyph, layer, component, oldName, newName in updates:
+			component.componentName = newName
+		return updates
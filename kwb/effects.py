@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Headless cores of the Paths effects. Each effect takes a geometry.Layer with a
+clean outline (decomposed, overlaps removed, paths correctly oriented) and a
+dictionary of parameters, and returns a new geometry.Layer. They are plain
+module-level functions so kwb.batch can send them to worker processes.
+"""
+
+from kwb.clip import splitAtY
+from kwb.geometry import Layer
+
+
+def slotMachine(layer, params):
+	"""
+	Create Slot Machine: shifts the outline up by yShift, cuts it at topCropY
+	widened by gap, and moves the overflow below the upper piece.
+	params: topCropY, yShift, gap
+	"""
+	topCropY = params["topCropY"]
+	halfGap = params.get("gap", 0.0) / 2.0
+	shiftedPaths = [p.copy() for p in layer.paths]
+	for path in shiftedPaths:
+		path.translate(0, params.get("yShift", 0.0))
+
+	upperPaths, overflowPaths = splitAtY(shiftedPaths, topCropY - halfGap, topCropY + halfGap)
+	# upper piece sits at the top crop line, the overflow goes below it keeping the gap
+	for path in upperPaths:
+		path.translate(0, halfGap)
+	for path in overflowPaths:
+		path.translate(0, -topCropY - halfGap)
+
+	return Layer(upperPaths + overflowPaths, layer.width, layer.anchors, name=layer.name, layerId=layer.layerId)
+
+
+EFFECTS = {
+	"slotMachine": slotMachine,
+}
@@ -0,0 +1,751 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+A headless stand-in for Glyphs.font backed by a .glyphs file or .glyphspackage.
+
+Masters, axes and instances are read once. Glyphs are streamed: iterate
+font.glyphs to read them, or font.editGlyphs() to change them and have each
+glyph written back as soon as the loop moves on:
+
+	font = GlyphsFileFont("MyFamily.glyphs")
+	for glyph in font.editGlyphs("MyFamily-out.glyphs"):
+		for layer in glyph.layers:
+			layer.LSB += 10
+
+The objects mimic the parts of the GlyphsApp API the scripts use
+(layer.bounds, layer.LSB, anchor.position, instance.customParameters ...).
+"""
+
+import math
+import os
+from kwb import glyphsFile
+from kwb.glyphsFile import setKey
+from kwb.geometry import Path, LINE, CURVE, QCURVE, OFFCURVE, unionBounds
+
+# Glyphs 3 node type letters and Glyphs 2 node type words
+NODE_TYPES_3 = {"l": LINE, "c": CURVE, "q": QCURVE, "o": OFFCURVE}
+NODE_LETTERS_3 = dict((v, k) for k, v in NODE_TYPES_3.items())
+NODE_TYPES_2 = {"LINE": LINE, "CURVE": CURVE, "QCURVE": QCURVE, "OFFCURVE": OFFCURVE}
+NODE_WORDS_2 = dict((v, k) for k, v in NODE_TYPES_2.items())
+
+WEIGHT_CLASSES = {
+	"Thin": 100, "ExtraLight": 200, "UltraLight": 200, "Light": 300, "Regular": 400, "Normal": 400,
+	"Medium": 500, "SemiBold": 600, "DemiBold": 600, "Bold": 700, "ExtraBold": 800, "UltraBold": 800,
+	"Black": 900, "Heavy": 900,
+}
+WIDTH_CLASSES = {
+	"Ultra Condensed": 1, "Extra Condensed": 2, "Condensed": 3, "SemiCondensed": 4, "Medium (normal)": 5,
+	"Semi Expanded": 6, "Expanded": 7, "Extra Expanded": 8, "Ultra Expanded": 9,
+}
+DEFAULT_LAYER_WIDTH = 600.0
+
+
+class Point(object):
+	"""NSPoint look-alike"""
+	__slots__ = ("x", "y")
+
+	def __init__(self, x=0.0, y=0.0):
+		self.x = x
+		self.y = y
+
+	def __iter__(self):
+		return iter((self.x, self.y))
+
+	def __repr__(self):
+		return "(%s, %s)" % (self.x, self.y)
+
+
+class Rect(object):
+	"""NSRect look-alike with origin and size"""
+	__slots__ = ("origin", "size")
+
+	def __init__(self, xMin, yMin, xMax, yMax):
+		self.origin = Point(xMin, yMin)
+		self.size = Size(xMax - xMin, yMax - yMin)
+
+
+class Size(object):
+	__slots__ = ("width", "height")
+
+	def __init__(self, width, height):
+		self.width = width
+		self.height = height
+
+
+def _point(value):
+	if isinstance(value, Point):
+		return value.x, value.y
+	if hasattr(value, "x"):
+		return value.x, value.y
+	x, y = value
+	return x, y
+
+
+def _parseBraces(text):
+	"""Glyphs 2 writes points and transforms as strings like '{1, 0, 0, 1, 10, 0}'"""
+	return [float(v) for v in text.strip("{} ").split(",") if v.strip()]
+
+
+def _number(value):
+	return int(value) if float(value).is_integer() else value
+
+
+def componentMatrix(data):
+	"""Affine matrix (xx, xy, yx, yy, dx, dy) of a component dictionary in either format"""
+	if "transform" in data:
+		transform = data["transform"]
+		if isinstance(transform, str):
+			return tuple(_parseBraces(transform))
+		return tuple(float(v) for v in transform)
+	x, y = data.get("pos", (0, 0))
+	sx, sy = data.get("scale", (1, 1))
+	angle = math.radians(float(data.get("angle", 0)))
+	cos, sin = math.cos(angle), math.sin(angle)
+	return (sx * cos, sx * sin, -sy * sin, sy * cos, float(x), float(y))
+
+
+def transformBounds(bounds, matrix):
+	xMin, yMin, xMax, yMax = bounds
+	xx, xy, yx, yy, dx, dy = matrix
+	corners = [(xx * x + yx * y + dx, xy * x + yy * y + dy) for x in (xMin, xMax) for y in (yMin, yMax)]
+	xs = [c[0] for c in corners]
+	ys = [c[1] for c in corners]
+	return min(xs), min(ys), max(xs), max(ys)
+
+
+class FileAnchor(object):
+	def __init__(self, data, layer):
+		self._data = data
+		self._layer = layer
+
+	@property
+	def name(self):
+		return self._data.get("name")
+
+	@name.setter
+	def name(self, value):
+		setKey(self._data, "name", value)
+
+	@property
+	def position(self):
+		if "position" in self._data:
+			return Point(*_parseBraces(self._data["position"]))
+		x, y = self._data.get("pos", (0, 0))
+		return Point(x, y)
+
+	@position.setter
+	def position(self, value):
+		x, y = _point(value)
+		if self._layer.parent.font.formatVersion >= 3:
+			self._data.pop("position", None)
+			setKey(self._data, "pos", [_number(x), _number(y)])
+		else:
+			setKey(self._data, "position", "{%s, %s}" % (glyphsFile.formatNumber(float(x)), glyphsFile.formatNumber(float(y))))
+
+
+class FileAnchors(object):
+	"""List-like access to the anchors of a layer"""
+
+	def __init__(self, layer):
+		self._layer = layer
+
+	def _list(self):
+		if "anchors" not in self._layer._data:
+			setKey(self._layer._data, "anchors", [])
+		return self._layer._data["anchors"]
+
+	def __iter__(self):
+		return iter([FileAnchor(d, self._layer) for d in self._layer._data.get("anchors", [])])
+
+	def __len__(self):
+		return len(self._layer._data.get("anchors", []))
+
+	def __getitem__(self, key):
+		if isinstance(key, int):
+			return FileAnchor(self._list()[key], self._layer)
+		for anchor in self:
+			if anchor.name == key:
+				return anchor
+		return None
+
+	def append(self, anchor):
+		"""Accepts a FileAnchor, or anything with name and position"""
+		data = {"name": anchor.name}
+		self._list().append(data)
+		FileAnchor(data, self._layer).position = anchor.position
+
+	def new(self, name, position=(0, 0)):
+		data = {"name": name}
+		self._list().append(data)
+		anchor = FileAnchor(data, self._layer)
+		anchor.position = position
+		return anchor
+
+
+class FileComponent(object):
+	def __init__(self, data):
+		self._data = data
+
+	@property
+	def componentName(self):
+		return self._data.get("ref", self._data.get("name"))
+
+	@componentName.setter
+	def componentName(self, value):
+		setKey(self._data, "ref" if "ref" in self._data else "name", value)
+
+	@property
+	def transform(self):
+		return componentMatrix(self._data)
+
+
+class FileLayer(object):
+	"""A glyph layer; outlines are parsed into geometry.Path objects when first needed"""
+
+	def __init__(self, data, parent):
+		self._data = data
+		self.parent = parent
+		self._paths = None
+		self._pathsTouched = False
+
+	def __repr__(self):
+		return "<FileLayer %s %s>" % (self.parent.name, self.name)
+
+	# identity
+
+	@property
+	def layerId(self):
+		return self._data.get("layerId")
+
+	@property
+	def associatedMasterId(self):
+		return self._data.get("associatedMasterId", self.layerId)
+
+	@property
+	def isMasterLayer(self):
+		return self.layerId in self.parent.font.masterIds
+
+	@property
+	def isSpecialLayer(self):
+		name = self._data.get("name") or ""
+		return bool(self._data.get("attr")) or "{" in name or "[" in name
+
+	@property
+	def name(self):
+		if self.isMasterLayer and not self._data.get("name"):
+			return self.parent.font.masterById(self.layerId).name
+		return self._data.get("name")
+
+	@property
+	def associatedFontMaster(self):
+		return self.parent.font.masterById(self.associatedMasterId)
+
+	# outlines
+
+	def _readPaths(self):
+		if self._paths is not None:
+			return
+		self._paths = []
+		if "shapes" in self._data:
+			for shape in self._data["shapes"]:
+				if "nodes" in shape:
+					self._paths.append(self._pathFrom3(shape))
+		else:
+			for shape in self._data.get("paths", []):
+				self._paths.append(self._pathFrom2(shape))
+
+	def _pathFrom3(self, shape):
+		path = Path(closed=bool(shape.get("closed", 1)))
+		for node in shape.get("nodes", []):
+			x, y, kind = node[0], node[1], node[2]
+			path.addNode(x, y, NODE_TYPES_3.get(kind[0], LINE), kind.endswith("s"))
+		return path
+
+	def _pathFrom2(self, shape):
+		path = Path(closed=bool(shape.get("closed", 1)))
+		for node in shape.get("nodes", []):
+			parts = node.split()
+			path.addNode(float(parts[0]), float(parts[1]), NODE_TYPES_2.get(parts[2], LINE), len(parts) > 3 and parts[3] == "SMOOTH")
+		return path
+
+	@property
+	def paths(self):
+		"""The outlines; they are written back when the glyph is saved"""
+		self._readPaths()
+		self._pathsTouched = True
+		return self._paths
+
+	@paths.setter
+	def paths(self, value):
+		self._paths = list(value)
+		self._pathsTouched = True
+
+	@property
+	def components(self):
+		if "shapes" in self._data:
+			return [FileComponent(s) for s in self._data["shapes"] if "ref" in s]
+		return [FileComponent(c) for c in self._data.get("components", [])]
+
+	@property
+	def anchors(self):
+		return FileAnchors(self)
+
+	def sync(self):
+		"""Writes changed outlines back into the layer dictionary"""
+		if not self._pathsTouched:
+			return
+		if self.parent.font.formatVersion >= 3:
+			pathShapes = []
+			for path in self._paths:
+				nodes = []
+				for i, (x, y) in enumerate(path.points()):
+					kind = NODE_LETTERS_3[path.types[i]] + ("s" if path.smooth[i] else "")
+					nodes.append((_number(x), _number(y), kind))
+				pathShapes.append({"closed": 1 if path.closed else 0, "nodes": nodes})
+			# keep paths and components interleaved as they were, and any extra keys on the paths
+			shapes = []
+			for shape in self._data.get("shapes", []):
+				if "ref" in shape:
+					shapes.append(shape)
+				elif pathShapes:
+					shape.update(pathShapes.pop(0))
+					shapes.append(shape)
+			setKey(self._data, "shapes", shapes + pathShapes)
+		else:
+			paths = []
+			for path in self._paths:
+				nodes = []
+				for i, (x, y) in enumerate(path.points()):
+					node = "%s %s %s" % (glyphsFile.formatNumber(float(x)), glyphsFile.formatNumber(float(y)), NODE_WORDS_2[path.types[i]])
+					if path.smooth[i]:
+						node += " SMOOTH"
+					nodes.append(node)
+				paths.append({"closed": 1 if path.closed else 0, "nodes": nodes})
+			setKey(self._data, "paths", paths)
+		self._pathsTouched = False
+
+	# metrics
+
+	@property
+	def width(self):
+		return float(self._data.get("width", DEFAULT_LAYER_WIDTH if self.parent.font.formatVersion >= 3 else 0))
+
+	@width.setter
+	def width(self, value):
+		setKey(self._data, "width", _number(value))
+
+	def boundsTuple(self):
+		"""(xMin, yMin, xMax, yMax) of paths and components, or None if the layer is empty"""
+		self._readPaths()
+		boxes = [b for b in (p.bounds() for p in self._paths) if b]
+		for component in self.components:
+			baseBounds = self.parent.font.glyphBounds(component.componentName, self.associatedMasterId)
+			if baseBounds:
+				boxes.append(transformBounds(baseBounds, component.transform))
+		return unionBounds(boxes)
+
+	@property
+	def bounds(self):
+		bounds = self.boundsTuple()
+		if not bounds:
+			return Rect(0, 0, 0, 0)
+		return Rect(*bounds)
+
+	@property
+	def LSB(self):
+		bounds = self.boundsTuple()
+		return bounds[0] if bounds else 0.0
+
+	@LSB.setter
+	def LSB(self, value):
+		bounds = self.boundsTuple()
+		if not bounds:
+			return
+		delta = value - bounds[0]
+		self.applyShift(delta)
+		self.width = self.width + delta
+
+	@property
+	def RSB(self):
+		bounds = self.boundsTuple()
+		return self.width - bounds[2] if bounds else self.width
+
+	@RSB.setter
+	def RSB(self, value):
+		bounds = self.boundsTuple()
+		if not bounds:
+			return
+		self.width = bounds[2] + value
+
+	def applyShift(self, dx, dy=0.0):
+		"""Moves paths, components and anchors"""
+		for path in self.paths:
+			path.translate(dx, dy)
+		for component in self.components:
+			data = component._data
+			if "transform" in data:
+				xx, xy, yx, yy, tx, ty = componentMatrix(data)
+				matrix = (xx, xy, yx, yy, tx + dx, ty + dy)
+				if isinstance(data["transform"], str):
+					data["transform"] = "{%s}" % ", ".join(glyphsFile.formatNumber(float(v)) for v in matrix)
+				else:
+					data["transform"] = [_number(v) for v in matrix]
+			else:
+				x, y = data.get("pos", (0, 0))
+				setKey(data, "pos", [_number(x + dx), _number(y + dy)])
+		for anchor in self.anchors:
+			x, y = anchor.position
+			anchor.position = (x + dx, y + dy)
+
+
+class FileLayers(object):
+	"""glyph.layers: iterable, indexable by position or by layer id"""
+
+	def __init__(self, glyph):
+		self._glyph = glyph
+		self._layers = [FileLayer(d, glyph) for d in glyph._data.get("layers", [])]
+
+	def __iter__(self):
+		return iter(self._layers)
+
+	def __len__(self):
+		return len(self._layers)
+
+	def __getitem__(self, key):
+		if isinstance(key, int):
+			return self._layers[key]
+		for layer in self._layers:
+			if layer.layerId == key:
+				return layer
+		return None
+
+
+class FileGlyph(object):
+	def __init__(self, data, font):
+		self._data = data
+		self.font = font
+		self.layers = FileLayers(self)
+
+	def __repr__(self):
+		return "<FileGlyph %s>" % self.name
+
+	@property
+	def name(self):
+		return self._data.get("glyphname")
+
+	@name.setter
+	def name(self, value):
+		setKey(self._data, "glyphname", value)
+
+	@property
+	def unicode(self):
+		value = self._data.get("unicode")
+		if isinstance(value, list):
+			value = value[0] if value else None
+		if value is None:
+			return None
+		if self.font.formatVersion >= 3:
+			return "%04X" % int(value)
+		return str(value)
+
+	@property
+	def category(self):
+		return self._data.get("category")
+
+	@property
+	def subCategory(self):
+		return self._data.get("subCategory")
+
+	@property
+	def script(self):
+		return self._data.get("script")
+
+	@property
+	def export(self):
+		return bool(self._data.get("export", 1))
+
+	@export.setter
+	def export(self, value):
+		setKey(self._data, "export", 1 if value else 0)
+
+	@property
+	def color(self):
+		return self._data.get("color")
+
+	@color.setter
+	def color(self, value):
+		setKey(self._data, "color", value)
+
+	def sync(self):
+		for layer in self.layers:
+			layer.sync()
+		return self._data
+
+	def beginUndo(self):
+		pass
+
+	def endUndo(self):
+		pass
+
+
+class FileMaster(object):
+	def __init__(self, data, font):
+		self._data = data
+		self.font = font
+
+	def __repr__(self):
+		return "<FileMaster %s>" % self.name
+
+	@property
+	def id(self):
+		return self._data.get("id")
+
+	@property
+	def name(self):
+		if "name" in self._data:
+			return self._data["name"]
+		for parameter in self._data.get("customParameters", []):
+			if parameter.get("name") == "Master Name":
+				return parameter.get("value")
+		parts = []
+		for key in ("width", "weight", "custom"):
+			part = self._data.get(key)
+			if part and part != "Regular" and part not in parts:
+				parts.append(part)
+		return " ".join(parts) or "Regular"
+
+	@property
+	def axesValues(self):
+		if "axesValues" in self._data:
+			return list(self._data["axesValues"])
+		keys = ("weightValue", "widthValue", "customValue", "customValue1", "customValue2", "customValue3")
+		return [self._data.get(k, 100 if k == "weightValue" else 0) for k in keys[:len(self.font.axes) or 1]]
+
+	def metric(self, metricType):
+		"""(position, overshoot) of a metric such as 'x-height', or None"""
+		if self.font.formatVersion >= 3:
+			values = self._data.get("metricValues", [])
+			for i, metric in enumerate(self.font.info.get("metrics", [])):
+				if metric.get("type") == metricType and "filter" not in metric and i < len(values):
+					return values[i].get("pos", 0), values[i].get("over", 0)
+			return None
+		key = {"ascender": "ascender", "cap height": "capHeight", "x-height": "xHeight", "descender": "descender", "baseline": None}.get(metricType)
+		defaults = {"ascender": 800, "capHeight": 700, "xHeight": 500, "descender": -200}
+		position = self._data.get(key, defaults.get(key)) if key else 0
+		if position is None:
+			return None
+		for zone in self._data.get("alignmentZones", []):
+			zonePosition, size = _parseBraces(zone)
+			if zonePosition == position:
+				return position, size
+		return position, 0
+
+	def _metricPosition(self, metricType, default):
+		metric = self.metric(metricType)
+		return metric[0] if metric else default
+
+	@property
+	def ascender(self):
+		return self._metricPosition("ascender", 800)
+
+	@property
+	def capHeight(self):
+		return self._metricPosition("cap height", 700)
+
+	@property
+	def xHeight(self):
+		return self._metricPosition("x-height", 500)
+
+	@property
+	def descender(self):
+		return self._metricPosition("descender", -200)
+
+
+class FileAxis(object):
+	def __init__(self, data):
+		self._data = data
+
+	@property
+	def name(self):
+		return self._data.get("name", self._data.get("Name"))
+
+	@property
+	def axisTag(self):
+		return self._data.get("tag", self._data.get("Tag"))
+
+
+class CustomParameters(object):
+	"""instance.customParameters[name] on top of the list of name/value dictionaries"""
+
+	def __init__(self, owner):
+		self._owner = owner
+
+	def _list(self):
+		if "customParameters" not in self._owner:
+			setKey(self._owner, "customParameters", [])
+		return self._owner["customParameters"]
+
+	def __getitem__(self, name):
+		for parameter in self._owner.get("customParameters", []):
+			if parameter.get("name") == name:
+				return parameter.get("value")
+		return None
+
+	def __setitem__(self, name, value):
+		if isinstance(value, tuple):
+			value = list(value)
+		for parameter in self._list():
+			if parameter.get("name") == name:
+				parameter["value"] = value
+				return
+		self._list().append({"name": name, "value": value})
+
+	def __delitem__(self, name):
+		setKey(self._owner, "customParameters", [p for p in self._list() if p.get("name") != name])
+
+
+class FileInstance(object):
+	def __init__(self, data, font):
+		self._data = data
+		self.font = font
+		self.customParameters = CustomParameters(data)
+
+	def __repr__(self):
+		return "<FileInstance %s>" % self.name
+
+	@property
+	def name(self):
+		return self._data.get("name")
+
+	@property
+	def active(self):
+		return bool(self._data.get("exports", self._data.get("active", 1)))
+
+	@property
+	def weightClass(self):
+		value = self._data.get("weightClass", 400)
+		return WEIGHT_CLASSES.get(value, value) if isinstance(value, str) else value
+
+	@property
+	def widthClass(self):
+		value = self._data.get("widthClass", 5)
+		return WIDTH_CLASSES.get(value, 5) if isinstance(value, str) else value
+
+	def coordinateForAxisIndex_(self, index):
+		if "axesValues" in self._data:
+			values = self._data["axesValues"]
+			return values[index] if index < len(values) else 0
+		keys = ("interpolationWeight", "interpolationWidth", "interpolationCustom", "interpolationCustom1", "interpolationCustom2", "interpolationCustom3")
+		return self._data.get(keys[index], 100 if index == 0 else 0) if index < len(keys) else 0
+
+
+class GlyphStream(object):
+	"""font.glyphs: iterating streams the file; looking a glyph up by name scans for it"""
+
+	def __init__(self, font):
+		self._font = font
+
+	def __iter__(self):
+		for data in self._font.reader.glyphs():
+			yield FileGlyph(data, self._font)
+
+	def __getitem__(self, name):
+		for glyph in self:
+			if glyph.name == name:
+				return glyph
+		return None
+
+	def __contains__(self, name):
+		return self[name] is not None
+
+
+class GlyphsFileFont(object):
+	"""Stand-in for GSFont that keeps only the font info and one glyph in memory"""
+
+	def __init__(self, filePath):
+		self.filepath = filePath
+		self.reader = glyphsFile.GlyphsFileReader(filePath)
+		self.info = self.reader.fontInfo()
+		self.formatVersion = int(self.info.get(".formatVersion", 2))
+		self.masters = [FileMaster(d, self) for d in self.info.get("fontMaster", [])]
+		self.masterIds = set(m.id for m in self.masters)
+		self.axes = [FileAxis(d) for d in self.info.get("axes", [])]
+		self.instances = [FileInstance(d, self) for d in self.info.get("instances", [])]
+		self.glyphs = GlyphStream(self)
+		self._boundsIndex = None
+
+	def __repr__(self):
+		return "<GlyphsFileFont %s>" % os.path.basename(self.filepath)
+
+	@property
+	def familyName(self):
+		return self.info.get("familyName")
+
+	@property
+	def upm(self):
+		return self.info.get("unitsPerEm", 1000)
+
+	def masterById(self, masterId):
+		for master in self.masters:
+			if master.id == masterId:
+				return master
+		return None
+
+	def glyphBounds(self, glyphName, masterId):
+		"""
+		Bounds of a glyph in a master, resolving nested components. Built from
+		one extra streaming pass that keeps only boxes and component references.
+		"""
+		if self._boundsIndex is None:
+			self._boundsIndex = {}
+			for glyph in self.glyphs:
+				for layer in glyph.layers:
+					if not layer.isMasterLayer:
+						continue
+					layer._readPaths()
+					pathBounds = unionBounds(b for b in (p.bounds() for p in layer._paths) if b)
+					references = [(c.componentName, c.transform) for c in layer.components]
+					self._boundsIndex[(glyph.name, layer.layerId)] = (pathBounds, references)
+		return self._resolveBounds(glyphName, masterId, set())
+
+	def _resolveBounds(self, glyphName, masterId, visiting):
+		entry = self._boundsIndex.get((glyphName, masterId))
+		if not entry or glyphName in visiting:
+			return None
+		pathBounds, references = entry
+		if not references:
+			return pathBounds
+		visiting = visiting | set([glyphName])
+		boxes = [pathBounds] if pathBounds else []
+		for baseName, matrix in references:
+			baseBounds = self._resolveBounds(baseName, masterId, visiting)
+			if baseBounds:
+				boxes.append(transformBounds(baseBounds, matrix))
+		return unionBounds(boxes)
+
+	def editGlyphs(self, outputPath=None):
+		"""
+		Yields every glyph for editing and writes it to outputPath (default: the
+		source itself) as soon as the next one is requested. Font info changes made
+		before the loop finishes are saved too.
+		"""
+		outputPath = outputPath or self.filepath
+		writer = glyphsFile.GlyphsFileWriter(outputPath, package=outputPath.endswith(".glyphspackage") or (outputPath == self.filepath and self.reader.package))
+		try:
+			for glyph in self.glyphs:
+				yield glyph
+				writer.writeGlyph(glyph.sync())
+		except BaseException:
+			writer.abort()
+			raise
+		extraFiles = {}
+		if self.reader.package and writer.package:
+			uiState = os.path.join(self.filepath, "UIState.plist")
+			if os.path.exists(uiState):
+				extraFiles["UIState.plist"] = uiState
+		writer.close(self.info, extraFiles)
+		self._boundsIndex = None
+
+	def save(self, outputPath=None):
+		"""Writes the font info (and all glyphs unchanged) to outputPath"""
+		for glyph in self.editGlyphs(outputPath):
+			pass
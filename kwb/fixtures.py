@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Synthetic glyphs for benchmarking the path effects without a font.
+
+Outlines are wobbly rings of on-curve nodes, a set share of them ending
+curves, laid out side by side so they do not overlap. Component depth is
+built as a chain of glyphs, each one placing the glyph below it and adding
+its own contour, and decomposed with the same matrix convention as
+GSComponent.transform. Everything is seeded, so a fixture is identical on
+every run and every machine.
+"""
+
+import math
+import random
+from kwb.geometry import Path, Layer
+
+CONTOUR_SIZE = 200.0
+CONTOUR_GAP = 40.0
+
+
+def syntheticPath(nodes, curveRatio, rng, centerX=0.0, centerY=0.0, radius=CONTOUR_SIZE / 2):
+	"""A closed counterclockwise contour with nodes on-curve nodes, about curveRatio of them curves"""
+	nodes = max(3, int(nodes))
+	points = []
+	for i in range(nodes):
+		angle = 2 * math.pi * i / nodes
+		r = radius * (0.75 + 0.25 * rng.random())
+		points.append((centerX + r * math.cos(angle), centerY + r * math.sin(angle)))
+	segments = []
+	for i, end in enumerate(points[1:] + points[:1]):
+		start = points[i]
+		if rng.random() < curveRatio:
+			# handles a third of the way along, pushed outwards a little
+			bulge = 0.15 * rng.random()
+			nx, ny = end[1] - start[1], start[0] - end[0]
+			segments.append([
+				start,
+				(start[0] + (end[0] - start[0]) / 3 + nx * bulge, start[1] + (end[1] - start[1]) / 3 + ny * bulge),
+				(start[0] + 2 * (end[0] - start[0]) / 3 + nx * bulge, start[1] + 2 * (end[1] - start[1]) / 3 + ny * bulge),
+				end,
+			])
+		else:
+			segments.append([start, end])
+	return Path.fromSegments(segments)
+
+
+def syntheticLayer(contours=4, nodes=40, curveRatio=0.5, seed=0, name=None):
+	"""A layer of contours rings side by side, each with nodes on-curve nodes"""
+	rng = random.Random("%s/%s/%s/%s" % (seed, contours, nodes, curveRatio))
+	step = CONTOUR_SIZE + CONTOUR_GAP
+	paths = []
+	for i in range(contours):
+		centerX = CONTOUR_GAP + CONTOUR_SIZE / 2 + i * step
+		paths.append(syntheticPath(nodes, curveRatio, rng, centerX, CONTOUR_SIZE / 2))
+	return Layer(paths, width=CONTOUR_GAP + contours * step, name=name)
+
+
+def syntheticGlyphs(contours=4, nodes=40, curveRatio=0.5, componentDepth=0, seed=0):
+	"""
+	{glyphName: Layer} with a base glyph and componentDepth composites on top
+	of it. Returns the glyphs and the name of the top one.
+	"""
+	glyphs = {"base": syntheticLayer(contours, nodes, curveRatio, seed, "base")}
+	below = "base"
+	for depth in range(1, componentDepth + 1):
+		name = "composite%d" % depth
+		layer = syntheticLayer(1, nodes, curveRatio, seed + depth, name)
+		# move the base up out of the way of the composite's own contour
+		layer.components.append([below, (1, 0, 0, 1, 0, CONTOUR_SIZE + CONTOUR_GAP)])
+		glyphs[name] = layer
+		below = name
+	return glyphs, below
+
+
+def decomposed(glyphs, name, matrix=(1, 0, 0, 1, 0, 0)):
+	"""The paths of glyphs[name] with all components resolved, transformed by matrix"""
+	layer = glyphs[name]
+	paths = [p.copy().transform(matrix) for p in layer.paths]
+	xx, xy, yx, yy, dx, dy = matrix
+	for componentName, (cxx, cxy, cyx, cyy, cdx, cdy) in layer.components:
+		# the component's transformation first, then ours
+		combined = (
+			cxx * xx + cxy * yx,
+			cxx * xy + cxy * yy,
+			cyx * xx + cyy * yx,
+			cyx * xy + cyy * yy,
+			cdx * xx + cdy * yx + dx,
+			cdx * xy + cdy * yy + dy,
+		)
+		paths.extend(decomposed(glyphs, componentName, combined))
+	return paths
+
+
+def fixtureName(contours, nodes, curveRatio, componentDepth):
+	return "c%d-n%d-r%g-d%d" % (contours, nodes, curveRatio, componentDepth)
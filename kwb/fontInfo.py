@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Font Info helpers shared by the Font Info scripts. Works on GSFont and
+fileFont.GlyphsFileFont alike.
+"""
+
+# Standard weight class to weight axis mapping
+WEIGHT_MAPPING = {
+	100: 100,   # Thin
+	200: 200,   # Extra Light
+	300: 300,   # Light
+	400: 400,   # Regular
+	500: 500,   # Medium
+	600: 600,   # Semi Bold
+	700: 700,   # Bold
+	800: 800,   # Extra Bold
+	900: 900,   # Black
+}
+
+# Standard width class to width axis percentage mapping
+WIDTH_MAPPING = {
+	1: 50,    # Ultra Condensed
+	2: 62.5,  # Extra Condensed
+	3: 75,    # Condensed
+	4: 87.5,  # Semi Condensed
+	5: 100,   # Normal
+	6: 112.5, # Semi Expanded
+	7: 125,   # Expanded
+	8: 150,   # Extra Expanded
+	9: 200,   # Ultra Expanded
+}
+
+
+def weightFromClass(weightClass):
+	"""Convert weight class to weight axis value"""
+	return WEIGHT_MAPPING.get(weightClass, weightClass)
+
+
+def widthFromClass(widthClass):
+	"""Convert width class to width axis value"""
+	return WIDTH_MAPPING.get(widthClass, 100)
+
+
+def instancesToProcess(font, includeInactive=False):
+	if includeInactive:
+		return list(font.instances)
+	return [instance for instance in font.instances if instance.active]
+
+
+def axisLocations(font, instance, setWeightByClass=False, setWidthByClass=False, log=None):
+	"""
+	[(axis name, location), ...] for the Axis Location parameter of an instance.
+	Axes whose value cannot be read are reported through log and skipped.
+	"""
+	locations = []
+	for i, axis in enumerate(font.axes):
+		if axis.axisTag == "wght" and setWeightByClass:
+			value = weightFromClass(instance.weightClass)
+			source = "weight class %s" % instance.weightClass
+		elif axis.axisTag == "wdth" and setWidthByClass:
+			value = widthFromClass(instance.widthClass)
+			source = "width class %s" % instance.widthClass
+		else:
+			try:
+				value = instance.coordinateForAxisIndex_(i)
+			except Exception as e:
+				if log:
+					log("  Error getting axis value for %s, %s: %s" % (instance.name, axis.name, e))
+				continue
+			source = "axis coordinates"
+		if log:
+			log("  %s: %s = %s (from %s)" % (instance.name, axis.name, value, source))
+		locations.append((axis.name, value))
+	return locations
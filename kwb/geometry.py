@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Compact, array-backed stand-ins for GSPath and GSLayer.
+
+A Path keeps its node types in a bytearray and its coordinates in one flat
+array of doubles (x0, y0, x1, y1, ...). Node order follows Glyphs: in a closed
+path the last node is the start point and every on-curve node ends a segment.
+"""
+
+from array import array
+from kwb import bezier
+
+# node types
+LINE = 0
+CURVE = 1
+QCURVE = 2
+OFFCURVE = 3
+
+ONCURVE_TYPES = (LINE, CURVE, QCURVE)
+
+
+class Path(object):
+	"""One contour: node types, flat coordinates, smooth flags and closed state"""
+	__slots__ = ("types", "coords", "smooth", "closed")
+
+	def __init__(self, types=None, coords=None, closed=True, smooth=None):
+		self.types = bytearray(types or ())
+		self.coords = array("d", coords or ())
+		self.smooth = bytearray(smooth) if smooth is not None else bytearray(len(self.types))
+		self.closed = closed
+
+	def __len__(self):
+		return len(self.types)
+
+	def __repr__(self):
+		return "<Path %d nodes%s>" % (len(self.types), "" if self.closed else " open")
+
+	def __eq__(self, other):
+		return (
+			isinstance(other, Path)
+			and self.closed == other.closed
+			and self.types == other.types
+			and self.coords == other.coords
+		)
+
+	def __ne__(self, other):
+		return not self == other
+
+	@classmethod
+	def fromSegments(cls, segments, closed=True, smooth=None):
+		"""
+		Builds a path from line (2 point) and cubic (4 point) segments.
+		smooth is an optional list of flags for the end node of each segment.
+		"""
+		path = cls(closed=closed)
+		if not segments:
+			return path
+		if not closed:
+			x, y = segments[0][0]
+			path.addNode(x, y, LINE)
+		for i, segment in enumerate(segments):
+			for x, y in segment[1:-1]:
+				path.addNode(x, y, OFFCURVE)
+			x, y = segment[-1]
+			path.addNode(x, y, LINE if len(segment) == 2 else CURVE, smooth[i] if smooth else False)
+		return path
+
+	def addNode(self, x, y, nodeType=LINE, smooth=False):
+		self.types.append(nodeType)
+		self.coords.append(x)
+		self.coords.append(y)
+		self.smooth.append(1 if smooth else 0)
+
+	def position(self, i):
+		return self.coords[2*i], self.coords[2*i+1]
+
+	def setPosition(self, i, x, y):
+		self.coords[2*i] = x
+		self.coords[2*i+1] = y
+
+	def points(self):
+		c = self.coords
+		return [(c[i], c[i+1]) for i in range(0, len(c), 2)]
+
+	def onCurveCount(self):
+		return len(self.types) - self.types.count(OFFCURVE)
+
+	def onCurveIndexes(self):
+		return [i for i, t in enumerate(self.types) if t != OFFCURVE]
+
+	def startIndex(self):
+		"""Index of the node the first segment starts from"""
+		if not self.closed:
+			return 0
+		for i in range(len(self.types) - 1, -1, -1):
+			if self.types[i] != OFFCURVE:
+				return i
+		return None
+
+	def segments(self):
+		"""Lines as 2 points, curves as 4 points; quadratic splines are converted to cubics"""
+		types, points = self.types, self.points()
+		start = self.startIndex()
+		if start is None:
+			return []
+		if self.closed:
+			order = list(range(start + 1, len(types))) + list(range(0, start + 1))
+		else:
+			order = range(start + 1, len(types))
+		segments = []
+		current = points[start]
+		offcurves = []
+		for i in order:
+			if types[i] == OFFCURVE:
+				offcurves.append(points[i])
+				continue
+			end = points[i]
+			if not offcurves:
+				segments.append([current, end])
+			elif len(offcurves) == 2 and types[i] != QCURVE:
+				segments.append([current, offcurves[0], offcurves[1], end])
+			else:
+				# quadratic spline with implied on-curves between consecutive off-curves
+				q0 = current
+				for j, q1 in enumerate(offcurves):
+					if j < len(offcurves) - 1:
+						q2 = bezier.lerp(q1, offcurves[j+1], 0.5)
+					else:
+						q2 = end
+					segments.append(bezier.quadraticToCubic(q0, q1, q2))
+					q0 = q2
+			current = end
+			offcurves = []
+		return segments
+
+	def segmentSmoothFlags(self):
+		"""Smooth flags of the end node of each segment, in segment order"""
+		start = self.startIndex()
+		if start is None:
+			return []
+		indexes = self.onCurveIndexes()
+		if self.closed:
+			indexes = [i for i in indexes if i > start] + [i for i in indexes if i <= start]
+		else:
+			indexes = [i for i in indexes if i > start]
+		return [self.smooth[i] for i in indexes]
+
+	def copy(self):
+		return Path(self.types, self.coords, self.closed, self.smooth)
+
+	def translate(self, dx, dy):
+		c = self.coords
+		for i in range(0, len(c), 2):
+			c[i] += dx
+			c[i+1] += dy
+		return self
+
+	def transform(self, matrix):
+		"""Applies an affine (xx, xy, yx, yy, dx, dy) transformation in place"""
+		xx, xy, yx, yy, dx, dy = matrix
+		c = self.coords
+		for i in range(0, len(c), 2):
+			x, y = c[i], c[i+1]
+			c[i] = xx * x + yx * y + dx
+			c[i+1] = xy * x + yy * y + dy
+		return self
+
+	def reverse(self):
+		"""Reverses the path direction in place"""
+		segments = self.segments()
+		if not segments:
+			return self
+		smooth = self.segmentSmoothFlags()
+		reversedSegments = [list(reversed(s)) for s in reversed(segments)]
+		if self.closed:
+			# the end of each reversed segment is the start of the original one
+			reversedSmooth = [smooth[i - 1] for i in range(len(smooth) - 1, -1, -1)]
+		else:
+			reversedSmooth = list(reversed(smooth))[1:] + [0]
+		rebuilt = Path.fromSegments(reversedSegments, self.closed, reversedSmooth)
+		self.types, self.coords, self.smooth = rebuilt.types, rebuilt.coords, rebuilt.smooth
+		return self
+
+	def signedArea(self):
+		"""Positive for counterclockwise paths, 0 for open paths"""
+		if not self.closed:
+			return 0.0
+		return sum(bezier.segmentArea(s) for s in self.segments())
+
+	def area(self):
+		return abs(self.signedArea())
+
+	def direction(self):
+		"""-1 for counterclockwise, 1 for clockwise, like GSPath.direction"""
+		return -1 if self.signedArea() >= 0 else 1
+
+	def bounds(self):
+		"""(xMin, yMin, xMax, yMax) including curve extrema, or None for an empty path"""
+		segments = self.segments()
+		if not segments:
+			if not self.types:
+				return None
+			x, y = self.position(0)
+			return (x, y, x, y)
+		return unionBounds(bezier.segmentBounds(s) for s in segments)
+
+
+class Layer(object):
+	"""Paths, anchors and component references of one glyph layer"""
+	__slots__ = ("paths", "width", "anchors", "components", "name", "layerId")
+
+	def __init__(self, paths=None, width=0.0, anchors=None, components=None, name=None, layerId=None):
+		self.paths = list(paths or ())
+		self.width = width
+		self.anchors = [list(a) for a in anchors or ()] # [name, x, y]
+		self.components = [list(c) for c in components or ()] # [glyphName, (xx, xy, yx, yy, dx, dy)]
+		self.name = name
+		self.layerId = layerId
+
+	def __repr__(self):
+		return "<Layer %s: %d paths, %d components>" % (self.name, len(self.paths), len(self.components))
+
+	def copy(self):
+		return Layer(
+			[p.copy() for p in self.paths],
+			self.width,
+			self.anchors,
+			[[name, tuple(matrix)] for name, matrix in self.components],
+			self.name,
+			self.layerId,
+		)
+
+	def nodeCount(self):
+		return sum(len(p) for p in self.paths)
+
+	def onCurveCount(self):
+		return sum(p.onCurveCount() for p in self.paths)
+
+	def bounds(self):
+		"""Bounds of the paths only, components need their base glyphs resolved first"""
+		return unionBounds(b for b in (p.bounds() for p in self.paths) if b)
+
+	def translate(self, dx, dy):
+		for p in self.paths:
+			p.translate(dx, dy)
+		for anchor in self.anchors:
+			anchor[1] += dx
+			anchor[2] += dy
+		for component in self.components:
+			xx, xy, yx, yy, tx, ty = component[1]
+			component[1] = (xx, xy, yx, yy, tx + dx, ty + dy)
+		return self
+
+	def anchor(self, name):
+		for anchor in self.anchors:
+			if anchor[0] == name:
+				return anchor
+		return None
+
+
+def unionBounds(boundsList):
+	result = None
+	for xMin, yMin, xMax, yMax in boundsList:
+		if result is None:
+			result = [xMin, yMin, xMax, yMax]
+		else:
+			result[0] = min(result[0], xMin)
+			result[1] = min(result[1], yMin)
+			result[2] = max(result[2], xMax)
+			result[3] = max(result[3], yMax)
+	return tuple(result) if result else None
+
+
+def rectanglePath(xMin, yMin, xMax, yMax):
+	"""Counterclockwise rectangle"""
+	return Path.fromSegments([
+		[(xMin, yMin), (xMax, yMin)],
+		[(xMax, yMin), (xMax, yMax)],
+		[(xMax, yMax), (xMin, yMax)],
+		[(xMin, yMax), (xMin, yMin)],
+	])
@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Converts between GlyphsApp objects and the headless kwb.geometry types.
+This is the only module in kwb that needs Glyphs.app.
+"""
+
+import hashlib
+from array import array
+from contextlib import contextmanager
+from AppKit import NSMutableIndexSet
+from GlyphsApp import Glyphs, GSPath, GSNode, GSLayer, GSAnchor, GSComponent, LINE, CURVE, QCURVE, OFFCURVE
+from kwb import geometry
+from kwb.pathMetrics import PathMetrics
+from kwb.outlineCache import OutlineCache
+from kwb.profiling import Profiler
+
+TYPE_FROM_GLYPHS = {
+	LINE: geometry.LINE,
+	CURVE: geometry.CURVE,
+	QCURVE: geometry.QCURVE,
+	OFFCURVE: geometry.OFFCURVE,
+}
+TYPE_TO_GLYPHS = dict((v, k) for k, v in TYPE_FROM_GLYPHS.items())
+# GSNodeType values as key-value coding hands them out, not the Python-level constants
+TYPE_FROM_RAW = {
+	1: geometry.LINE,
+	35: geometry.CURVE,
+	36: geometry.QCURVE,
+	65: geometry.OFFCURVE,
+}
+
+
+def nodeTypes(gsPath):
+	"""
+	The geometry node types of a GSPath as a bytearray, asked for with one
+	key-value call. Raises ValueError for node types geometry cannot hold,
+	rather than writing them back as something else.
+	"""
+	types = bytearray()
+	for rawType in gsPath.valueForKeyPath_("nodes.type"):
+		try:
+			types.append(TYPE_FROM_RAW[int(rawType)])
+		except (KeyError, TypeError, ValueError):
+			raise ValueError("unsupported node type %r in %s" % (rawType, gsPath))
+	return types
+
+
+def nodeSnapshot(gsPath):
+	"""
+	Reads a GSPath in one pass: returns a geometry.Path holding the node types
+	and coordinates as flat arrays, and the GSNodes in the same order. Loops
+	work on the arrays and only go back to the nodes they change.
+	"""
+	gsNodes = list(gsPath.nodes)
+	types = nodeTypes(gsPath)
+	coords = array("d")
+	smooth = bytearray(len(gsNodes))
+	for i, node in enumerate(gsNodes):
+		position = node.position
+		coords.append(position.x)
+		coords.append(position.y)
+		if node.smooth:
+			smooth[i] = 1
+	return geometry.Path(types, coords, bool(gsPath.closed), smooth), gsNodes
+
+
+def layerSnapshot(gsLayer):
+	"""nodeSnapshot of every path of gsLayer, as (gsPath, path, gsNodes) tuples"""
+	return [(gsPath,) + nodeSnapshot(gsPath) for gsPath in gsLayer.paths]
+
+
+def writeSnapshot(snapshot, paths):
+	"""
+	Bulk write-back for a layerSnapshot: every GSPath whose arrays differ from
+	the new paths gets its nodes replaced in one assignment. Returns the
+	number of paths written.
+	"""
+	written = 0
+	for (gsPath, original, gsNodes), path in zip(snapshot, paths):
+		if path != original:
+			updateGSPath(gsPath, path)
+			written += 1
+	return written
+
+
+def removeSnapshotNodes(gsPath, gsNodes, indexes):
+	"""
+	Removes the snapshot nodes at indexes, last first, letting the app keep
+	the outline's shape. That can take a node's handles along, so nodes
+	within two places of one just removed are skipped and left for the next
+	pass. Returns the number of nodes removed.
+	"""
+	removed = 0
+	last = None
+	for i in sorted(set(indexes), reverse=True):
+		if last is not None and last - i <= 2:
+			continue
+		gsPath.removeNodeCheckKeepShape_(gsNodes[i])
+		last = i
+		removed += 1
+	return removed
+
+
+def pathFromGS(gsPath):
+	"""Reads a GSPath into a geometry.Path"""
+	return nodeSnapshot(gsPath)[0]
+
+
+def gsNodesFromPath(path):
+	nodes = []
+	for i, (x, y) in enumerate(path.points()):
+		node = GSNode((x, y), TYPE_TO_GLYPHS[path.types[i]])
+		if path.smooth[i]:
+			node.smooth = True
+		nodes.append(node)
+	return nodes
+
+
+def pathToGS(path):
+	"""Builds a new GSPath from a geometry.Path"""
+	gsPath = GSPath()
+	gsPath.nodes = gsNodesFromPath(path)
+	gsPath.closed = path.closed
+	return gsPath
+
+
+def updateGSPath(gsPath, path):
+	"""Replaces the nodes of an existing GSPath, keeping its place in the layer"""
+	gsPath.nodes = gsNodesFromPath(path)
+	gsPath.closed = path.closed
+
+
+def layerFromGS(gsLayer):
+	"""Reads paths, anchors, components and width of a GSLayer into a geometry.Layer"""
+	components = []
+	for component in gsLayer.components:
+		components.append([component.componentName, tuple(component.transform)])
+	return geometry.Layer(
+		paths=[pathFromGS(p) for p in gsLayer.paths],
+		width=gsLayer.width,
+		anchors=[[a.name, a.position.x, a.position.y] for a in gsLayer.anchors],
+		components=components,
+		name=gsLayer.name,
+		layerId=gsLayer.layerId,
+	)
+
+
+def setLayerPaths(gsLayer, paths):
+	"""Replaces all paths of a GSLayer, leaving components and anchors alone"""
+	if Glyphs.versionNumber >= 3:
+		for i in range(len(gsLayer.shapes) - 1, -1, -1):
+			if isinstance(gsLayer.shapes[i], GSPath):
+				del gsLayer.shapes[i]
+	else:
+		gsLayer.paths = []
+	for path in paths:
+		gsLayer.paths.append(pathToGS(path))
+
+
+def layerToGS(layer, gsLayer=None):
+	"""Writes a geometry.Layer into gsLayer, or into a new GSLayer if none is given"""
+	if gsLayer is None:
+		gsLayer = GSLayer()
+	setLayerPaths(gsLayer, layer.paths)
+	gsLayer.width = layer.width
+	existing = dict((a.name, a) for a in gsLayer.anchors)
+	for name, x, y in layer.anchors:
+		if name in existing:
+			existing[name].position = (x, y)
+		else:
+			gsLayer.anchors.append(GSAnchor(name, (x, y)))
+	return gsLayer
+
+
+def gsPathMetrics(gsPath):
+	"""PathMetrics of a GSPath, using the app's own area and bounds"""
+	bounds = gsPath.bounds
+	box = (bounds.origin.x, bounds.origin.y, bounds.origin.x + bounds.size.width, bounds.origin.y + bounds.size.height)
+	# GSPath.direction is -1 for counterclockwise paths, which have positive area here
+	return PathMetrics(-gsPath.direction * abs(gsPath.area()), box, len(gsPath.nodes))
+
+
+def layerKey(gsLayer):
+	"""Identifies a layer for caches that live longer than one layer proxy"""
+	return (gsLayer.parent.name if gsLayer.parent else None, gsLayer.layerId)
+
+
+def removePaths(gsLayer, pathIndexes):
+	"""Removes the paths at the given indexes of gsLayer.paths in one go, leaving components alone"""
+	pathIndexes = set(pathIndexes)
+	if not pathIndexes:
+		return
+	if Glyphs.versionNumber >= 3:
+		# Glyphs 3 code: map path indexes to shape indexes
+		shapeIndexes = NSMutableIndexSet.alloc().init()
+		pathIndex = 0
+		for shapeIndex, shape in enumerate(gsLayer.shapes):
+			if isinstance(shape, GSPath):
+				if pathIndex in pathIndexes:
+					shapeIndexes.addIndex_(shapeIndex)
+				pathIndex += 1
+		gsLayer.removeShapesAtIndexes_(shapeIndexes)
+	else:
+		# Glyphs 2 code
+		for index in sorted(pathIndexes, reverse=True):
+			gsLayer.removePathAtIndex_(index)
+
+
+def sourceFingerprint(gsLayer, memo=None):
+	"""
+	Hash of everything the clean outline of gsLayer depends on: its nodes,
+	its corner and cap components and, recursively, the layers its
+	components point at. memo maps layerKey to fingerprints already made
+	during a run, so shared base glyphs are hashed once; layers without a
+	layerId are hashed every time.
+	"""
+	if memo is None:
+		memo = {}
+	key = layerKey(gsLayer)
+	# interpolated component layers have no layerId, so every master would share the key
+	memoize = key[1] is not None
+	if memoize and key in memo:
+		return memo[key]
+	digest = hashlib.sha1()
+	for path in gsLayer.paths:
+		nodes = [(n.position.x, n.position.y, n.type, n.smooth) for n in path.nodes]
+		digest.update(repr((path.closed, nodes)).encode("utf-8"))
+	for hint in getattr(gsLayer, "hints", None) or ():
+		# corner, cap and segment components are hints in Glyphs 3
+		if hint.name:
+			digest.update(repr((hint.type, hint.name, str(hint.originNode.position) if hint.originNode else None, str(hint.scale), str(hint.options))).encode("utf-8"))
+	for component in gsLayer.components:
+		smartValues = getattr(component, "smartComponentValues", None)
+		digest.update(repr((component.componentName, tuple(component.transform), dict(smartValues) if smartValues else None)).encode("utf-8"))
+		baseLayer = componentBaseLayer(component, gsLayer)
+		if baseLayer is not None:
+			digest.update(sourceFingerprint(baseLayer, memo).encode("utf-8"))
+	fingerprint = digest.hexdigest()
+	if memoize:
+		memo[key] = fingerprint
+	return fingerprint
+
+
+def appOutlineCache():
+	"""The disk cache, configured from Glyphs.defaults"""
+	return OutlineCache(
+		Glyphs.defaults["com.kylewaynebenson.cache.path"],
+		Glyphs.defaults["com.kylewaynebenson.cache.megabytes"],
+	)
+
+
+def appProfiler(name):
+	"""A Profiler for one run of a script, switched on by a Glyphs.defaults key"""
+	return Profiler(
+		name,
+		enabled=bool(Glyphs.defaults["com.kylewaynebenson.profile"]),
+		directory=Glyphs.defaults["com.kylewaynebenson.profile.path"],
+	)
+
+
+def gsNodeCount(gsLayer):
+	return sum(len(p.nodes) for p in gsLayer.paths)
+
+
+def masterMetric(master, metricType):
+	"""(position, overshoot) of a GSFontMaster metric named as in kwb.anchors.ZONES"""
+	if metricType == "ascender":
+		position = master.ascender
+	elif metricType == "cap height":
+		position = master.capHeight
+	elif metricType == "x-height":
+		position = master.xHeight
+	elif metricType == "descender":
+		position = master.descender
+	elif metricType == "baseline":
+		position = 0
+	else:
+		return None
+	for zone in master.alignmentZones:
+		if zone.position == position:
+			return position, zone.size
+	return position, 0
+
+
+def componentBaseLayer(component, gsLayer):
+	"""The layer a component draws in gsLayer, or None if its glyph is missing"""
+	baseLayer = getattr(component, "componentLayer", None)
+	if baseLayer is None and component.component:
+		baseLayer = component.component.layers[gsLayer.associatedMasterId]
+	return baseLayer
+
+
+def removeComponents(gsLayer):
+	if Glyphs.versionNumber >= 3:
+		for i in range(len(gsLayer.shapes) - 1, -1, -1):
+			if isinstance(gsLayer.shapes[i], GSComponent):
+				del gsLayer.shapes[i]
+	else:
+		gsLayer.components = []
+
+
+class CleanOutlines(object):
+	"""
+	The clean-outline stage of the Paths effects: decomposed, overlap-free,
+	correctly oriented geometry paths for a layer. Component trees are
+	resolved bottom-up: every base layer is flattened and overlap-removed
+	once per run, and composites are built from transformed copies of
+	those outlines. With an OutlineCache, clean outlines also persist
+	between runs.
+	"""
+
+	def __init__(self, cache=None):
+		self.cache = cache
+		self.fingerprints = {}
+		self.outlines = {} # layerKey -> [geometry.Path]
+		self._resolving = set()
+		self.cleaned = 0
+		self.reused = 0
+
+	def fingerprint(self, gsLayer):
+		return sourceFingerprint(gsLayer, self.fingerprints)
+
+	def paths(self, gsLayer):
+		"""Clean outline of gsLayer; an empty list if there is nothing to draw. Do not modify the paths."""
+		key = layerKey(gsLayer)
+		# layers interpolated on the fly for brace components have no id to remember them by
+		memoize = key[1] is not None
+		if memoize and key in self.outlines:
+			self.reused += 1
+			return self.outlines[key]
+		cleanKey = None
+		paths = None
+		if self.cache:
+			cleanKey = self.cache.cleanKey(self.fingerprint(gsLayer))
+			cached = self.cache.get(cleanKey)
+			if cached is not None:
+				paths = cached.paths
+		if paths is None:
+			paths = self._clean(gsLayer)
+			self.cleaned += 1
+			if self.cache:
+				self.cache.put(cleanKey, geometry.Layer(paths))
+		if memoize:
+			self.outlines[key] = paths
+		return paths
+
+	def layer(self, gsLayer):
+		"""geometry.Layer with the clean outline, width and anchors of gsLayer"""
+		return geometry.Layer(
+			paths=[p.copy() for p in self.paths(gsLayer)],
+			width=gsLayer.width,
+			anchors=[[a.name, a.position.x, a.position.y] for a in gsLayer.anchors],
+			name=gsLayer.name,
+			layerId=gsLayer.layerId,
+		)
+
+	def _baseLayers(self, gsLayer):
+		"""Base layers of all components, or None if one has to be decomposed by the app"""
+		baseLayers = []
+		for component in gsLayer.components:
+			if getattr(component, "smartComponentValues", None):
+				# smart components interpolate their base, so they have no single outline to reuse
+				return None
+			baseLayer = componentBaseLayer(component, gsLayer)
+			if baseLayer is None or layerKey(baseLayer) in self._resolving:
+				return None
+			baseLayers.append((baseLayer, tuple(component.transform)))
+		return baseLayers
+
+	def _clean(self, gsLayer):
+		key = layerKey(gsLayer)
+		self._resolving.add(key)
+		try:
+			baseLayer = gsLayer.copy()
+			pieces = []
+			# None when a component has to be decomposed by the app instead
+			baseLayers = (self._baseLayers(gsLayer) if gsLayer.components else None) or []
+			if baseLayers:
+				for componentLayer, matrix in baseLayers:
+					for path in self.paths(componentLayer):
+						pieces.append(path.copy().transform(matrix))
+				removeComponents(baseLayer)
+
+			if hasattr(baseLayer, 'decomposeCorners'):
+				try:
+					baseLayer.decomposeCorners()
+				except:
+					pass
+
+			if baseLayer.components:
+				try:
+					baseLayer.decomposeComponents()
+				except:
+					pass
+
+			if hasattr(baseLayer, 'flattenOutlines'):
+				try:
+					baseLayer.flattenOutlines()
+				except:
+					pass
+
+			if len(baseLayer.paths) == 0:
+				if len(baseLayers) == 1:
+					# a lone component: its outline is clean already, only mirroring flips it
+					xx, xy, yx, yy, dx, dy = baseLayers[0][1]
+					if xx * yy - xy * yx < 0:
+						for path in pieces:
+							path.reverse()
+					return pieces
+				if not pieces:
+					return []
+
+			for path in pieces:
+				baseLayer.paths.append(pathToGS(path))
+			baseLayer.removeOverlap()
+			baseLayer.correctPathDirection()
+			return [pathFromGS(p) for p in baseLayer.paths]
+		finally:
+			self._resolving.discard(key)
+
+
+def offsetGSPaths(gsPaths, offset):
+	"""Offsets GSPaths with the app's Offset Curve filter; returns the new paths"""
+	from Foundation import NSClassFromString
+	OffsetCurveFilter = NSClassFromString("GlyphsFilterOffsetCurve")
+	newPaths = []
+	for path in gsPaths:
+		# offsetPath returns a list of new paths
+		result = OffsetCurveFilter.offsetPath_offsetX_offsetY_makeStroke_position_objects_capStyleStart_capStyleEnd_(
+			path,
+			offset,
+			offset,
+			False, # makeStroke = False for pure offset
+			0.5, # position
+			False, # objects
+			0, # capStyleStart
+			0, # capStyleEnd
+		)
+		if result:
+			newPaths.extend(result)
+	return newPaths
+
+
+def replacePaths(gsLayer, gsPaths):
+	"""Swaps the paths of a layer without components for gsPaths, without copying them"""
+	if Glyphs.versionNumber >= 3:
+		gsLayer.shapes = list(gsPaths)
+	else:
+		gsLayer.paths = list(gsPaths)
+
+
+def offsetAndClean(gsLayer, offset, areaThreshold=0, log=None, sourcePaths=None):
+	"""
+	Offsets, unions, orients and filters the paths of gsLayer in place, using
+	the layer as the only working buffer. Contours smaller than areaThreshold
+	afterwards are dropped. With sourcePaths, those are offset into the layer
+	instead, so they need not be copied in first. Returns gsLayer.
+	"""
+	if sourcePaths is not None:
+		replacePaths(gsLayer, offsetGSPaths(sourcePaths, offset) if offset else [p.copy() for p in sourcePaths])
+	elif offset:
+		replacePaths(gsLayer, offsetGSPaths(gsLayer.paths, offset))
+	gsLayer.removeOverlap()
+	gsLayer.correctPathDirection()
+	if areaThreshold > 0:
+		smallPaths = []
+		for i, path in enumerate(gsLayer.paths):
+			pathArea = abs(path.area())
+			if pathArea < areaThreshold:
+				smallPaths.append(i)
+				if log:
+					log("  Removing small artifact path with area: %f" % pathArea)
+		removePaths(gsLayer, smallPaths)
+	return gsLayer
+
+
+def morphologicalOpen(gsLayer, width, areaThreshold=0, log=None, sourcePaths=None):
+	"""
+	Removes the parts of gsLayer, or of sourcePaths, thinner than width:
+	insets by width/2 and outsets back, cleaning after each offset. Works
+	in place; returns gsLayer.
+	"""
+	offsetAndClean(gsLayer, -width / 2.0, areaThreshold, log, sourcePaths)
+	offsetAndClean(gsLayer, width / 2.0, areaThreshold, log)
+	return gsLayer
+
+
+@contextmanager
+def suspendedInterface(font):
+	"""
+	Turns off interface updates of font for the with block, so a script
+	editing many glyphs redraws once at the end. Updates come back on
+	even when the block raises.
+	"""
+	font.disableUpdateInterface()
+	try:
+		yield font
+	finally:
+		font.enableUpdateInterface()
+
+
+@contextmanager
+def undoGroup(glyph):
+	"""Makes everything the with block changes in glyph one undo step; the group is closed even when the block raises"""
+	glyph.beginUndo()
+	try:
+		yield glyph
+	finally:
+		glyph.endUndo()
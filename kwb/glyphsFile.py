@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Streaming reader and writer for .glyphs files and .glyphspackage folders.
+
+Glyphs sources are OpenStep-style property lists. The reader parses everything
+except the glyphs array up front (skipping the glyphs without building them),
+then yields one glyph dictionary at a time. The writer streams glyphs into a
+temporary file and assembles the output when it is closed, so font info can
+still be changed while glyphs are being processed and only one glyph is ever
+held in memory.
+"""
+
+import io
+import os
+import re
+import shutil
+import tempfile
+
+CHUNK_SIZE = 1 << 16
+
+_TOKEN = re.compile(
+	r'\s*(?:'
+	r'([{}()=;,])'                 # 1 punctuation
+	r'|"((?:[^"\\]|\\.)*)"'        # 2 quoted string
+	r'|<([0-9A-Fa-f\s]*)>'         # 3 data
+	r'|([^\s{}()=;,"<>]+)'         # 4 unquoted atom
+	r')',
+	re.S,
+)
+_NUMBER = re.compile(r'^-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?$')
+_UNQUOTED = re.compile(r'^[A-Za-z0-9_.$]+$')
+_ESCAPE = re.compile(r'\\(?:([0-7]{3})|U([0-9A-Fa-f]{4})|(.))', re.S)
+_SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "a": "\a", "v": "\v"}
+
+
+class GlyphsFileError(Exception):
+	pass
+
+
+class PlistData(object):
+	"""Hex data (<...>), kept as text so it is written back unchanged"""
+	__slots__ = ("hex",)
+
+	def __init__(self, hexString):
+		self.hex = "".join(hexString.split())
+
+	def __eq__(self, other):
+		return isinstance(other, PlistData) and other.hex == self.hex
+
+	def __repr__(self):
+		return "<%s>" % self.hex
+
+
+def _unescape(match):
+	octal, hexadecimal, char = match.groups()
+	if octal:
+		return chr(int(octal, 8))
+	if hexadecimal:
+		return chr(int(hexadecimal, 16))
+	return _SIMPLE_ESCAPES.get(char, char)
+
+
+def _atom(text):
+	if _NUMBER.match(text):
+		if "e" in text or "E" in text:
+			# Glyphs 2 writes unicodes as bare hex, and 1E00 or 0E01 look like exponents
+			number = float(text)
+			return number if formatNumber(number) == text else text
+		if "." in text:
+			return float(text)
+		return int(text)
+	return text
+
+
+class _Scanner(object):
+	"""Tokenizer over a text stream that only keeps a window of the file in memory"""
+
+	def __init__(self, stream):
+		self.stream = stream
+		self.buffer = ""
+		self.pos = 0
+		self.eof = False
+		self.pushedBack = None
+
+	def _fill(self):
+		chunk = self.stream.read(CHUNK_SIZE)
+		if not chunk:
+			self.eof = True
+		self.buffer = self.buffer[self.pos:] + chunk
+		self.pos = 0
+
+	def token(self):
+		"""Returns (kind, value); kind is the punctuation character, 'string', 'data', 'atom' or None at the end"""
+		if self.pushedBack:
+			token, self.pushedBack = self.pushedBack, None
+			return token
+		while True:
+			match = _TOKEN.match(self.buffer, self.pos)
+			# a match touching the end of the window may be cut off
+			if (match is None or match.end() >= len(self.buffer)) and not self.eof:
+				self._fill()
+				continue
+			if match is None:
+				if self.buffer[self.pos:].strip():
+					raise GlyphsFileError("Unexpected text: %r" % self.buffer[self.pos:self.pos+40])
+				return (None, None)
+			self.pos = match.end()
+			punctuation, string, data, atom = match.groups()
+			if punctuation:
+				return (punctuation, punctuation)
+			if string is not None:
+				if "\\" in string:
+					string = _ESCAPE.sub(_unescape, string)
+				return ("string", string)
+			if data is not None:
+				return ("data", PlistData(data))
+			return ("atom", atom)
+
+	def pushBack(self, token):
+		self.pushedBack = token
+
+	def expect(self, kind):
+		token = self.token()
+		if token[0] != kind:
+			raise GlyphsFileError("Expected %r, found %r" % (kind, token[1]))
+		return token
+
+	def value(self, token=None):
+		kind, value = token or self.token()
+		if kind == "{":
+			return self.dictionary()
+		if kind == "(":
+			return self.array()
+		if kind == "string" or kind == "data":
+			return value
+		if kind == "atom":
+			return _atom(value)
+		raise GlyphsFileError("Unexpected %r" % value)
+
+	def key(self, token):
+		kind, value = token
+		if kind not in ("string", "atom"):
+			raise GlyphsFileError("Expected a key, found %r" % value)
+		return value
+
+	def dictionary(self):
+		result = {}
+		while True:
+			token = self.token()
+			if token[0] == "}":
+				return result
+			key = self.key(token)
+			self.expect("=")
+			result[key] = self.value()
+			self.expect(";")
+
+	def array(self):
+		result = []
+		token = self.token()
+		while token[0] != ")":
+			result.append(self.value(token))
+			token = self.token()
+			if token[0] == ",":
+				token = self.token()
+		return result
+
+	def skip(self, token=None):
+		"""Consumes a value without building it"""
+		kind = (token or self.token())[0]
+		if kind not in ("{", "("):
+			return
+		depth = 1
+		while depth:
+			kind = self.token()[0]
+			if kind in ("{", "("):
+				depth += 1
+			elif kind in ("}", ")"):
+				depth -= 1
+			elif kind is None:
+				raise GlyphsFileError("Unexpected end of file")
+
+
+def parse(text):
+	"""Parses a complete property list string"""
+	return _Scanner(io.StringIO(text)).value()
+
+
+def parseFile(filePath):
+	with io.open(filePath, "r", encoding="utf-8") as f:
+		return _Scanner(f).value()
+
+
+# Writing
+
+def formatNumber(value):
+	if isinstance(value, float):
+		if value.is_integer():
+			return str(int(value))
+		return repr(round(value, 6))
+	return str(value)
+
+
+def formatString(value):
+	# text only needs quotes where it would read back as a number
+	if _UNQUOTED.match(value) and isinstance(_atom(value), str):
+		return value
+	escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\012").replace("\t", "\\011")
+	return '"%s"' % escaped
+
+
+def _isScalar(value):
+	return not isinstance(value, (dict, list, tuple))
+
+
+# arrays Glyphs writes on one line: points, scales, nodes and multiple unicodes
+INLINE_KEYS = set(["pos", "scale", "origin", "target", "slant", "unicode"])
+
+
+def writeValue(out, value, key=None):
+	"""Writes a value in the layout Glyphs uses: one entry per line, point-like arrays inline"""
+	if isinstance(value, dict):
+		out.write("{\n")
+		for itemKey, item in value.items():
+			out.write(formatString(itemKey))
+			out.write(" = ")
+			writeValue(out, item, itemKey)
+			out.write(";\n")
+		out.write("}")
+	elif isinstance(value, (list, tuple)):
+		if (key in INLINE_KEYS or key == "node") and all(_isScalar(v) for v in value):
+			out.write("(")
+			out.write(",".join(formatScalar(v) for v in value))
+			out.write(")")
+		elif not value:
+			out.write("()")
+		else:
+			out.write("(\n")
+			for i, item in enumerate(value):
+				if i:
+					out.write(",\n")
+				writeValue(out, item, "node" if key == "nodes" else None)
+			out.write("\n)")
+	else:
+		out.write(formatScalar(value))
+
+
+def setKey(dictionary, key, value):
+	"""Sets a key, inserting new ones at their alphabetical position as Glyphs does"""
+	if key in dictionary:
+		dictionary[key] = value
+		return
+	items = list(dictionary.items())
+	index = len(items)
+	for i, (existingKey, existingValue) in enumerate(items):
+		if existingKey > key:
+			index = i
+			break
+	items.insert(index, (key, value))
+	dictionary.clear()
+	dictionary.update(items)
+
+
+def formatScalar(value):
+	if isinstance(value, bool):
+		return "1" if value else "0"
+	if isinstance(value, (int, float)):
+		return formatNumber(value)
+	if isinstance(value, PlistData):
+		return "<%s>" % value.hex
+	if value is None:
+		return '""'
+	return formatString(value)
+
+
+def dumps(value):
+	out = io.StringIO()
+	writeValue(out, value)
+	return out.getvalue()
+
+
+def writeFile(filePath, value):
+	with io.open(filePath, "w", encoding="utf-8") as f:
+		writeValue(f, value)
+		f.write("\n")
+
+
+# Streaming
+
+def isPackage(filePath):
+	return os.path.isdir(filePath)
+
+
+def glyphFileName(glyphName):
+	"""File name Glyphs uses inside a .glyphspackage: uppercase letters get an underscore"""
+	return "".join(c + "_" if c.isupper() else c for c in glyphName) + ".glyph"
+
+
+class GlyphsFileReader(object):
+	"""Reads the font info of a Glyphs source once and streams its glyphs on demand"""
+
+	def __init__(self, filePath):
+		self.filePath = filePath
+		self.package = isPackage(filePath)
+
+	def fontInfo(self):
+		"""All top-level entries except the glyphs, which are left as None to keep their position"""
+		if self.package:
+			info = parseFile(os.path.join(self.filePath, "fontinfo.plist"))
+			setKey(info, "glyphs", None)
+			return info
+		info = {}
+		with io.open(self.filePath, "r", encoding="utf-8") as f:
+			scanner = _Scanner(f)
+			scanner.expect("{")
+			while True:
+				token = scanner.token()
+				if token[0] == "}":
+					break
+				key = scanner.key(token)
+				scanner.expect("=")
+				if key == "glyphs":
+					scanner.skip()
+					info[key] = None
+				else:
+					info[key] = scanner.value()
+				scanner.expect(";")
+		return info
+
+	def glyphs(self):
+		"""Yields one glyph dictionary at a time"""
+		if self.package:
+			for glyph in self._packageGlyphs():
+				yield glyph
+			return
+		with io.open(self.filePath, "r", encoding="utf-8") as f:
+			scanner = _Scanner(f)
+			scanner.expect("{")
+			while True:
+				token = scanner.token()
+				if token[0] in ("}", None):
+					return
+				key = scanner.key(token)
+				scanner.expect("=")
+				if key != "glyphs":
+					scanner.skip()
+					scanner.expect(";")
+					continue
+				scanner.expect("(")
+				token = scanner.token()
+				while token[0] != ")":
+					yield scanner.value(token)
+					token = scanner.token()
+					if token[0] == ",":
+						token = scanner.token()
+				return
+
+	def _packageGlyphFiles(self):
+		"""Glyph files of a package in glyph order, with files missing from order.plist at the end"""
+		glyphsFolder = os.path.join(self.filePath, "glyphs")
+		fileNames = sorted(f for f in os.listdir(glyphsFolder) if f.endswith(".glyph"))
+		orderPath = os.path.join(self.filePath, "order.plist")
+		order = parseFile(orderPath) if os.path.exists(orderPath) else []
+		byName = {}
+		for fileName in fileNames:
+			byName[self._packageGlyphName(os.path.join(glyphsFolder, fileName))] = fileName
+		for name in order:
+			if name in byName:
+				yield os.path.join(glyphsFolder, byName.pop(name))
+		for fileName in sorted(byName.values()):
+			yield os.path.join(glyphsFolder, fileName)
+
+	def _packageGlyphName(self, filePath):
+		with io.open(filePath, "r", encoding="utf-8") as f:
+			head = f.read(4096)
+		match = re.search(r'^glyphname = ("(?:[^"\\]|\\.)*"|[^;]+);', head, re.M)
+		if match:
+			name = match.group(1)
+			return parse(name) if name.startswith('"') else name
+		return parseFile(filePath).get("glyphname")
+
+	def _packageGlyphs(self):
+		for filePath in self._packageGlyphFiles():
+			glyph = parseFile(filePath)
+			glyph.setdefault("glyphname", os.path.basename(filePath)[:-6])
+			yield glyph
+
+
+class GlyphsFileWriter(object):
+	"""
+	Writes a Glyphs source glyph by glyph. Call writeGlyph() in glyph order,
+	then close() with the (possibly changed) font info.
+	"""
+
+	def __init__(self, filePath, package=None):
+		self.filePath = filePath
+		self.package = filePath.endswith(".glyphspackage") if package is None else package
+		self.glyphOrder = []
+		self.count = 0
+		if self.package:
+			self.workFolder = tempfile.mkdtemp(suffix=".glyphspackage")
+			os.mkdir(os.path.join(self.workFolder, "glyphs"))
+		else:
+			handle, self.glyphsTempPath = tempfile.mkstemp(suffix=".glyphs")
+			self.glyphsTemp = io.open(handle, "w", encoding="utf-8")
+
+	def writeGlyph(self, glyph):
+		name = glyph.get("glyphname")
+		self.glyphOrder.append(name)
+		if self.package:
+			writeFile(os.path.join(self.workFolder, "glyphs", glyphFileName(name)), glyph)
+		else:
+			if self.count:
+				self.glyphsTemp.write(",\n")
+			writeValue(self.glyphsTemp, glyph)
+		self.count += 1
+
+	def close(self, fontInfo, extraFiles=None):
+		"""Assembles the output; extraFiles maps package-relative paths to files copied as they are"""
+		if self.package:
+			info = dict((k, v) for k, v in fontInfo.items() if k != "glyphs")
+			writeFile(os.path.join(self.workFolder, "fontinfo.plist"), info)
+			writeFile(os.path.join(self.workFolder, "order.plist"), self.glyphOrder)
+			for relativePath, sourcePath in (extraFiles or {}).items():
+				shutil.copyfile(sourcePath, os.path.join(self.workFolder, relativePath))
+			if os.path.exists(self.filePath):
+				shutil.rmtree(self.filePath)
+			shutil.move(self.workFolder, self.filePath)
+			return
+		self.glyphsTemp.close()
+		handle, outputTempPath = tempfile.mkstemp(suffix=".glyphs", dir=os.path.dirname(os.path.abspath(self.filePath)))
+		with io.open(handle, "w", encoding="utf-8") as out:
+			out.write("{\n")
+			if "glyphs" not in fontInfo:
+				fontInfo = dict(fontInfo)
+				setKey(fontInfo, "glyphs", None)
+			for key, value in fontInfo.items():
+				out.write(formatString(key))
+				out.write(" = ")
+				if key == "glyphs":
+					out.write("(\n")
+					with io.open(self.glyphsTempPath, "r", encoding="utf-8") as glyphsTemp:
+						shutil.copyfileobj(glyphsTemp, out, CHUNK_SIZE)
+					out.write("\n)")
+				else:
+					writeValue(out, value, key)
+				out.write(";\n")
+			out.write("}\n")
+		os.remove(self.glyphsTempPath)
+		os.replace(outputTempPath, self.filePath)
+
+	def abort(self):
+		if self.package:
+			shutil.rmtree(self.workFolder, ignore_errors=True)
+		else:
+			self.glyphsTemp.close()
+			os.remove(self.glyphsTempPath)
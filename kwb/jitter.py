@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Seeded point jitter for Randomly Move Points.
+
+All offsets for a layer are drawn in one call from a generator seeded with
+the user's seed and the glyph name, so a run can be repeated exactly on any
+machine, and every master of a glyph gets the same offsets (and stays
+compatible) unless the master is mixed into the seed as well.
+"""
+
+import random
+from array import array
+from kwb.geometry import LINE, CURVE
+
+
+def jitterRandom(seed, *keys):
+	"""random.Random seeded from strings, which Python hashes the same way on every machine"""
+	return random.Random("/".join(str(k) for k in (seed,) + keys))
+
+
+def jitterOffsets(count, moveRange, moveGrid, rng):
+	"""2 * count offsets (x0, y0, x1, y1, ...), whole steps of moveGrid within moveRange steps"""
+	moveRange = int(abs(moveRange))
+	steps = rng.choices(range(-moveRange, moveRange + 1), k=2 * count)
+	return array("d", [s * moveGrid for s in steps])
+
+
+def jitterPaths(paths, moveRange, moveGrid, rng, onCurveOnly=False):
+	"""Moves the nodes of geometry.Paths in place, drawing offsets for every node so results do not depend on onCurveOnly"""
+	total = sum(len(p) for p in paths)
+	offsets = jitterOffsets(total, moveRange, moveGrid, rng)
+	k = 0
+	for path in paths:
+		coords = path.coords
+		for i in range(len(path)):
+			if not onCurveOnly or path.types[i] in (LINE, CURVE):
+				coords[2*i] += offsets[k]
+				coords[2*i+1] += offsets[k+1]
+			k += 2
+	return paths
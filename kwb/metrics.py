@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Metrics edits shared by the Metrics scripts. Works on GSLayer and
+fileFont.FileLayer alike.
+
+Centering a new width is planned first and applied afterwards as one shift
+and one width change per layer, instead of setting LSB and then RSB, which
+recomputes the layer's metrics twice.
+"""
+
+from fnmatch import fnmatchcase
+
+
+def centeredWidthDelta(layer, newWidth):
+	"""What to add to each sidebearing of layer to reach newWidth"""
+	return (newWidth - layer.width) / 2
+
+
+def shiftLayer(layer, dx):
+	"""Moves paths, components and anchors horizontally"""
+	if hasattr(layer, "applyShift"):
+		layer.applyShift(dx)
+	else:
+		# GSLayer
+		layer.applyTransform((1, 0, 0, 1, dx, 0))
+
+
+def applyCenteredWidth(layer, addToSides):
+	"""Adds addToSides to both sidebearings"""
+	if not addToSides:
+		return
+	width = layer.width
+	shiftLayer(layer, addToSides)
+	layer.width = width + 2 * addToSides
+
+
+def changeWidthCentered(layer, newWidth):
+	"""Sets the advance width, splitting the change evenly between both sidebearings. Returns what was added to each side."""
+	addToSides = centeredWidthDelta(layer, newWidth)
+	applyCenteredWidth(layer, addToSides)
+	return addToSides
+
+
+def parseWidthTargets(text):
+	"""
+	[(pattern, width)] from lines like '*.tf = 600'. Patterns are shell-style
+	globs on glyph names; blank lines and lines starting with # are skipped.
+	"""
+	targets = []
+	for lineNumber, line in enumerate(text.splitlines(), 1):
+		line = line.strip()
+		if not line or line.startswith("#"):
+			continue
+		separator = "=" if "=" in line else ":"
+		pattern, _, width = line.rpartition(separator)
+		pattern = pattern.strip()
+		try:
+			width = float(width)
+		except ValueError:
+			raise ValueError("line %d: expected 'pattern = width', got '%s'" % (lineNumber, line))
+		if not pattern:
+			raise ValueError("line %d: no glyph name pattern" % lineNumber)
+		targets.append((pattern, width))
+	return targets
+
+
+def targetWidth(glyphName, targets):
+	"""The width of the first pattern that matches glyphName, or None"""
+	for pattern, width in targets:
+		if fnmatchcase(glyphName, pattern):
+			return width
+	return None
+
+
+def centeredWidthPlan(entries):
+	"""
+	[(glyph, [(layer, addToSides)])] for entries of (glyph, layers, newWidth),
+	worked out before anything changes. Layers already at their width are
+	left out, and so are glyphs with nothing to change.
+	"""
+	plan = []
+	for glyph, layers, newWidth in entries:
+		changes = [(layer, centeredWidthDelta(layer, newWidth)) for layer in layers]
+		changes = [(layer, addToSides) for layer, addToSides in changes if addToSides]
+		if changes:
+			plan.append((glyph, changes))
+	return plan
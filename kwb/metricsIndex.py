@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Sorted per-master index of sidebearings and widths for Find Metrics.
+
+Built in one pass over the font, then kept current by re-reading only the
+glyphs whose lastChange moved, and every composite that uses one of them,
+since a composite's sidebearings come from its base glyphs. Threshold and
+range queries are bisect lookups. Works on GSFont and fileFont.GlyphsFileFont alike.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+FIELDS = ("LSB", "RSB", "width")
+
+
+class GlyphMetrics(object):
+	__slots__ = ("LSB", "RSB", "width", "isComposite")
+
+	def __init__(self, LSB, RSB, width, isComposite):
+		self.LSB = LSB
+		self.RSB = RSB
+		self.width = width
+		self.isComposite = isComposite
+
+
+class MetricsIndex(object):
+	def __init__(self):
+		self.masterIds = []
+		self.hasPaths = {} # glyph name -> any layer has paths
+		self.lastChange = {} # glyph name -> lastChange when it was read
+		self.bases = {} # glyph name -> names of the glyphs its master layers use as components
+		self.composites = {} # base glyph name -> names of the glyphs using it
+		self.records = {} # masterId -> {glyph name: GlyphMetrics}
+		self.sorted = {} # (masterId, field) -> sorted [(value, glyph name)]
+
+	def __len__(self):
+		return len(self.hasPaths)
+
+	def build(self, font):
+		self.masterIds = [m.id for m in font.masters]
+		self.hasPaths, self.lastChange = {}, {}
+		self.bases, self.composites = {}, {}
+		self.records = dict((masterId, {}) for masterId in self.masterIds)
+		lists = dict(((masterId, field), []) for masterId in self.masterIds for field in FIELDS)
+		for glyph in font.glyphs:
+			self._read(glyph)
+			for masterId in self.masterIds:
+				record = self.records[masterId].get(glyph.name)
+				if record:
+					for field in FIELDS:
+						lists[(masterId, field)].append((getattr(record, field), glyph.name))
+		for key in lists:
+			lists[key].sort()
+		self.sorted = lists
+		return self
+
+	def _read(self, glyph):
+		name = glyph.name
+		self.lastChange[name] = _lastChange(glyph)
+		self.hasPaths[name] = any(len(layer.paths) > 0 for layer in glyph.layers)
+		bases = set()
+		for masterId in self.masterIds:
+			layer = glyph.layers[masterId]
+			if layer is None:
+				self.records[masterId].pop(name, None)
+				continue
+			components = layer.components
+			bases.update(component.componentName for component in components)
+			isComposite = len(layer.paths) == 0 and len(components) > 0
+			self.records[masterId][name] = GlyphMetrics(layer.LSB, layer.RSB, layer.width, isComposite)
+		self._setBases(name, bases)
+
+	def _setBases(self, name, bases):
+		for baseName in self.bases.get(name, ()):
+			users = self.composites.get(baseName)
+			if users is not None:
+				users.discard(name)
+		self.bases[name] = bases
+		for baseName in bases:
+			self.composites.setdefault(baseName, set()).add(name)
+
+	def dependents(self, names):
+		"""Names of the glyphs that use any of names as a component, directly or nested"""
+		found = set()
+		queue = deque(names)
+		while queue:
+			for compositeName in self.composites.get(queue.popleft(), ()):
+				if compositeName not in found and compositeName not in names:
+					found.add(compositeName)
+					queue.append(compositeName)
+		return found
+
+	def _unlink(self, name):
+		"""Removes a glyph's entries from the sorted lists"""
+		for masterId in self.masterIds:
+			record = self.records[masterId].get(name)
+			if not record:
+				continue
+			for field in FIELDS:
+				values = self.sorted[(masterId, field)]
+				entry = (getattr(record, field), name)
+				i = bisect_left(values, entry)
+				if i < len(values) and values[i] == entry:
+					del values[i]
+
+	def update(self, glyph):
+		"""Re-reads one glyph"""
+		name = glyph.name
+		self._unlink(name)
+		self._read(glyph)
+		for masterId in self.masterIds:
+			record = self.records[masterId].get(name)
+			if record:
+				for field in FIELDS:
+					insort(self.sorted[(masterId, field)], (getattr(record, field), name))
+
+	def remove(self, name):
+		self._unlink(name)
+		for masterId in self.masterIds:
+			self.records[masterId].pop(name, None)
+		self.hasPaths.pop(name, None)
+		self.lastChange.pop(name, None)
+		self._setBases(name, set())
+		del self.bases[name]
+
+	def refresh(self, font):
+		"""
+		Brings the index up to date: changed and new glyphs are re-read,
+		deleted ones dropped, and composites using any of them re-read too.
+		Returns the number of glyphs re-read.
+		"""
+		if [m.id for m in font.masters] != self.masterIds:
+			self.build(font)
+			return len(self)
+		seen = set()
+		changed = set()
+		for glyph in font.glyphs:
+			name = glyph.name
+			seen.add(name)
+			stamp = _lastChange(glyph)
+			# glyphs without a change date cannot be trusted to be unchanged
+			if stamp is None or name not in self.lastChange or self.lastChange[name] != stamp:
+				self.update(glyph)
+				changed.add(name)
+		deleted = set(self.lastChange) - seen
+		# editing a base glyph leaves the lastChange of its composites alone
+		stale = self.dependents(changed | deleted) - deleted
+		for name in deleted:
+			self.remove(name)
+		for name in stale:
+			glyph = font.glyphs[name]
+			if glyph is not None:
+				self.update(glyph)
+		return len(changed) + len(stale)
+
+	def _slice(self, masterId, field, low, high, includeLow, includeHigh):
+		values = self.sorted[(masterId, field)]
+		start = 0
+		if low is not None:
+			start = bisect_left(values, (low,)) if includeLow else bisect_right(values, (low, _AFTER))
+		end = len(values)
+		if high is not None:
+			end = bisect_right(values, (high, _AFTER)) if includeHigh else bisect_left(values, (high,))
+		return [name for value, name in values[start:end]]
+
+	def smallerThan(self, masterId, field, value):
+		return self._slice(masterId, field, None, value, True, False)
+
+	def largerThan(self, masterId, field, value):
+		return self._slice(masterId, field, value, None, False, True)
+
+	def between(self, masterId, field, low, high):
+		"""Names with low <= value <= high"""
+		return self._slice(masterId, field, low, high, True, True)
+
+	def valueRange(self, masterId, field):
+		values = self.sorted.get((masterId, field))
+		if not values:
+			return None
+		return values[0][0], values[-1][0]
+
+	def isComposite(self, masterId, name):
+		record = self.records[masterId].get(name)
+		return bool(record and record.isComposite)
+
+
+# sorts after any glyph name, so (value, _AFTER) is past every entry with that value
+_AFTER = "\U0010FFFF"
+
+
+def _lastChange(glyph):
+	return getattr(glyph, "lastChange", None)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Search index over glyph names for pickers that filter as you type.
+
+Prefix matches are a bisect range over the sorted lowercase names, which
+is the flat-array form of a trie. Substring matches go through a trigram
+index, and a query that extends the previous one only rescans the
+previous matches. Results come back ranked and capped.
+"""
+
+from bisect import bisect_left
+import heapq
+
+GRAM = 3
+BOUNDARIES = "._-"
+
+
+class NameSearchIndex(object):
+	def __init__(self, names):
+		pairs = sorted(set((name.lower(), name) for name in names))
+		self.lowered = [low for low, name in pairs]
+		self.names = [name for low, name in pairs]
+		# trigram -> ascending indexes of the names containing it
+		self.grams = {}
+		for i, low in enumerate(self.lowered):
+			for gram in set(low[j:j+GRAM] for j in range(len(low) - GRAM + 1)):
+				self.grams.setdefault(gram, []).append(i)
+		self._lastQuery = None
+		self._lastMatches = None
+
+	def __len__(self):
+		return len(self.names)
+
+	def prefixRange(self, prefix):
+		"""Index range of the names starting with the lowercase prefix"""
+		return bisect_left(self.lowered, prefix), bisect_left(self.lowered, prefix + _AFTER)
+
+	def containing(self, query):
+		"""Ascending indexes of the names containing the lowercase query"""
+		if self._lastQuery is not None and self._lastQuery in query:
+			# typing on only narrows the previous result
+			candidates = self._lastMatches
+		elif len(query) >= GRAM:
+			postings = [self.grams.get(query[j:j+GRAM], ()) for j in range(len(query) - GRAM + 1)]
+			candidates = min(postings, key=len)
+		else:
+			candidates = range(len(self.lowered))
+		lowered = self.lowered
+		matches = [i for i in candidates if query in lowered[i]]
+		self._lastQuery, self._lastMatches = query, matches
+		return matches
+
+	def search(self, text, limit=200):
+		"""
+		Returns (names, total). A trailing space asks for the exact name and
+		its prefix matches only; otherwise exact and prefix matches come
+		first, then names where the text starts a name part (after . _ -),
+		then any other substring match. Ties keep alphabetical order.
+		"""
+		exactOnly = text.endswith(" ")
+		query = text.strip().lower()
+		if not query:
+			return self.names[:limit], len(self.names)
+		start, end = self.prefixRange(query)
+		# the exact name sorts first within its own prefix range
+		ranked = list(range(start, min(end, start + limit)))
+		if exactOnly:
+			return [self.names[i] for i in ranked], end - start
+		matches = self.containing(query)
+		if len(ranked) < limit:
+			others = (i for i in matches if i < start or i >= end)
+			ranked += heapq.nsmallest(limit - len(ranked), others, key=lambda i: (self._rank(i, query), i))
+		return [self.names[i] for i in ranked], len(matches)
+
+	def _rank(self, i, query):
+		low = self.lowered[i]
+		position = low.find(query)
+		return 0 if low[position-1] in BOUNDARIES else 1
+
+
+# sorts after any glyph name character, so prefix + _AFTER ends the prefix range
+_AFTER = "\U0010FFFF"
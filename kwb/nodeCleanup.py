@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Finds coincident and near-coincident nodes in geometry.Paths and removes them.
+
+Nodes go into a spatial hash of tolerance-sized cells, so every lookup checks
+at most nine cells and a whole layer is planned in linear time. All deletions
+are worked out on the original arrays first and applied afterwards, so no
+index shifts while the plan is made. Within a contour, an on-curve node that
+lies within tolerance of the on-curve node before it is dropped, together
+with the handles of the tiny segment between them. Across contours, a contour
+whose on-curve nodes all sit on those of an earlier contour running the same
+way is dropped as a duplicate.
+"""
+
+import math
+from kwb.geometry import Path
+
+DEFAULT_TOLERANCE = 1.0
+
+
+class SpatialHash(object):
+	"""Points bucketed on a grid of tolerance-sized cells"""
+
+	def __init__(self, tolerance):
+		self.tolerance = float(tolerance)
+		self.size = max(self.tolerance, 1e-9)
+		self.cells = {}
+
+	def _cell(self, x, y):
+		return int(math.floor(x / self.size)), int(math.floor(y / self.size))
+
+	def add(self, x, y, item):
+		self.cells.setdefault(self._cell(x, y), []).append((x, y, item))
+
+	def near(self, x, y):
+		"""Items of all points within tolerance of (x, y)"""
+		cx, cy = self._cell(x, y)
+		limit = self.tolerance * self.tolerance
+		found = []
+		for i in (cx - 1, cx, cx + 1):
+			for j in (cy - 1, cy, cy + 1):
+				for px, py, item in self.cells.get((i, j), ()):
+					if (px - x) * (px - x) + (py - y) * (py - y) <= limit:
+						found.append(item)
+		return found
+
+
+def collapsedNodes(path, tolerance=DEFAULT_TOLERANCE):
+	"""
+	Indexes of the nodes to delete so that no on-curve node lies within
+	tolerance of the on-curve node before it. Each dropped on-curve node goes
+	with the handles leading into it; runs collapse onto their first node.
+	"""
+	onCurves = path.onCurveIndexes()
+	if len(onCurves) < 2:
+		return set()
+	coords = path.coords
+	limit = tolerance * tolerance
+
+	def near(i, j):
+		dx, dy = coords[2*i] - coords[2*j], coords[2*i+1] - coords[2*j+1]
+		return dx * dx + dy * dy <= limit
+
+	deleted = set()
+	kept = onCurves[0]
+	for previous, i in zip(onCurves, onCurves[1:]):
+		if near(kept, i):
+			deleted.update(_segmentNodes(path, previous, i))
+		else:
+			kept = i
+	if path.closed and kept != onCurves[0] and near(kept, onCurves[0]):
+		# the contour closes onto its first node, so the last kept node goes instead
+		previous = onCurves[onCurves.index(kept) - 1]
+		deleted.update(_segmentNodes(path, previous, kept))
+	return deleted
+
+
+def _segmentNodes(path, start, end):
+	"""The off-curve nodes after start and the on-curve end node, wrapping in closed paths"""
+	count = len(path)
+	nodes = []
+	i = (start + 1) % count
+	while i != end:
+		nodes.append(i)
+		i = (i + 1) % count
+	nodes.append(end)
+	return nodes
+
+
+def duplicateContours(paths, tolerance=DEFAULT_TOLERANCE):
+	"""
+	Indexes of closed paths whose on-curve nodes all lie within tolerance of
+	the on-curve nodes of an earlier path with as many, running the same way.
+	Opposite duplicates cancel out when filled, so they are left alone.
+	"""
+	spatialHash = SpatialHash(tolerance)
+	onCurveCounts = [p.onCurveCount() for p in paths]
+	directions = {}
+	duplicates = set()
+	for pathIndex, path in enumerate(paths):
+		points = [path.position(i) for i in path.onCurveIndexes()]
+		if path.closed and points:
+			candidates = None
+			for x, y in points:
+				near = set(i for i in spatialHash.near(x, y) if onCurveCounts[i] == len(points))
+				candidates = near if candidates is None else candidates & near
+				if not candidates:
+					break
+			for candidate in sorted(candidates or ()):
+				if candidate not in directions:
+					directions[candidate] = paths[candidate].direction()
+				if directions[candidate] == path.direction():
+					duplicates.add(pathIndex)
+					break
+		if pathIndex not in duplicates:
+			for x, y in points:
+				spatialHash.add(x, y, pathIndex)
+	return duplicates
+
+
+def removeNodes(path, indexes):
+	"""A copy of path without the nodes at indexes"""
+	indexes = set(indexes)
+	result = Path(closed=path.closed)
+	for i in range(len(path)):
+		if i not in indexes:
+			x, y = path.position(i)
+			result.addNode(x, y, path.types[i], path.smooth[i])
+	return result
+
+
+def cleanPaths(paths, tolerance=DEFAULT_TOLERANCE):
+	"""
+	Plans and applies the cleanup of a list of paths. Returns the new paths,
+	one per input path, the set of indexes of paths to drop (duplicates and
+	contours collapsed below two on-curve nodes), and the number of nodes
+	removed from the paths that stay.
+	"""
+	dropped = duplicateContours(paths, tolerance)
+	newPaths = []
+	removedNodes = 0
+	for pathIndex, path in enumerate(paths):
+		deleted = collapsedNodes(path, tolerance) if pathIndex not in dropped else set()
+		if not deleted:
+			newPaths.append(path)
+			continue
+		newPath = removeNodes(path, deleted)
+		if newPath.onCurveCount() < 2:
+			dropped.add(pathIndex)
+			newPaths.append(path)
+			continue
+		newPaths.append(newPath)
+		removedNodes += len(deleted)
+	return newPaths, dropped, removedNodes
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Content-addressed disk cache for clean outlines and effect results.
+
+Entries are keyed by a hash of what they were made from: the source
+outline (see glyphsAdapter.sourceFingerprint), plus the effect name and
+parameters for results, and the source of the kwb modules that make
+them, so an update to the cleanup or effect code retires old entries.
+Re-running an effect on glyphs that have not changed then reads the
+answer back instead of redoing decomposition, overlap removal and the
+effect itself. Values are pickled kwb.geometry
+objects. The least recently used entries are evicted once the cache
+grows past its size limit.
+"""
+
+import os
+import sys
+import json
+import pickle
+import hashlib
+import tempfile
+
+DEFAULT_MEGABYTES = 256
+
+# the kwb modules whose code decides what an entry contains
+CLEAN_MODULES = ("glyphsAdapter", "geometry", "bezier", "nodeCleanup")
+RESULT_MODULES = CLEAN_MODULES + ("effects", "clip", "jitter", "booleans")
+
+
+def defaultDirectory():
+	if sys.platform == "darwin":
+		root = os.path.expanduser("~/Library/Caches")
+	else:
+		root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+	return os.path.join(root, "com.kylewaynebenson.glyphs-scripts")
+
+
+def hashParts(*parts):
+	"""Stable hex digest of strings and JSON-able values"""
+	digest = hashlib.sha1()
+	for part in parts:
+		if not isinstance(part, str):
+			part = json.dumps(part, sort_keys=True)
+		digest.update(part.encode("utf-8"))
+		digest.update(b"\0")
+	return digest.hexdigest()
+
+
+def sourceHash(moduleNames):
+	"""Hash of the source files of kwb modules; a missing file only leaves its name in"""
+	digest = hashlib.sha1()
+	folder = os.path.dirname(os.path.abspath(__file__))
+	for name in moduleNames:
+		digest.update(name.encode("utf-8"))
+		try:
+			with open(os.path.join(folder, name + ".py"), "rb") as f:
+				digest.update(f.read())
+		except (IOError, OSError):
+			pass
+	return digest.hexdigest()[:12]
+
+
+CLEAN_VERSION = sourceHash(CLEAN_MODULES)
+RESULT_VERSION = sourceHash(RESULT_MODULES)
+
+
+class OutlineCache(object):
+	def __init__(self, directory=None, megabytes=None):
+		self.directory = directory or defaultDirectory()
+		self.maxBytes = int(float(megabytes or DEFAULT_MEGABYTES) * 1024 * 1024)
+		self.hits = 0
+		self.misses = 0
+
+	# keys
+
+	def cleanKey(self, sourceKey):
+		return hashParts("clean", CLEAN_VERSION, sourceKey)
+
+	def resultKey(self, effectName, sourceKey, params):
+		return hashParts("result", RESULT_VERSION, effectName, sourceKey, params)
+
+	# storage
+
+	def _path(self, key):
+		return os.path.join(self.directory, key[:2], key + ".pickle")
+
+	def get(self, key):
+		"""The stored value, or None"""
+		path = self._path(key)
+		try:
+			with open(path, "rb") as f:
+				value = pickle.load(f)
+		except (IOError, OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+			self.misses += 1
+			return None
+		try:
+			# the modification time is the recency eviction goes by
+			os.utime(path, None)
+		except OSError:
+			pass
+		self.hits += 1
+		return value
+
+	def put(self, key, value):
+		path = self._path(key)
+		folder = os.path.dirname(path)
+		try:
+			os.makedirs(folder, exist_ok=True)
+			# write to a temporary file first so readers never see half an entry
+			handle, temporaryPath = tempfile.mkstemp(dir=folder, suffix=".tmp")
+			with os.fdopen(handle, "wb") as f:
+				pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+			os.replace(temporaryPath, path)
+		except (IOError, OSError):
+			# a cache that cannot be written is just a cache that misses
+			pass
+
+	def _entries(self):
+		entries = []
+		for root, folders, files in os.walk(self.directory):
+			for name in files:
+				path = os.path.join(root, name)
+				try:
+					info = os.stat(path)
+				except OSError:
+					continue
+				entries.append((info.st_mtime, info.st_size, path))
+		return entries
+
+	def trim(self):
+		"""
+		Evicts least recently used entries until the cache is below 90% of
+		its size limit. Call once at the end of a run. Returns the number
+		of entries removed.
+		"""
+		entries = self._entries()
+		total = sum(size for mtime, size, path in entries)
+		if total <= self.maxBytes:
+			return 0
+		removed = 0
+		target = self.maxBytes * 0.9
+		for mtime, size, path in sorted(entries):
+			if total <= target:
+				break
+			try:
+				os.remove(path)
+			except OSError:
+				continue
+			total -= size
+			removed += 1
+		return removed
+
+	def clear(self):
+		for mtime, size, path in self._entries():
+			try:
+				os.remove(path)
+			except OSError:
+				pass
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Per-layer path metrics (area, bounds, node count, direction), measured once
+per layer and reused by the scripts that pick paths by size or position.
+"""
+
+from kwb import bezier
+from kwb.geometry import unionBounds
+
+
+class PathMetrics(object):
+	__slots__ = ("signedArea", "bounds", "nodeCount")
+
+	def __init__(self, signedArea, bounds, nodeCount):
+		self.signedArea = signedArea
+		self.bounds = bounds # (xMin, yMin, xMax, yMax) or None
+		self.nodeCount = nodeCount
+
+	def __repr__(self):
+		return "<PathMetrics area %s, %d nodes>" % (self.area, self.nodeCount)
+
+	@property
+	def area(self):
+		return abs(self.signedArea)
+
+	@property
+	def direction(self):
+		"""-1 for counterclockwise, 1 for clockwise, like GSPath.direction"""
+		return -1 if self.signedArea >= 0 else 1
+
+
+def measurePath(path):
+	"""Metrics of a geometry.Path from a single walk over its segments"""
+	signedArea = 0.0
+	boxes = []
+	for segment in path.segments():
+		if path.closed:
+			signedArea += bezier.segmentArea(segment)
+		boxes.append(bezier.segmentBounds(segment))
+	bounds = unionBounds(boxes)
+	if bounds is None and len(path):
+		x, y = path.position(0)
+		bounds = (x, y, x, y)
+	return PathMetrics(signedArea, bounds, len(path))
+
+
+class PathMetricsCache(object):
+	"""
+	Metrics per layer, keyed by whatever identifies a layer to the caller
+	(e.g. glyph name and layer id). Entries are measured on first use, kept in
+	step by removePaths(), and dropped by invalidate() after any other edit.
+	"""
+
+	def __init__(self, measure=measurePath):
+		self.measure = measure
+		self._entries = {}
+
+	def metrics(self, key, paths):
+		entry = self._entries.get(key)
+		if entry is None:
+			entry = [self.measure(p) for p in paths]
+			self._entries[key] = entry
+		return entry
+
+	def removePaths(self, key, indexes):
+		entry = self._entries.get(key)
+		if entry is not None:
+			remove = set(indexes)
+			self._entries[key] = [m for i, m in enumerate(entry) if i not in remove]
+
+	def invalidate(self, key=None):
+		if key is None:
+			self._entries.clear()
+		else:
+			self._entries.pop(key, None)
+
+
+def extremeIndexes(metrics, largest=True):
+	"""Indexes of all paths sharing the largest (or smallest) area, in one pass"""
+	indexes = []
+	target = None
+	for i, m in enumerate(metrics):
+		area = m.area
+		if target is None or (area > target if largest else area < target):
+			target = area
+			indexes = [i]
+		elif area == target:
+			indexes.append(i)
+	return indexes
+
+
+def allBut(indexes, count):
+	keep = set(indexes)
+	return [i for i in range(count) if i not in keep]
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Headless versions of the node and path edits used by the Paths scripts.
+"""
+
+from kwb import bezier
+from kwb.geometry import Path, LINE, CURVE
+
+PATH_ORDINALS = {
+	"first": 0,
+	"second": 1,
+	"third": 2,
+	"fourth": 3,
+	"fifth": 4,
+	"sixth": 5,
+}
+
+
+def mergeSegments(segments, samplesPerSegment=8):
+	"""
+	Replaces a run of segments with a single one, like removeNodeCheckKeepShape_:
+	lines stay lines, anything with a curve is refit keeping the outer tangents.
+	"""
+	if all(len(s) == 2 for s in segments):
+		return [segments[0][0], segments[-1][-1]]
+	points = [segments[0][0]]
+	for segment in segments:
+		for i in range(1, samplesPerSegment + 1):
+			points.append(bezier.segmentPoint(segment, float(i) / samplesPerSegment))
+	leftTangent = bezier.normalize(bezier.segmentTangent(segments[0], 0.0))
+	dx, dy = bezier.segmentTangent(segments[-1], 1.0)
+	rightTangent = bezier.normalize((-dx, -dy))
+	return bezier.fitCubic(points, bezier.chordLengthParameters(points), leftTangent, rightTangent)
+
+
+def removeSegmentEnds(path, segmentIndexes):
+	"""
+	Removes the on-curve nodes that end the given segments, keeping the shape.
+	Consecutive removals are merged into a single refit segment.
+	"""
+	segments = path.segments()
+	smooth = path.segmentSmoothFlags()
+	count = len(segments)
+	remove = set(i for i in segmentIndexes if 0 <= i < count)
+	if not path.closed:
+		# the end point of an open path stays
+		remove.discard(count - 1)
+	if len(remove) > count - 2:
+		# never collapse a contour below two segments
+		remove = set(sorted(remove)[:max(count - 2, 0)])
+	if not remove:
+		return path.copy()
+	if path.closed:
+		# start on a segment whose start node is kept so runs do not wrap around
+		first = next(i for i in range(count) if (i - 1) % count not in remove)
+		order = list(range(first, count)) + list(range(first))
+	else:
+		order = list(range(count))
+	newSegments, newSmooth, run = [], [], []
+	for i in order:
+		run.append(segments[i])
+		if i in remove:
+			continue
+		newSegments.append(run[0] if len(run) == 1 else mergeSegments(run))
+		newSmooth.append(smooth[i])
+		run = []
+	if run:
+		newSegments.append(mergeSegments(run))
+		newSmooth.append(smooth[order[-1]])
+	return Path.fromSegments(newSegments, path.closed, newSmooth)
+
+
+def deleteEveryNthNode(path, nodeCount):
+	"""
+	Headless counterpart of SimplifyShape.deletePoints for the benchmarks:
+	walks the path backwards and removes every nodeCount-th line or curve
+	node, refitting the merged segments. The script itself keeps using the
+	app's removeNodeCheckKeepShape_, whose curves can come out differently.
+	"""
+	nodeCount = int(nodeCount)
+	if nodeCount < 1 or not len(path):
+		return path.copy()
+	onCurves = [i for i in path.onCurveIndexes() if path.types[i] in (LINE, CURVE)]
+	removeNodes = set(onCurves[::-1][nodeCount-1::nodeCount])
+	if not removeNodes:
+		return path.copy()
+	# segment i ends at the i-th on-curve node after the start node
+	start = path.startIndex()
+	ends = path.onCurveIndexes()
+	if path.closed:
+		ends = [i for i in ends if i > start] + [i for i in ends if i <= start]
+	else:
+		ends = [i for i in ends if i > start]
+	return removeSegmentEnds(path, [s for s, i in enumerate(ends) if i in removeNodes])
+
+
+def pathIndexToDelete(paths, pathType, metrics=None):
+	"""
+	Headless get_path_index_to_delete from DeleteXPath. Works on GSPath
+	and geometry.Path alike since both have area(); pass cached
+	pathMetrics to skip measuring the paths again.
+	"""
+	numPaths = len(paths)
+	if not numPaths:
+		return None
+	if pathType in ("smallest", "largest"):
+		if metrics is None:
+			areas = [p.area() for p in paths]
+		else:
+			areas = [m.area for m in metrics]
+		target = min(areas) if pathType == "smallest" else max(areas)
+		return areas.index(target)
+	if pathType == "last":
+		return numPaths - 1
+	if pathType in PATH_ORDINALS:
+		index = PATH_ORDINALS[pathType]
+		return index if index < numPaths else None
+	return None
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Named stage timing for the scripts, switched on per run.
+
+A Profiler collects, for every stage and glyph, how often the stage ran, how
+long it took and how many nodes the glyph had afterwards. report() prints a
+table of the stages with their slowest glyphs and the slowest glyphs overall,
+and writes two files: a cProfile dump of the whole run (for pstats, snakeviz
+and other profile viewers) and the stages as folded stacks, the input format
+of flamegraph.pl and speedscope. A disabled Profiler hands out a shared
+no-op stage, so instrumented code costs nothing in normal runs.
+"""
+
+import os
+import time
+import pstats
+import cProfile
+import tempfile
+import functools
+from contextlib import contextmanager
+
+
+class _NoStage(object):
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		return False
+
+
+NO_STAGE = _NoStage()
+
+
+class StageRecord(object):
+	__slots__ = ("calls", "seconds", "slowest", "nodes")
+
+	def __init__(self):
+		self.calls = 0
+		self.seconds = 0.0
+		self.slowest = 0.0
+		self.nodes = None
+
+
+class Profiler(object):
+	"""
+	Use as a context manager around a whole run, with stage() around the
+	parts to time:
+
+		with Profiler("Create Cast Shadow") as profiler:
+			with profiler.stage("removeOverlap", glyph.name, lambda: nodeCount(layer)):
+				layer.removeOverlap()
+		profiler.report(print)
+	"""
+
+	def __init__(self, name, enabled=True, directory=None):
+		self.name = name
+		self.enabled = enabled
+		self.directory = directory or tempfile.gettempdir()
+		self.records = {} # (stage, glyph) -> StageRecord
+		self.stageOrder = []
+		self._profile = None
+		self._started = None
+		self.seconds = 0.0
+
+	def __enter__(self):
+		if self.enabled:
+			self._profile = cProfile.Profile()
+			self._started = time.perf_counter()
+			self._profile.enable()
+		return self
+
+	def __exit__(self, *exc):
+		if self._profile is not None:
+			self._profile.disable()
+			self.seconds = time.perf_counter() - self._started
+		return False
+
+	def stage(self, stageName, glyphName=None, nodes=None):
+		"""
+		Context manager timing stageName for glyphName. nodes is a function
+		returning the glyph's node count, called after the stage if it did
+		not raise.
+		"""
+		if not self.enabled:
+			return NO_STAGE
+		return self._stage(stageName, glyphName, nodes)
+
+	@contextmanager
+	def _stage(self, stageName, glyphName, nodes):
+		start = time.perf_counter()
+		try:
+			yield self
+		except BaseException:
+			# a stage that raised still counts its time, but what nodes() reads may not exist
+			self._record(stageName, glyphName, time.perf_counter() - start)
+			raise
+		else:
+			record = self._record(stageName, glyphName, time.perf_counter() - start)
+			if nodes is not None:
+				record.nodes = nodes()
+
+	def _record(self, stageName, glyphName, elapsed):
+		key = (stageName, glyphName)
+		record = self.records.get(key)
+		if record is None:
+			record = self.records[key] = StageRecord()
+			if stageName not in self.stageOrder:
+				self.stageOrder.append(stageName)
+		record.calls += 1
+		record.seconds += elapsed
+		record.slowest = max(record.slowest, elapsed)
+		return record
+
+	def timed(self, stageName):
+		"""Decorator form of stage() for functions that do not belong to one glyph"""
+		def decorate(function):
+			@functools.wraps(function)
+			def wrapper(*args, **kwargs):
+				with self.stage(stageName):
+					return function(*args, **kwargs)
+			return wrapper
+		return decorate
+
+	# reports
+
+	def stageTotals(self):
+		"""[(stage, calls, seconds, slowest glyph, its seconds)] in the order stages first ran"""
+		totals = []
+		for stageName in self.stageOrder:
+			calls, seconds, slowestGlyph, slowestSeconds = 0, 0.0, None, -1.0
+			for (name, glyphName), record in self.records.items():
+				if name != stageName:
+					continue
+				calls += record.calls
+				seconds += record.seconds
+				if record.seconds > slowestSeconds:
+					slowestGlyph, slowestSeconds = glyphName, record.seconds
+			totals.append((stageName, calls, seconds, slowestGlyph, slowestSeconds))
+		return totals
+
+	def glyphTotals(self):
+		"""[(glyph, seconds, nodes)] slowest first; nodes is the count after the glyph's last counted stage"""
+		seconds, nodes = {}, {}
+		for (stageName, glyphName), record in self.records.items():
+			if glyphName is None:
+				continue
+			seconds[glyphName] = seconds.get(glyphName, 0.0) + record.seconds
+			if record.nodes is not None:
+				nodes[glyphName] = record.nodes
+		return sorted(((g, s, nodes.get(g)) for g, s in seconds.items()), key=lambda row: -row[1])
+
+	def summary(self, glyphLimit=10):
+		lines = ["%s: %.1f ms" % (self.name, self.seconds * 1000)]
+		lines.append("%-24s %6s %10s %10s  %s" % ("stage", "calls", "total ms", "mean ms", "slowest glyph"))
+		for stageName, calls, seconds, slowestGlyph, slowestSeconds in self.stageTotals():
+			lines.append("%-24s %6d %10.1f %10.2f  %s" % (
+				stageName, calls, seconds * 1000, seconds * 1000 / calls if calls else 0.0,
+				"%s (%.1f ms)" % (slowestGlyph, slowestSeconds * 1000) if slowestGlyph is not None else "-",
+			))
+		glyphRows = self.glyphTotals()
+		if glyphRows:
+			lines.append("%-24s %10s %8s" % ("glyph", "total ms", "nodes"))
+			for glyphName, seconds, nodes in glyphRows[:glyphLimit]:
+				lines.append("%-24s %10.1f %8s" % (glyphName, seconds * 1000, nodes if nodes is not None else "-"))
+		return lines
+
+	def foldedStacks(self):
+		"""Stage times as 'run;glyph;stage microseconds' lines"""
+		root = self.name.replace(";", ",").replace(" ", "_")
+		lines = []
+		for (stageName, glyphName), record in self.records.items():
+			frames = [root] + ([str(glyphName)] if glyphName is not None else []) + [stageName]
+			lines.append("%s %d" % (";".join(f.replace(";", ",").replace(" ", "_") for f in frames), int(record.seconds * 1e6)))
+		return lines
+
+	def dump(self):
+		"""Writes the cProfile dump and the folded stacks; returns both paths"""
+		stamp = time.strftime("%Y%m%d-%H%M%S")
+		base = os.path.join(self.directory, "%s-%s" % (self.name.replace(" ", ""), stamp))
+		profilePath, foldedPath = base + ".prof", base + ".folded"
+		if self._profile is not None:
+			pstats.Stats(self._profile).dump_stats(profilePath)
+		with open(foldedPath, "w") as f:
+			f.write("\n".join(self.foldedStacks()) + "\n")
+		return profilePath, foldedPath
+
+	def report(self, log=print):
+		"""Logs the summary table and writes the dumps; does nothing when disabled"""
+		if not self.enabled:
+			return
+		for line in self.summary():
+			log(line)
+		profilePath, foldedPath = self.dump()
+		log("Profile: %s" % profilePath)
+		log("Stage flame graph: %s" % foldedPath)
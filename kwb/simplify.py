@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Error-bounded outline simplification for Simplify Shape.
+
+Each contour is flattened, broken at its corners, thinned with
+Ramer-Douglas-Peucker and refit with cubic curves in Schneider's manner,
+splitting a stretch only where the fit strays further than the tolerance.
+The result is checked against the flattened original and a stretch is
+refit more tightly if it drifted too far.
+"""
+
+import math
+from kwb import bezier
+from kwb.geometry import Path
+
+# nodes turning more sharply than this stay corners
+DEFAULT_CORNER_ANGLE = 35.0
+MAX_REPARAMETERIZE = 4
+MAX_REFITS = 4
+
+
+def _distanceToChord(point, a, b):
+	dx, dy = b[0] - a[0], b[1] - a[1]
+	length = math.hypot(dx, dy)
+	if length < bezier.EPSILON:
+		return math.hypot(point[0] - a[0], point[1] - a[1])
+	return abs((point[0] - a[0]) * dy - (point[1] - a[1]) * dx) / length
+
+
+def rdp(points, tolerance):
+	"""Indexes of the points Ramer-Douglas-Peucker keeps, first and last included"""
+	keep = [False] * len(points)
+	keep[0] = keep[-1] = True
+	stack = [(0, len(points) - 1)]
+	while stack:
+		first, last = stack.pop()
+		worst, worstIndex = 0.0, None
+		for i in range(first + 1, last):
+			distance = _distanceToChord(points[i], points[first], points[last])
+			if distance > worst:
+				worst, worstIndex = distance, i
+		if worstIndex is not None and worst > tolerance:
+			keep[worstIndex] = True
+			stack.append((first, worstIndex))
+			stack.append((worstIndex, last))
+	return [i for i, k in enumerate(keep) if k]
+
+
+def flattenSegment(segment, tolerance):
+	"""Points along a segment, the start point excluded, spaced finely enough for the tolerance"""
+	if len(segment) == 2:
+		return [segment[1]]
+	length = bezier.segmentLength(segment, 8)
+	steps = int(min(64, max(4, math.ceil(length / max(tolerance * 4, 1.0)))))
+	return [bezier.cubicPoint(segment, float(i) / steps) for i in range(1, steps + 1)]
+
+
+def _turnAngle(incoming, outgoing):
+	a = bezier.normalize(incoming)
+	b = bezier.normalize(outgoing)
+	if a == (0.0, 0.0) or b == (0.0, 0.0):
+		return 0.0
+	return math.degrees(math.acos(max(-1.0, min(1.0, a[0]*b[0] + a[1]*b[1]))))
+
+
+def _chordLength(segment):
+	return math.hypot(segment[-1][0] - segment[0][0], segment[-1][1] - segment[0][1])
+
+
+def _runs(path, tolerance, cornerAngle):
+	"""
+	Splits a contour into runs of flattened points between corners.
+	Returns (runs, closedSmooth): closedSmooth is True for a closed contour
+	without corners, which then forms a single run starting and ending on the same point.
+	"""
+	segments = path.segments()
+	smooth = path.segmentSmoothFlags()
+	count = len(segments)
+	corners = []
+	for i in range(count):
+		if not path.closed and i == count - 1:
+			break
+		following = (i + 1) % count
+		if following == 0 and not path.closed:
+			break
+		incoming = bezier.segmentTangent(segments[i], 1.0)
+		outgoing = bezier.segmentTangent(segments[following], 0.0)
+		# on traced outlines every tiny segment turns sharply, so only segments
+		# longer than the tolerance can meet in a corner
+		if (
+			not smooth[i]
+			and _turnAngle(incoming, outgoing) > cornerAngle
+			and _chordLength(segments[i]) > tolerance
+			and _chordLength(segments[following]) > tolerance
+		):
+			corners.append(i)
+	if path.closed and not corners:
+		points = [segments[0][0]]
+		for segment in segments:
+			points.extend(flattenSegment(segment, tolerance))
+		return [points], True
+	if path.closed:
+		# start right after a corner so every run ends on one
+		first = (corners[0] + 1) % count
+		order = list(range(first, count)) + list(range(first))
+	else:
+		order = list(range(count))
+	cornerSet = set(corners)
+	runs = []
+	current = [segments[order[0]][0]]
+	for i in order:
+		current.extend(flattenSegment(segments[i], tolerance))
+		if i in cornerSet:
+			runs.append(current)
+			current = [segments[i][-1]]
+	if len(current) > 1:
+		runs.append(current)
+	return runs, False
+
+
+def _curveError(points, params, curve):
+	worst, worstIndex = 0.0, len(points) // 2
+	for i in range(1, len(points) - 1):
+		x, y = bezier.cubicPoint(curve, params[i])
+		distance = math.hypot(x - points[i][0], y - points[i][1])
+		if distance > worst:
+			worst, worstIndex = distance, i
+	return worst, worstIndex
+
+
+def _reparameterize(points, params, curve):
+	"""One Newton-Raphson step per point towards its nearest parameter on the curve"""
+	d1 = [(3 * (curve[i+1][0] - curve[i][0]), 3 * (curve[i+1][1] - curve[i][1])) for i in range(3)]
+	d2 = [(2 * (d1[i+1][0] - d1[i][0]), 2 * (d1[i+1][1] - d1[i][1])) for i in range(2)]
+	result = []
+	for point, u in zip(points, params):
+		x, y = bezier.cubicPoint(curve, u)
+		mu = 1 - u
+		dx = d1[0][0]*mu*mu + d1[1][0]*2*mu*u + d1[2][0]*u*u
+		dy = d1[0][1]*mu*mu + d1[1][1]*2*mu*u + d1[2][1]*u*u
+		ddx = d2[0][0]*mu + d2[1][0]*u
+		ddy = d2[0][1]*mu + d2[1][1]*u
+		numerator = (x - point[0]) * dx + (y - point[1]) * dy
+		denominator = dx*dx + dy*dy + (x - point[0]) * ddx + (y - point[1]) * ddy
+		if abs(denominator) > bezier.EPSILON:
+			u = min(1.0, max(0.0, u - numerator / denominator))
+		result.append(u)
+	return result
+
+
+def _reach(points, i, step, distance):
+	"""The first point from i on (step +1 or -1) at least distance away, or the last one there is"""
+	x, y = points[i]
+	j = i
+	while 0 <= j + step < len(points):
+		j += step
+		if math.hypot(points[j][0] - x, points[j][1] - y) >= distance:
+			break
+	return points[j]
+
+
+def _principalDirection(points, along):
+	"""Least-squares line direction through points, turned to agree with along"""
+	n = float(len(points))
+	mx = sum(p[0] for p in points) / n
+	my = sum(p[1] for p in points) / n
+	sxx = sum((p[0] - mx) ** 2 for p in points)
+	syy = sum((p[1] - my) ** 2 for p in points)
+	sxy = sum((p[0] - mx) * (p[1] - my) for p in points)
+	angle = 0.5 * math.atan2(2 * sxy, sxx - syy)
+	direction = (math.cos(angle), math.sin(angle))
+	if direction[0] * along[0] + direction[1] * along[1] < 0:
+		direction = (-direction[0], -direction[1])
+	return direction
+
+
+def _endTangent(points, i, step, distance):
+	"""
+	Unit tangent at an end point, pointing into the curve. It is fitted through
+	all points within distance, so noise on traced outlines averages out.
+	"""
+	x, y = points[i]
+	near = [points[i]]
+	j = i
+	while 0 <= j + step < len(points):
+		j += step
+		near.append(points[j])
+		if math.hypot(points[j][0] - x, points[j][1] - y) >= distance:
+			break
+	along = (near[-1][0] - x, near[-1][1] - y)
+	if len(near) < 3:
+		return bezier.normalize(along)
+	return _principalDirection(near, along)
+
+
+def _centerTangent(points, i, distance):
+	"""Unit tangent at an inner point, pointing backwards, fitted through its neighbours within distance"""
+	before = _endTangent(points, i, -1, distance)
+	after = _endTangent(points, i, 1, distance)
+	return bezier.normalize((before[0] - after[0], before[1] - after[1]))
+
+
+def fitPoints(points, tolerance, leftTangent, rightTangent):
+	"""Schneider fit: a list of line and cubic segments through points within tolerance"""
+	if len(points) == 2 or all(_distanceToChord(p, points[0], points[-1]) <= tolerance for p in points[1:-1]):
+		return [[points[0], points[-1]]]
+	params = bezier.chordLengthParameters(points)
+	curve = bezier.fitCubic(points, params, leftTangent, rightTangent)
+	error, splitIndex = _curveError(points, params, curve)
+	if error <= tolerance:
+		return [curve]
+	if error <= tolerance * 16:
+		for i in range(MAX_REPARAMETERIZE):
+			params = _reparameterize(points, params, curve)
+			curve = bezier.fitCubic(points, params, leftTangent, rightTangent)
+			error, splitIndex = _curveError(points, params, curve)
+			if error <= tolerance:
+				return [curve]
+	splitIndex = max(1, min(len(points) - 2, splitIndex))
+	centerTangent = _centerTangent(points, splitIndex, tolerance * 8)
+	if centerTangent == (0.0, 0.0):
+		centerTangent = bezier.normalize((points[splitIndex-1][0] - points[splitIndex][0], points[splitIndex-1][1] - points[splitIndex][1]))
+	left = fitPoints(points[:splitIndex+1], tolerance, leftTangent, centerTangent)
+	right = fitPoints(points[splitIndex:], tolerance, (-centerTangent[0], -centerTangent[1]), rightTangent)
+	return left + right
+
+
+def _fitRun(points, rdpTolerance, fitTolerance, closedSmooth):
+	# drop repeated points, they carry no direction
+	unique = [points[0]]
+	for p in points[1:]:
+		if abs(p[0] - unique[-1][0]) > bezier.EPSILON or abs(p[1] - unique[-1][1]) > bezier.EPSILON:
+			unique.append(p)
+	if closedSmooth and len(unique) > 2 and unique[-1] != unique[0]:
+		unique.append(unique[0])
+	points = [unique[i] for i in rdp(unique, rdpTolerance)]
+	if len(points) < 2:
+		return []
+	reach = fitTolerance * 8
+	if closedSmooth and len(points) > 3:
+		a, b = _reach(points, len(points) - 1, -1, reach), _reach(points, 0, 1, reach)
+		tangent = bezier.normalize((b[0] - a[0], b[1] - a[1]))
+		leftTangent, rightTangent = tangent, (-tangent[0], -tangent[1])
+	else:
+		leftTangent = _endTangent(points, 0, 1, reach)
+		rightTangent = _endTangent(points, len(points) - 1, -1, reach)
+	return fitPoints(points, fitTolerance, leftTangent, rightTangent)
+
+
+def _maxDeviation(samples, segments):
+	"""Largest distance from the samples to the fitted segments, walking both in order"""
+	dense = [segments[0][0]] if segments else []
+	for segment in segments:
+		steps = 2 if len(segment) == 2 else 24
+		for i in range(1, steps + 1):
+			dense.append(bezier.segmentPoint(segment, float(i) / steps))
+	if len(dense) < 2:
+		return 0.0
+	worst = 0.0
+	j = 0
+	last = len(dense) - 2
+	for point in samples:
+		# both lists run the same way round, so search a window ahead of the last match
+		best, bestIndex = None, j
+		for i in range(max(0, j - 4), min(last, j + 48) + 1):
+			distance = _distanceToSegment(point, dense[i], dense[i+1])
+			if best is None or distance < best:
+				best, bestIndex = distance, i
+		j = bestIndex
+		worst = max(worst, best)
+	return worst
+
+
+def _distanceToSegment(point, a, b):
+	dx, dy = b[0] - a[0], b[1] - a[1]
+	lengthSquared = dx*dx + dy*dy
+	t = 0.0
+	if lengthSquared > bezier.EPSILON:
+		t = max(0.0, min(1.0, ((point[0] - a[0]) * dx + (point[1] - a[1]) * dy) / lengthSquared))
+	return math.hypot(point[0] - a[0] - t * dx, point[1] - a[1] - t * dy)
+
+
+def simplifyPath(path, tolerance, cornerAngle=DEFAULT_CORNER_ANGLE, measure=True):
+	"""
+	Returns (simplified path, max deviation). Corners stay where they are;
+	measure=False skips the deviation check and reports 0.
+	"""
+	segments = path.segments()
+	if len(segments) < 2 or tolerance <= 0:
+		return path.copy(), 0.0
+	runs, closedSmooth = _runs(path, tolerance, cornerAngle)
+	newSegments, smooth = [], []
+	worst = 0.0
+	for points in runs:
+		# a quarter of the tolerance for thinning and the rest for fitting, tighter if that still drifts
+		share = 1.0
+		for attempt in range(MAX_REFITS):
+			fitted = _fitRun(points, tolerance * share * 0.25, tolerance * share * 0.75, closedSmooth)
+			error = _maxDeviation(points, fitted) if fitted and measure else 0.0
+			if error <= tolerance:
+				break
+			share *= 0.5
+		if not fitted:
+			continue
+		worst = max(worst, error)
+		for k, segment in enumerate(fitted):
+			newSegments.append(segment)
+			# curve to curve joins inside a run share their tangent
+			last = k == len(fitted) - 1
+			following = fitted[0] if last else fitted[k+1]
+			smooth.append((not last or closedSmooth) and len(segment) == 4 and len(following) == 4)
+	if len(newSegments) < 2:
+		return path.copy(), 0.0
+	return Path.fromSegments(newSegments, path.closed, smooth), worst
+
+
+def simplifyPaths(paths, tolerance, cornerAngle=DEFAULT_CORNER_ANGLE):
+	"""Simplifies every path; returns (paths, nodes before, nodes after, max deviation)"""
+	result = []
+	before = after = 0
+	worst = 0.0
+	for path in paths:
+		simplified, error = simplifyPath(path, tolerance, cornerAngle)
+		result.append(simplified)
+		before += path.onCurveCount()
+		after += simplified.onCurveCount()
+		worst = max(worst, error)
+	return result, before, after, worst
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Silhouette sweep behind Create Cast Shadow's extrusion.
+
+Moving an outline along a vector covers the outline itself, its shifted
+copy and the regions swept by the edges that face the direction of travel.
+Their union is the Minkowski sum of the outline and the vector, so it
+replaces a stack of one copy per unit of shadow length. The union itself
+is left to the app's overlap removal.
+"""
+
+from kwb import bezier
+from kwb.geometry import Path
+
+
+def silhouetteParameters(segment, vx, vy):
+	"""Parameters where the tangent of a cubic runs parallel to (vx, vy)"""
+	(x0, y0), (x1, y1), (x2, y2), (x3, y3) = segment
+	a = (x1 - x0) * vy - (y1 - y0) * vx
+	b = (x2 - x1) * vy - (y2 - y1) * vx
+	c = (x3 - x2) * vy - (y3 - y2) * vx
+	# cross(B'(t), v) = A*t^2 + B*t + C
+	return bezier.parametersInUnitInterval(bezier.quadraticRoots(a - 2*b + c, 2 * (b - a), a))
+
+
+def _facesDirection(piece, vx, vy):
+	# outer paths run counterclockwise, so the outside is to the right
+	if len(piece) == 2:
+		tx, ty = piece[1][0] - piece[0][0], piece[1][1] - piece[0][1]
+	else:
+		(x0, y0), (x1, y1), (x2, y2), (x3, y3) = piece
+		tx, ty = x3 + x2 - x1 - x0, y3 + y2 - y1 - y0
+	return tx * vy - ty * vx < -1e-9
+
+
+def sweptPaths(path, vx, vy):
+	"""The closed regions swept by the edges of path that face (vx, vy)"""
+	sweeps = []
+	for segment in path.segments():
+		if len(segment) == 2:
+			pieces = [segment]
+		else:
+			pieces = bezier.splitSegmentAtParameters(segment, silhouetteParameters(segment, vx, vy))
+		for piece in pieces:
+			if not _facesDirection(piece, vx, vy):
+				continue
+			shifted = [(x + vx, y + vy) for x, y in piece]
+			start, end = piece[0], piece[-1]
+			sweptPath = Path.fromSegments([
+				piece,
+				[end, shifted[-1]],
+				list(reversed(shifted)),
+				[shifted[0], start],
+			])
+			# orient by the control polygon, which is enough to tell the two directions apart
+			points = piece + list(reversed(shifted))
+			signedArea = 0.0
+			for (xa, ya), (xb, yb) in zip(points, points[1:] + points[:1]):
+				signedArea += xa * yb - xb * ya
+			if signedArea < 0:
+				sweptPath.reverse()
+			sweeps.append(sweptPath)
+	return sweeps
+
+
+def castShadowPieces(paths, startX, startY, sweepX, sweepY):
+	"""
+	Copies of paths moved by (startX, startY), each followed by the regions
+	its silhouette sweeps over along (sweepX, sweepY). Removing overlap from
+	the lot gives the extruded shadow.
+	"""
+	pieces = []
+	for path in paths:
+		startPath = path.copy().translate(startX, startY)
+		pieces.append(startPath)
+		if sweepX or sweepY:
+			pieces.extend(sweptPaths(startPath, sweepX, sweepY))
+	return pieces
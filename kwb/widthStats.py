@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+__doc__="""
+Advance width statistics for Average Width, grouped by glyph category,
+subcategory, name suffix or script, for every master at once.
+
+One pass over the glyphs files each master layer's width under the glyph's
+group in every chosen grouping, plus an "all" row. Each group then gets its
+count, mean, median, population standard deviation, extremes and
+percentiles. Works on GSFont and fileFont.GlyphsFileFont alike; glyphs
+without a category or script in the file are grouped under "-".
+"""
+
+import csv
+import math
+
+GROUPINGS = ("category", "subCategory", "suffix", "script")
+PERCENTILES = (10, 25, 75, 90)
+NO_GROUP = "-"
+ALL = "all"
+
+COLUMNS = ("grouping", "group", "master", "count", "mean", "median", "stdev", "min", "max") + tuple("p%d" % p for p in PERCENTILES)
+
+
+def glyphSuffix(name):
+	"""Everything after the first dot: 'one.tf' -> 'tf', 'a.sc.ss01' -> 'sc.ss01'"""
+	return name.split(".", 1)[1] if "." in name[1:] else NO_GROUP
+
+
+def groupOf(glyph, grouping):
+	if grouping == "suffix":
+		return glyphSuffix(glyph.name)
+	return getattr(glyph, grouping, None) or NO_GROUP
+
+
+def percentile(sortedValues, p):
+	"""Linear interpolation between the closest ranks, as in numpy's default"""
+	if not sortedValues:
+		return None
+	position = (len(sortedValues) - 1) * p / 100.0
+	lower = int(math.floor(position))
+	upper = min(lower + 1, len(sortedValues) - 1)
+	return sortedValues[lower] + (sortedValues[upper] - sortedValues[lower]) * (position - lower)
+
+
+def summarize(values):
+	"""{count, mean, median, stdev, min, max, pNN} of a list of widths"""
+	values = sorted(values)
+	count = len(values)
+	mean = sum(values) / float(count)
+	variance = sum((v - mean) * (v - mean) for v in values) / count
+	stats = {
+		"count": count,
+		"mean": mean,
+		"median": percentile(values, 50),
+		"stdev": math.sqrt(variance),
+		"min": values[0],
+		"max": values[-1],
+	}
+	for p in PERCENTILES:
+		stats["p%d" % p] = percentile(values, p)
+	return stats
+
+
+class WidthStats(object):
+	def __init__(self, masters, groupings=GROUPINGS):
+		self.masters = [(m.id, m.name) for m in masters]
+		self.groupings = tuple(groupings)
+		self.widths = {} # (grouping, group, masterId) -> [width]
+		self.glyphNames = set()
+
+	def add(self, glyph):
+		"""Files the master widths of a glyph; a glyph seen before is skipped"""
+		name = glyph.name
+		if not name or name in self.glyphNames:
+			return False
+		self.glyphNames.add(name)
+		groups = [(ALL, ALL)] + [(grouping, groupOf(glyph, grouping)) for grouping in self.groupings]
+		for masterId, masterName in self.masters:
+			layer = glyph.layers[masterId]
+			if layer is None:
+				continue
+			width = layer.width
+			for grouping, group in groups:
+				self.widths.setdefault((grouping, group, masterId), []).append(width)
+		return True
+
+	def collect(self, glyphs, exportingOnly=False):
+		for glyph in glyphs:
+			if exportingOnly and not glyph.export:
+				continue
+			self.add(glyph)
+		return self
+
+	def rows(self):
+		"""One dict per grouping, group and master, in the order of COLUMNS"""
+		masterNames = dict(self.masters)
+		masterOrder = dict((masterId, i) for i, (masterId, masterName) in enumerate(self.masters))
+		groupingOrder = dict((grouping, i) for i, grouping in enumerate((ALL,) + self.groupings))
+		keys = sorted(self.widths, key=lambda key: (groupingOrder[key[0]], str(key[1]), masterOrder[key[2]]))
+		rows = []
+		for grouping, group, masterId in keys:
+			row = {"grouping": grouping, "group": group, "master": masterNames[masterId]}
+			row.update(summarize(self.widths[(grouping, group, masterId)]))
+			rows.append(row)
+		return rows
+
+
+def formatTable(rows):
+	"""Text table of rows with the columns lined up"""
+	cells = [list(COLUMNS)]
+	for row in rows:
+		cells.append([_formatCell(row[column]) for column in COLUMNS])
+	widths = [max(len(line[i]) for line in cells) for i in range(len(COLUMNS))]
+	lines = []
+	for line in cells:
+		# text columns flush left, numbers flush right
+		lines.append("  ".join(cell.ljust(w) if i < 3 else cell.rjust(w) for i, (cell, w) in enumerate(zip(line, widths))))
+	return lines
+
+
+def _formatCell(value):
+	if isinstance(value, float):
+		return "%.1f" % value
+	return str(value)
+
+
+def writeTable(path, rows):
+	"""Writes rows as CSV, one column per statistic"""
+	with open(path, "w", newline="") as f:
+		writer = csv.DictWriter(f, fieldnames=COLUMNS)
+		writer.writeheader()
+		for row in rows:
+			writer.writerow(dict((column, round(value, 2) if isinstance(value, float) else value) for column, value in row.items()))
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+
+from kwb import glyphsFile
+from kwb.fileFont import GlyphsFileFont
+
+# Glyphs 2 writes unicodes as bare hex, several of which look like exponents
+GLYPHS2_SOURCE = """{
+.appVersion = "1352";
+familyName = Sample;
+fontMaster = (
+{
+id = m01;
+}
+);
+glyphs = (
+{
+glyphname = Adotbelow;
+layers = (
+{
+layerId = m01;
+width = 600;
+}
+);
+unicode = 1EA0;
+},
+{
+glyphname = Aringbelow;
+layers = (
+{
+layerId = m01;
+width = 600;
+}
+);
+unicode = 1E00;
+},
+{
+glyphname = "kokai-thai";
+layers = (
+{
+layerId = m01;
+width = 550;
+}
+);
+unicode = 0E01;
+},
+{
+glyphname = "zero-thai";
+layers = (
+{
+layerId = m01;
+width = 550;
+}
+);
+unicode = 0E50;
+},
+{
+glyphname = dblverticalbar;
+layers = (
+{
+layerId = m01;
+width = 300;
+}
+);
+unicode = 2016;
+},
+{
+glyphname = twodotleader;
+layers = (
+{
+layerId = m01;
+width = 500;
+}
+);
+unicode = 2E00;
+}
+);
+unitsPerEm = 1000;
+}
+"""
+
+UNICODES = ["1EA0", "1E00", "0E01", "0E50", "2016", "2E00"]
+
+
+def writeSample(folder):
+	path = os.path.join(str(folder), "Sample.glyphs")
+	with io.open(path, "w", encoding="utf-8") as f:
+		f.write(GLYPHS2_SOURCE)
+	return path
+
+
+def test_hexUnicodesReadAsText(tmp_path):
+	font = GlyphsFileFont(writeSample(tmp_path))
+	assert [glyph.unicode for glyph in font.glyphs] == UNICODES
+
+
+def test_glyphs2RoundTrip(tmp_path):
+	path = writeSample(tmp_path)
+	outputPath = os.path.join(str(tmp_path), "Output.glyphs")
+	GlyphsFileFont(path).save(outputPath)
+	with io.open(outputPath, "r", encoding="utf-8") as f:
+		assert f.read() == GLYPHS2_SOURCE
+	assert [glyph.unicode for glyph in GlyphsFileFont(outputPath).glyphs] == UNICODES
+
+
+def test_numericTextKeepsQuotes():
+	value = glyphsFile.parse('{a = "12"; b = 1E00; c = 1e-05; d = 12;}')
+	assert value == {"a": "12", "b": "1E00", "c": 1e-05, "d": 12}
+	assert glyphsFile.parse(glyphsFile.dumps(value)) == value